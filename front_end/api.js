@@ -1,3 +1,111 @@
+/**
+ * 数据文件的内容哈希 (由后端的 /data/manifest.json 提供)
+ * 每次页面加载只请求一次。
+ */
+let dataManifestPromise = null;
+
+function loadDataManifest() {
+    if (!dataManifestPromise) {
+        dataManifestPromise = fetch('./data/manifest.json', { cache: 'no-cache' })
+            .then(res => (res.ok ? res.json() : {}))
+            .then(data => data.files || {})
+            .catch(error => {
+                console.warn("[M-Spec] Failed to fetch data manifest:", error);
+                return {};
+            });
+    }
+    return dataManifestPromise;
+}
+
+/**
+ * 获取数据文件的 URL。
+ * 带有内容哈希的 URL (?v=...) 可以被浏览器永久缓存；
+ * 不在 manifest 中的文件则每次都会重新验证 (ETag)。
+ */
+async function getDataUrl(fileName) {
+    const files = await loadDataManifest();
+    const hash = files[fileName];
+    return hash ? `./data/${fileName}?v=${hash}` : `./data/${fileName}`;
+}
+
+/**
+ * 解码列式编码的施法数据 (后端 "?casts=columns")
+ * {encoding: "columns", spell_id: [...], ts: [...], d: [...], c: [...]}
+ *   - ts 为与上一个施法的时间差
+ *   - d 为 0 表示没有持续时间 (全部为 0 时省略)
+ *   - c 省略时表示没有计数; 为空数组时按每个技能的施法顺序计数
+ * 返回与原格式相同的对象数组 (键名与编码时相同)。
+ */
+function decodeCastColumns(columns) {
+    const timeKey = 'timestamp' in columns ? 'timestamp' : 'ts';
+    const durationKey = timeKey === 'ts' ? 'd' : 'duration';
+    const counterKey = timeKey === 'ts' ? 'c' : 'counter';
+
+    const spellIds = columns.spell_id || [];
+    const deltas = columns[timeKey] || [];
+    const durations = columns[durationKey];
+    const counters = columns[counterKey];
+    const countCasts = Array.isArray(counters) && counters.length === 0;
+    const spellCounts = new Map();
+
+    const casts = new Array(spellIds.length);
+    let ts = 0;
+    for (let i = 0; i < spellIds.length; i++) {
+        const spellId = spellIds[i];
+        ts += deltas[i];
+        const count = (spellCounts.get(spellId) || 0) + 1;
+        spellCounts.set(spellId, count);
+
+        const cast = { spell_id: spellId, [timeKey]: ts };
+        if (durations && durations[i]) cast[durationKey] = durations[i];
+        if (counters) cast[counterKey] = countCasts ? count : counters[i];
+        casts[i] = cast;
+    }
+    return casts;
+}
+
+/**
+ * 将数据中所有列式编码的 "casts" 还原为对象数组 (原地修改)。
+ */
+function decodeCasts(data) {
+    if (Array.isArray(data)) {
+        data.forEach(decodeCasts);
+    } else if (data && typeof data === 'object') {
+        Object.keys(data).forEach(key => {
+            const value = data[key];
+            if (key === 'casts' && value && value.encoding === 'columns') {
+                data[key] = decodeCastColumns(value);
+            } else if (value && typeof value === 'object') {
+                decodeCasts(value);
+            }
+        });
+    }
+    return data;
+}
+
+/**
+ * 加载渲染一个职业/Boss 时间轴所需的全部数据 (单个请求):
+ * 排名、用到的技能、Boss 阶段和时间轴标记。
+ * 失败时返回 null，调用方应回退到逐个加载静态文件。
+ */
+async function loadTimelineView(specSlug, bossSlug, region = 'All') {
+    // 施法数据使用列式编码，体积更小，解析更快
+    const params = new URLSearchParams({ casts: 'columns' });
+    if (region && region !== 'All') params.set('region', region);
+    const url = `/api/timeline_view/${specSlug}/${bossSlug}?${params}`;
+
+    try {
+        const response = await fetch(url);
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+        return decodeCasts(await response.json());
+    } catch (error) {
+        console.warn("[M-Spec] Timeline view not available, loading files one by one:", error);
+        return null;
+    }
+}
+
 /**
  * 从静态 JSON 文件加载排名数据
  * 这些文件是由后端的 updater.py 脚本定期生成的。
@@ -7,10 +115,9 @@ async function loadRanking(bossSlug, specSlug) {
     // 路径结构: ./data/spec_ranking_<职业>_<BOSS>.json
     // 例如: ./data/spec_ranking_pictomancer-pictomancer_vamp-fatale.json
     
-    // 添加时间戳参数 (?t=...) 以防止浏览器缓存旧数据
-    const timestamp = new Date().getTime();
+    // 使用 manifest 中的内容哈希 (?v=...)，文件更新后 URL 随之改变
     const fileName = `spec_ranking_${specSlug}_${bossSlug}.json`;
-    const url = `./data/${fileName}?t=${timestamp}`;
+    const url = await getDataUrl(fileName);
 
     console.log(`[M-Spec] Fetching static data from: ${url}`);
 
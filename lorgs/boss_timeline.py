@@ -5,11 +5,23 @@ from __future__ import annotations
 from dataclasses import asdict
 from dataclasses import dataclass
 from dataclasses import field
-from typing import Literal, Optional
+from typing import TYPE_CHECKING, Any, Literal, Optional
+
+from lorgs.models.wow_spell import SpellTag
+
+
+if TYPE_CHECKING:
+    from lorgs.models.raid_boss import RaidBoss
 
 
 BossTimelineType = Literal["mech", "tb", "aoe"]
 
+BOSS_TIMELINE_COLORS = {
+    "mech": "#facc15",
+    "tb": "#60a5fa",
+    "aoe": "#fb923c",
+}
+
 
 @dataclass(frozen=True)
 class BossTimelineEvent:
@@ -28,3 +40,58 @@ class BossTimelineEvent:
 
     def as_dict(self) -> dict:
         return asdict(self)
+
+
+def parse_time(time_str: Any) -> float:
+    if isinstance(time_str, (int, float)):
+        return time_str
+    if not time_str:
+        return 0
+    try:
+        if ":" in time_str:
+            m, s = time_str.split(":")
+            return int(m) * 60 + int(s)
+        return int(time_str)
+    except ValueError:
+        return 0
+
+
+def get_boss_timeline_type_from_tags(tags) -> BossTimelineType:
+    tags = tags or []
+    if SpellTag.TANK_MIT in tags or SpellTag.SINGLE_MIT in tags:
+        return "tb"
+    if SpellTag.RAID_MIT in tags or SpellTag.RAID_CD in tags:
+        return "aoe"
+    return "mech"
+
+
+def serialize_boss_timeline_event(event: BossTimelineEvent) -> dict:
+    item = event.as_dict()
+    item["type"] = item.get("type") or "mech"
+    item["color"] = item.get("color") or BOSS_TIMELINE_COLORS.get(item["type"], BOSS_TIMELINE_COLORS["mech"])
+    return item
+
+
+def serialize_boss_cast(cast) -> dict:
+    event_type = get_boss_timeline_type_from_tags(getattr(cast, "tags", []))
+    return {
+        "id": cast.spell_id,
+        "name": cast.name,
+        "time": parse_time(getattr(cast, "time", 0)),
+        "duration": getattr(cast, "duration", 0),
+        "color": getattr(cast, "color", "") or BOSS_TIMELINE_COLORS.get(event_type, BOSS_TIMELINE_COLORS["mech"]),
+        "icon": getattr(cast, "icon", ""),
+        "type": event_type,
+        "name_i18n": getattr(cast, "name_i18n", {}),
+    }
+
+
+def get_boss_timeline(boss: "RaidBoss") -> list[dict]:
+    """Markers shown on the boss row of the timeline.
+
+    Uses the `boss_timeline` attached to the boss, or its spells as fallback.
+    """
+    boss_timeline = getattr(boss, "boss_timeline", None)
+    if boss_timeline is not None:
+        return [serialize_boss_timeline_event(event) for event in boss_timeline]
+    return [serialize_boss_cast(cast) for cast in boss.spells]
@@ -0,0 +1,279 @@
+"""Channel to push the Progress of Tasks to the clients following them.
+
+Workers publish updates about a task (eg.: the status of each fight/player),
+and subscribers receive them as soon as they are published.
+
+Backends:
+    - "memory": only reaches subscribers within the same process (eg.: for local runs)
+    - "redis": Redis pub/sub (requires `redis`). Used by default, if `REDIS_URL` is set.
+
+Updates are plain dicts, with the same layout as the task info itself.
+eg.: {"status": "in-progress", "items": {"4_12": {"status": "done"}}}
+Subscribers merge them into the last known state, using `merge_update`.
+
+Workers still save snapshots of the task. Subscribers the updates can't reach
+pick those up, when re-reading the task. With a process-local backend ("memory"),
+that's the case for the API, as the workers run in their own processes.
+So the task is re-read every `LOCAL_REFRESH_INTERVAL` seconds.
+
+"""
+from __future__ import annotations
+
+# IMPORT STANDARD LIBRARIES
+import abc
+import asyncio
+import contextlib
+import json
+import os
+import typing
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# IMPORT LOCAL LIBRARIES
+from lorgs.logger import logger
+
+
+PROGRESS_BACKEND = os.getenv("TASK_PROGRESS_BACKEND") or ("redis" if os.getenv("REDIS_URL") else "memory")
+"""str: Name of the backend used to publish the progress. ("memory" or "redis")"""
+
+PROGRESS_INTERVAL = float(os.getenv("TASK_PROGRESS_INTERVAL") or 0.25)
+"""float: Seconds to collect updates, before they are published as a single message."""
+
+WATCH_TIMEOUT = 100
+"""int: Seconds after which watching a task is given up."""
+
+WATCH_REFRESH_INTERVAL = 10
+"""int: Seconds without any updates, after which the state is read again (in case the worker can't reach us)."""
+
+LOCAL_REFRESH_INTERVAL = 1
+"""int: Seconds between reading the state, if the backend can't reach other processes."""
+
+
+def get_channel(task_id: str) -> str:
+    return f"task_progress:{task_id}"
+
+
+def merge_update(state: dict[str, typing.Any], update: dict[str, typing.Any]) -> dict[str, typing.Any]:
+    """Apply an update to the state of a task. Returns a new dict."""
+    state = {**state, **{key: value for key, value in update.items() if key != "items"}}
+    if "items" in update:
+        items = dict(state.get("items") or {})
+        for key, item in update["items"].items():
+            items[key] = {**items.get(key, {}), **item}
+        state["items"] = items
+    return state
+
+
+################################################################################
+# Backends
+#
+
+
+class Broker(abc.ABC):
+    """Base Class for all Backends."""
+
+    is_local: typing.ClassVar[bool] = False
+    """True if the updates only reach subscribers in the same process."""
+
+    @abc.abstractmethod
+    def publish(self, task_id: str, update: dict[str, typing.Any]) -> None:
+        """Send an update to all subscribers of the task. Must not block the event loop."""
+
+    @abc.abstractmethod
+    def subscribe(self, task_id: str) -> typing.AsyncContextManager[asyncio.Queue]:
+        """Receive the updates of a task, while the context is active."""
+
+
+class MemoryBroker(Broker):
+    """Passes the updates to the subscribers in the same process."""
+
+    is_local = True
+
+    def __init__(self) -> None:
+        self.subscribers: defaultdict[str, set[tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = defaultdict(set)
+
+    def publish(self, task_id: str, update: dict[str, typing.Any]) -> None:
+        # publishers might run in another thread/loop than the subscribers
+        for loop, queue in list(self.subscribers.get(task_id, ())):
+            loop.call_soon_threadsafe(queue.put_nowait, update)
+
+    @contextlib.asynccontextmanager
+    async def subscribe(self, task_id: str) -> typing.AsyncIterator[asyncio.Queue]:
+        queue: asyncio.Queue = asyncio.Queue()
+        subscriber = (asyncio.get_running_loop(), queue)
+        self.subscribers[task_id].add(subscriber)
+        try:
+            yield queue
+        finally:
+            self.subscribers[task_id].discard(subscriber)
+            if not self.subscribers[task_id]:
+                del self.subscribers[task_id]
+
+
+class RedisBroker(Broker):
+    """Redis pub/sub. Reaches subscribers in any process connected to the same Redis."""
+
+    def __init__(self) -> None:
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="task-progress")
+        """Single thread to publish from, while an event loop is running (keeps the updates in order)."""
+
+    def send(self, channel: str, message: str) -> None:
+        from lorgs.models.base.redis import redis_client
+
+        redis_client.publish(channel, message)
+
+    def publish(self, task_id: str, update: dict[str, typing.Any]) -> None:
+        channel, message = get_channel(task_id), json.dumps(update)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return self.send(channel, message)  # nothing to block
+
+        def done(future: Future) -> None:
+            if future.exception():
+                logger.error("Failed to publish the progress of task %s", task_id, exc_info=future.exception())
+
+        self.executor.submit(self.send, channel, message).add_done_callback(done)
+
+    @contextlib.asynccontextmanager
+    async def subscribe(self, task_id: str) -> typing.AsyncIterator[asyncio.Queue]:
+        import redis.asyncio
+
+        from lorgs.models.base.redis import REDIS_URL
+
+        client = redis.asyncio.from_url(REDIS_URL)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(get_channel(task_id))
+
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def read() -> None:
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    queue.put_nowait(json.loads(message["data"]))
+
+        reader = asyncio.create_task(read())
+        try:
+            yield queue
+        finally:
+            reader.cancel()
+            await pubsub.reset()
+            await client.close()
+
+
+BROKERS: dict[str, typing.Type[Broker]] = {
+    "memory": MemoryBroker,
+    "redis": RedisBroker,
+}
+
+_broker: typing.Optional[Broker] = None
+
+
+def get_broker() -> Broker:
+    """The Broker for the configured backend (shared within the process)."""
+    global _broker
+    if _broker is None:
+        _broker = BROKERS[PROGRESS_BACKEND]()
+    return _broker
+
+
+################################################################################
+# Publish
+#
+
+
+class ProgressPublisher:
+    """Collects the updates of a task, to publish them in batches.
+
+    All updates within `interval` are merged into a single message,
+    with only the latest value for each item.
+    """
+
+    def __init__(self, task_id: str, broker: typing.Optional[Broker] = None, interval: float = PROGRESS_INTERVAL) -> None:
+        self.task_id = task_id
+        self.broker = broker or get_broker()
+        self.interval = interval
+
+        self.pending: dict[str, typing.Any] = {}
+        self._timer: typing.Optional[asyncio.TimerHandle] = None
+
+    def update(self, **update: typing.Any) -> None:
+        """Queue an update (eg.: `status="done"` or `items={"4_12": {"status": "done"}}`)."""
+        self.pending = merge_update(self.pending, update)
+        if self._timer:
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return self.flush()  # nothing to wait on
+        self._timer = loop.call_later(self.interval, self.flush)
+
+    def flush(self) -> None:
+        """Publish all queued updates right away."""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+        if not self.pending:
+            return
+        update, self.pending = self.pending, {}
+
+        try:
+            self.broker.publish(self.task_id, update)
+        except Exception:  # progress is best effort. The task itself still gets saved.
+            logger.exception("Failed to publish the progress of task %s", self.task_id)
+
+
+################################################################################
+# Subscribe
+#
+
+
+async def watch(
+    task_id: str,
+    get_state: typing.Callable[[], typing.Optional[dict[str, typing.Any]]],
+    is_finished: typing.Callable[[dict[str, typing.Any]], bool],
+    timeout: float = WATCH_TIMEOUT,
+    refresh_interval: typing.Optional[float] = None,
+) -> typing.AsyncGenerator[dict[str, typing.Any], None]:
+    """Yield the state of a task, and again after each update, until the task is finished.
+
+    Args:
+        get_state: reads the stored state of the task (None if it doesn't exist (yet))
+        is_finished: checks if a state is final
+        refresh_interval: seconds without updates, after which the state is read again.
+            Defaults to `WATCH_REFRESH_INTERVAL`, or `LOCAL_REFRESH_INTERVAL` for process-local backends.
+
+    """
+    broker = get_broker()
+    if refresh_interval is None:
+        refresh_interval = LOCAL_REFRESH_INTERVAL if broker.is_local else WATCH_REFRESH_INTERVAL
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+
+    # subscribe first, to not miss any updates published while reading the state
+    async with broker.subscribe(task_id) as updates:
+        state = get_state()
+        yield state or {"status": "not found"}
+
+        while not (state and is_finished(state)):
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                yield {"status": "timeout"}
+                return
+
+            try:
+                update = await asyncio.wait_for(updates.get(), timeout=min(refresh_interval, remaining))
+            except asyncio.TimeoutError:
+                new_state = get_state()
+                if not new_state or new_state == state:
+                    continue
+                state = new_state
+            else:
+                state = merge_update(state or {}, update)
+                while not updates.empty():  # coalesce anything else that arrived meanwhile
+                    state = merge_update(state, updates.get_nowait())
+
+            yield state
@@ -0,0 +1,272 @@
+"""Combine Queries for the same Report into a single Request.
+
+Most models load their data with a query in the form of:
+
+    reportData { report(code: "abc") { ... } }
+
+When many of those are run at the same time (eg.: loading all players of a
+ranking), `QueryBatch` collects them, and sends all queries for the same report
+as a single request, using one aliased `report`-field per query:
+
+    reportData {
+        q0: report(code: "abc") { ... }
+        q1: report(code: "abc") { ... }
+    }
+
+Each caller still gets the same result, as if its query had been run on its own.
+This includes errors: those are mapped back to the query (alias) they belong to,
+so a single private or missing report only fails its own query.
+The cache (if enabled) is used per query as well, so each part is served from and
+stored under its own single report form, no matter which other queries it got combined with.
+
+With `across_reports=True`, queries for different reports are combined as well
+(eg.: one small query for each report of a ranking). Those requests are capped
+by `BATCH_MAX_LENGTH`, to keep each document (and its cost) within limits.
+
+"""
+from __future__ import annotations
+
+# IMPORT STANDARD LIBRARIES
+import asyncio
+import re
+import typing
+from collections import defaultdict
+
+# IMPORT LOCAL LIBRARIES
+from lorgs.clients.wcl.client import ERROR_MESSAGE_INVALID_REPORT, WarcraftlogsClient
+from lorgs.clients.wcl.scheduler import Priority
+from lorgs.logger import logger
+
+
+BATCH_SIZE = 16
+"""int: Max number of queries combined into a single request."""
+
+BATCH_MAX_LENGTH = 20_000
+"""int: Max length of the combined query bodies in a single request (only used `across_reports`)."""
+
+RE_REPORT_QUERY = re.compile(
+    r"""^\s*reportData\s*\{\s*report\s*\(\s*code:\s*"(?P<code>[^"]+)"\s*\)\s*\{(?P<body>.*)\}\s*\}\s*$""",
+    re.DOTALL,
+)
+
+BatchKey = tuple[str, str, bool, int]
+"""(region, report code or "" when combining across reports, raise_errors, priority)"""
+
+BatchItem = tuple[str, str, "asyncio.Future[dict[str, typing.Any]]"]
+"""(report code, query body, future to receive the result)"""
+
+
+def build_report_query(code: str, *bodies: str) -> str:
+    """Build a query for a single report. Multiple bodies get their own alias each."""
+    return build_reports_query(*((code, body) for body in bodies))
+
+
+def build_reports_query(*items: tuple[str, str]) -> str:
+    """Build a query for any number of (report code, body)-pairs. Multiple bodies get their own alias each."""
+    if len(items) == 1:
+        code, body = items[0]
+        return f'reportData {{ report(code: "{code}") {{ {body} }} }}'
+
+    parts = "\n".join(f'q{i}: report(code: "{code}") {{ {body} }}' for i, (code, body) in enumerate(items))
+    return f"reportData {{ {parts} }}"
+
+
+def get_alias_errors(errors: list[dict[str, typing.Any]], aliases: list[str]) -> dict[str, list[dict[str, typing.Any]]]:
+    """Group the errors of a combined query by the alias in their path.
+
+    Errors which can't be mapped to any alias are listed under "".
+    eg.: {"path": ["reportData", "q1", "events"]} -> "q1"
+    """
+    grouped: dict[str, list[dict[str, typing.Any]]] = defaultdict(list)
+    for error in errors:
+        path = error.get("path") or []
+        alias = next((part for part in path if part in aliases), "")
+        grouped[alias].append(error)
+    return grouped
+
+
+class QueryBatch:
+    """Wraps a client, and combines queries for the same report.
+
+    Queries are collected until the running tasks have submitted theirs
+    (or `BATCH_SIZE` is reached). Any other query is passed through to the client.
+
+    Args:
+        across_reports: also combine queries for different reports
+
+    """
+
+    def __init__(
+        self,
+        client: "WarcraftlogsClient",
+        max_size: int = BATCH_SIZE,
+        across_reports: bool = False,
+        max_length: int = BATCH_MAX_LENGTH,
+    ) -> None:
+        self.client = client
+        self.max_size = max_size
+        self.across_reports = across_reports
+        self.max_length = max_length
+
+        self._pending: dict[BatchKey, list[BatchItem]] = defaultdict(list)
+        self._scheduled = False
+        self._tasks: set[asyncio.Future] = set()
+        """Running requests. Kept here, as the event loop only keeps weak references to them."""
+
+        # stats
+        self.num_queries = 0
+        self.num_requests = 0
+
+    def __repr__(self) -> str:
+        return f"QueryBatch(queries={self.num_queries}, requests={self.num_requests})"
+
+    def __getattr__(self, name: str) -> typing.Any:
+        # behave like the wrapped client for anything else
+        return getattr(self.client, name)
+
+    async def query(
+        self,
+        query: str,
+        raise_errors=True,
+        region: str = "",
+        priority: int = Priority.NORMAL,
+        cache: bool = True,
+    ) -> dict[str, typing.Any]:
+        match = RE_REPORT_QUERY.match(query or "")
+        if not (match and cache):
+            return await self.client.query(
+                query, raise_errors=raise_errors, region=region, priority=priority, cache=cache
+            )
+
+        code, body = match.group("code"), match.group("body")
+        key: BatchKey = ((region or "").upper(), "" if self.across_reports else code, raise_errors, priority)
+
+        # keep each document within its length limit
+        pending = self._pending[key]
+        if self.across_reports and pending and sum(len(b) for _, b, _ in pending) + len(body) > self.max_length:
+            self._flush_key(key)
+
+        future: asyncio.Future[dict[str, typing.Any]] = asyncio.get_running_loop().create_future()
+        self._pending[key].append((code, body, future))
+        self.num_queries += 1
+
+        if len(self._pending[key]) >= self.max_size:
+            self._flush_key(key)
+        elif not self._scheduled:
+            # runs once all tasks which are ready have submitted their queries
+            asyncio.get_running_loop().call_soon(self.flush)
+            self._scheduled = True
+
+        return await future
+
+    def flush(self) -> None:
+        """Send all pending queries."""
+        self._scheduled = False
+        for key in list(self._pending):
+            self._flush_key(key)
+
+    def _flush_key(self, key: BatchKey) -> None:
+        items = self._pending.pop(key, [])
+        if items:
+            task = asyncio.ensure_future(self._run(key, items))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, key: BatchKey, items: list[BatchItem]) -> None:
+        region, _, raise_errors, priority = key
+        url = self.client.get_url(region)
+        cache = self.client.cache
+
+        # serve each query from the cache first, and only combine the rest
+        if cache:
+            queries = [build_report_query(code, body) for code, body, _ in items]
+            try:
+                cached = await cache.fetch_many(url, queries)
+            except Exception:
+                logger.exception("[QueryBatch] failed to read the cache")
+                cached = [None for _ in items]
+
+            for (_, _, future), response in zip(items, cached):
+                if response is not None and not future.done():
+                    future.set_result(response.get("data", {}))
+            items = [item for item, response in zip(items, cached) if response is None]
+            if not items:
+                return
+
+        if len(items) == 1:
+            await self._run_single(key, items[0])
+            return
+
+        query = build_reports_query(*((code, body) for code, body, _ in items))
+        logger.debug("[QueryBatch] %d queries for reports %s", len(items), sorted({code for code, _, _ in items}))
+
+        self.num_requests += 1
+        try:
+            # errors are checked for each query on its own, so one bad report doesn't fail the others
+            response = await self.client.run_query(url, query, priority=priority, cache=False)
+            if response.get("error"):
+                self.client.raise_errors(response)
+        except Exception as e:
+            for _, _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        report_data = (response.get("data") or {}).get("reportData")
+        errors = get_alias_errors(response.get("errors") or [], [f"q{i}" for i in range(len(items))])
+
+        results: list[tuple[asyncio.Future, dict[str, typing.Any]]] = []
+        failed: list[tuple[asyncio.Future, list[dict[str, typing.Any]]]] = []
+        retry: list[BatchItem] = []
+        to_cache: list[tuple[str, dict[str, typing.Any]]] = []
+        for i, (code, body, future) in enumerate(items):
+            item_result = {"reportData": {"report": report_data.get(f"q{i}")}} if report_data else {}
+            item_errors = errors.get(f"q{i}", []) + errors.get("", [])
+
+            if not item_errors:
+                results.append((future, item_result))
+                if item_result:
+                    to_cache.append((build_report_query(code, body), {"data": item_result}))
+            elif not raise_errors:
+                results.append((future, item_result))
+            elif not region and any(error.get("message") == ERROR_MESSAGE_INVALID_REPORT for error in item_errors):
+                retry.append((code, body, future))  # might exist on a regional endpoint. The client checks those.
+            else:
+                failed.append((future, item_errors))
+
+        # stored before anyone gets a chance to modify the results
+        if cache and to_cache:
+            try:
+                await cache.store_many(url, to_cache)
+            except Exception:
+                logger.exception("[QueryBatch] failed to update the cache")
+
+        for future, item_result in results:
+            if not future.done():
+                future.set_result(item_result)
+
+        for future, item_errors in failed:
+            try:
+                self.client.raise_errors({"errors": item_errors})
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+
+        await asyncio.gather(*(self._run_single(key, item) for item in retry))
+
+    async def _run_single(self, key: BatchKey, item: BatchItem) -> None:
+        """Run a query on its own (errors, regional retries and the cache are handled by the client)."""
+        region, _, raise_errors, priority = key
+        code, body, future = item
+
+        self.num_requests += 1
+        try:
+            result = await self.client.query(
+                build_report_query(code, body), raise_errors=raise_errors, region=region, priority=priority
+            )
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        else:
+            if not future.done():
+                future.set_result(result)
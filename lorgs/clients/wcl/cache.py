@@ -0,0 +1,268 @@
+"""Persistent Cache for Warcraftlogs Query Responses.
+
+Most of the data we fetch never changes once a fight is over.
+eg.: the events of a fight in a report, will be the same for every spec ranking
+that includes the report. This Cache stores the responses on disk (in SQLite),
+keyed by the normalized query text and the endpoint the query was sent to.
+
+How long a response is kept depends on the type of query (see `get_ttl`).
+Queries combining several parts are only kept as long as their shortest lived part.
+The number of entries is limited by `MAX_ENTRIES`. The least recently used ones are evicted first.
+
+The DB is accessed from its own thread (see `ResponseCache.fetch/store`),
+to not block the event loop.
+
+"""
+from __future__ import annotations
+
+# IMPORT STANDARD LIBRARIES
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+import typing
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# IMPORT LOCAL LIBRARIES
+from lorgs.logger import logger
+
+
+CACHE_PATH = os.getenv("WCL_CACHE_PATH") or ""
+"""str: Location of the Cache-DB. The cache is disabled if not set."""
+
+WORLD_DATA_TTL = int(os.getenv("WCL_CACHE_WORLD_DATA_TTL") or 10 * 60)
+"""int: Seconds to keep rankings, which change constantly."""
+
+REPORT_TTL = int(os.getenv("WCL_CACHE_REPORT_TTL") or 10 * 60)
+"""int: Seconds to keep report overviews and rankings, which can still change (eg.: live-logging, re-ranked parses)."""
+
+MAX_ENTRIES = int(os.getenv("WCL_CACHE_MAX_ENTRIES") or 100_000)
+"""int: Number of responses to keep at most."""
+
+
+CACHE_RULES: list[tuple[re.Pattern, typing.Optional[int]]] = [
+    (re.compile(r"\brateLimitData\b"), 0),
+    (re.compile(r"^\s*worldData\b"), WORLD_DATA_TTL),
+    (re.compile(r"^\s*reportData\b"), REPORT_TTL),
+]
+"""Rules to determine how long to keep a response.
+
+The first matching rule wins.
+`None` keeps the response forever, 0 doesn't cache it at all.
+Queries which don't match any rule are not cached.
+Report queries are refined further, based on the fields they request (see `REPORT_FIELD_TTLS`).
+"""
+
+REPORT_FIELD_TTLS: dict[str, typing.Optional[int]] = {
+    # anything bound to a fight or time range within a report never changes.
+    "events": None,
+    "table": None,
+}
+"""Seconds to keep fields of a report. Any other field is kept for `REPORT_TTL`."""
+
+RE_REPORT = re.compile(r"\breport\s*\([^)]*\)\s*\{")
+RE_FIELD = re.compile(r"(\w+)(?:\s*:\s*(\w+))?")
+
+
+def normalize_query(query: str) -> str:
+    """Collapse all whitespace, so formatting differences don't affect the key."""
+    return re.sub(r"\s+", " ", query).strip()
+
+
+def get_report_fields(query: str) -> list[str]:
+    """Return the names of all fields requested from any report in the query (without aliases).
+
+    eg.: 'report(code: "a") { q: events(...) { data } fights { id } }' -> ["events", "fights"]
+    """
+    fields: list[str] = []
+    for match in RE_REPORT.finditer(query):
+        depth = 0
+        i = match.end()
+        while i < len(query):
+            char = query[i]
+            if char == '"':  # skip over strings (eg.: filter expressions)
+                i = query.find('"', i + 1)
+                if i == -1:
+                    break
+            elif char in "({":
+                depth += 1
+            elif char in ")}":
+                if depth == 0:  # end of the report
+                    break
+                depth -= 1
+            elif depth == 0 and (char.isalpha() or char == "_"):
+                field = RE_FIELD.match(query, i)
+                assert field  # always matches a word character
+                fields.append(field.group(2) or field.group(1))
+                i = field.end()
+                continue
+            i += 1
+    return fields
+
+
+def get_shortest_ttl(ttls: typing.Iterable[typing.Optional[int]]) -> typing.Optional[int]:
+    """Return the shortest TTL, where `None` means forever."""
+    limited = [ttl for ttl in ttls if ttl is not None]
+    return min(limited) if limited else None
+
+
+def get_ttl(query: str) -> typing.Optional[int]:
+    """Return the number of seconds to keep the response for the given query.
+
+    Report queries are kept as long as the shortest lived field requested from
+    any report. eg.: a batch of events and fights expires together with the fights.
+    """
+    query = query.strip()
+    for pattern, ttl in CACHE_RULES:
+        if pattern.search(query):
+            break
+    else:
+        return 0
+
+    fields = get_report_fields(query) if ttl else []
+    if fields:
+        return get_shortest_ttl(REPORT_FIELD_TTLS.get(field, REPORT_TTL) for field in fields)
+    return ttl
+
+
+class ResponseCache:
+    """Stores compressed query responses in a SQLite-DB."""
+
+    def __init__(self, path: typing.Union[str, Path], max_entries: int = MAX_ENTRIES) -> None:
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                created REAL NOT NULL,
+                expires REAL,
+                body BLOB NOT NULL,
+                accessed REAL NOT NULL DEFAULT 0
+            )
+            """
+        )
+        columns = [row[1] for row in self.db.execute("PRAGMA table_info(responses)")]
+        if "accessed" not in columns:  # created before the entries were evicted
+            self.db.execute("ALTER TABLE responses ADD COLUMN accessed REAL NOT NULL DEFAULT 0")
+        self.db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self.db.commit()
+
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="wcl-cache")
+        """Single thread used by `fetch`/`store`, to keep the DB access off the event loop."""
+
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self) -> str:
+        return f"ResponseCache(path={self.path})"
+
+    @staticmethod
+    def get_key(url: str, query: str) -> str:
+        text = f"{url}\n{normalize_query(query)}"
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get(self, url: str, query: str) -> typing.Optional[dict[str, typing.Any]]:
+        """Return the cached response, or None if there is no (valid) entry."""
+        if get_ttl(query) == 0:
+            return None
+
+        key = self.get_key(url, query)
+        row = self.db.execute("SELECT expires, body FROM responses WHERE key = ?", (key,)).fetchone()
+        if not row or (row[0] is not None and row[0] < time.time()):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key))
+        self.db.commit()
+        return json.loads(zlib.decompress(row[1]))  # type: ignore
+
+    def set(self, url: str, query: str, response: dict[str, typing.Any]) -> None:
+        """Store a response, if the query is cacheable."""
+        ttl = get_ttl(query)
+        if ttl == 0:
+            return
+
+        now = time.time()
+        expires = None if ttl is None else now + ttl
+        body = zlib.compress(json.dumps(response, separators=(",", ":")).encode("utf-8"))
+        self.db.execute(
+            "INSERT OR REPLACE INTO responses (key, created, expires, body, accessed) VALUES (?, ?, ?, ?, ?)",
+            (self.get_key(url, query), now, expires, body, now),
+        )
+        self.db.commit()
+
+    async def fetch(self, url: str, query: str) -> typing.Optional[dict[str, typing.Any]]:
+        """Same as `get`, but runs in the cache thread."""
+        [response] = await self.fetch_many(url, [query])
+        return response
+
+    async def store(self, url: str, query: str, response: dict[str, typing.Any]) -> None:
+        """Same as `set`, but runs in the cache thread."""
+        await self.store_many(url, [(query, response)])
+
+    async def fetch_many(self, url: str, queries: list[str]) -> list[typing.Optional[dict[str, typing.Any]]]:
+        """Return the cached response (or None) for each query. Reads all of them in a single trip to the cache thread."""
+        if all(get_ttl(query) == 0 for query in queries):
+            return [None for _ in queries]
+
+        def run() -> list[typing.Optional[dict[str, typing.Any]]]:
+            return [self.get(url, query) for query in queries]
+
+        return await asyncio.get_running_loop().run_in_executor(self.executor, run)
+
+    async def store_many(self, url: str, responses: list[tuple[str, dict[str, typing.Any]]]) -> None:
+        """Store multiple (query, response)-pairs, in a single trip to the cache thread."""
+        responses = [(query, response) for query, response in responses if get_ttl(query) != 0]
+        if not responses:
+            return
+
+        def run() -> None:
+            for query, response in responses:
+                self.set(url, query, response)
+            self.evict()
+
+        await asyncio.get_running_loop().run_in_executor(self.executor, run)
+
+    def purge(self) -> int:
+        """Delete all expired entries. Returns the number of deleted entries."""
+        cursor = self.db.execute("DELETE FROM responses WHERE expires IS NOT NULL AND expires < ?", (time.time(),))
+        self.db.commit()
+        logger.debug("[Cache] purged %d entries", cursor.rowcount)
+        return cursor.rowcount + self.evict()
+
+    def evict(self) -> int:
+        """Delete the least recently used entries above `max_entries`. Returns the number of deleted entries."""
+        (count,) = self.db.execute("SELECT COUNT(*) FROM responses").fetchone()
+        if count <= self.max_entries:
+            return 0
+
+        cursor = self.db.execute(
+            "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed LIMIT ?)",
+            (count - self.max_entries,),
+        )
+        self.db.commit()
+        logger.debug("[Cache] evicted %d entries", cursor.rowcount)
+        return cursor.rowcount
+
+    def clear(self) -> None:
+        self.db.execute("DELETE FROM responses")
+        self.db.commit()
+
+    def metrics(self) -> dict[str, typing.Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0,
+        }
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 # IMPORT STANDARD LIBRARIES
 import asyncio
+import copy
 import os
 import typing
 
@@ -11,6 +12,8 @@ import typing
 import aiohttp
 
 # IMPORT LOCAL LIBRARIES
+from lorgs.clients.wcl.cache import CACHE_PATH, ResponseCache
+from lorgs.clients.wcl.scheduler import RATE_LIMIT_PAUSE, RATE_LIMIT_QUERY, Priority, RequestScheduler
 from lorgs.logger import logger, timeit
 
 
@@ -28,6 +31,9 @@ T = typing.TypeVar("T", bound="BaseClient")
 CONCURRENT_CONNECTIONS = int(os.getenv("CONCURRENT_CONNECTIONS") or 10)
 """int: Number of parallel Requests."""
 
+RATE_LIMIT_RETRIES = 3
+"""int: Number of times a query is retried after being rate limited (429)."""
+
 
 class BaseClient:
 
@@ -109,6 +115,18 @@ class WarcraftlogsClient(BaseClient):
         logger.info("NEW CLIENT: %s", self.client_id)
         self._num_queries = 0
 
+        self.scheduler = RequestScheduler(max_concurrency=CONCURRENT_CONNECTIONS)
+        """Paces all queries based on the remaining rate limit points."""
+
+        self.cache: typing.Optional[ResponseCache] = ResponseCache(CACHE_PATH) if CACHE_PATH else None
+        """Persistent cache for query responses. Disabled unless `WCL_CACHE_PATH` is set."""
+
+        self._in_flight: dict[tuple[str, str], list[asyncio.Future]] = {}
+        """(url, query) -> futures of callers waiting for the same query, which is already running."""
+
+        self.num_deduplicated = 0
+        """Number of queries which have been served by an identical query already running."""
+
     ################################
     #   Connection
     #
@@ -177,24 +195,122 @@ class WarcraftlogsClient(BaseClient):
                 # print(query)
                 raise ValueError(msg)
 
-    async def query(self, query: str, raise_errors=True, region: str = "") -> dict[str, typing.Any]:
+    def get_metrics(self) -> dict[str, typing.Any]:
+        """Live metrics about the rate limit budget, queued queries and the cache."""
+        metrics = self.scheduler.metrics()
+        metrics["deduplicated"] = self.num_deduplicated
+        metrics["in_flight"] = len(self._in_flight)
+        if self.cache:
+            metrics["cache"] = self.cache.metrics()
+        return metrics
+
+    def get_url(self, region: str = "") -> str:
+        """The endpoint to send queries for the given region to."""
+        regional_urls = {
+            "CN": self.URL_API_CN,
+            "KR": self.URL_API_KR,
+        }
+        return regional_urls.get((region or "").upper(), self.URL_API)
+
+    async def run_query(
+        self, url: str, query: str, priority: int = Priority.NORMAL, cache: bool = True
+    ) -> dict[str, typing.Any]:
+        """Run a single query. Identical queries running at the same time are only sent once.
+
+        Each caller gets its own copy of the result.
+        """
+        key = (url, query)
+        waiters = self._in_flight.get(key)
+        if waiters is not None:
+            self.num_deduplicated += 1
+            future = asyncio.get_running_loop().create_future()
+            waiters.append(future)
+            result = await future
+            if result is None:  # the first caller got cancelled. So we have to run it ourself.
+                return await self.run_query(url, query, priority=priority, cache=cache)
+            return result
+
+        self._in_flight[key] = waiters = []
+        try:
+            result = await self._run_query(url, query, priority=priority, cache=cache)
+        except asyncio.CancelledError:
+            for future in waiters:
+                if not future.done():
+                    future.set_result(None)
+            raise
+        except Exception as e:
+            for future in waiters:
+                if not future.done():
+                    future.set_exception(e)
+            raise
+        else:
+            for future in waiters:
+                if not future.done():
+                    future.set_result(copy.deepcopy(result))
+            return result
+        finally:
+            self._in_flight.pop(key, None)
+
+    async def _run_query(
+        self, url: str, query: str, priority: int = Priority.NORMAL, cache: bool = True
+    ) -> dict[str, typing.Any]:
+        """Run a single query, as soon as the scheduler has a slot available.
+
+        The current rate limit status is requested alongside each query,
+        to keep the scheduler up to date without any extra requests.
+        Queries which get rate limited anyway are retried after the scheduler paused.
+
+        Responses are served from/stored in the cache, if enabled.
+        Callers which cache the parts of combined queries themselves, can skip it (`cache=False`).
+
+        """
+        response_cache = self.cache if cache else None
+        cached = await response_cache.fetch(url, query) if response_cache else None
+        if cached is not None:
+            return cached
+
+        gql_query = f"query {{ {query} {RATE_LIMIT_QUERY} }}"
+
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            ticket = await self.scheduler.acquire(query, priority=priority)
+            rate_info = None
+            try:
+                result = await super().query(url, gql_query)
+            except aiohttp.ClientResponseError as e:
+                if e.status != 429 or attempt >= RATE_LIMIT_RETRIES:
+                    raise
+
+                retry_after = (e.headers or {}).get("Retry-After") or ""
+                self.scheduler.pause(float(retry_after) if retry_after.isdigit() else RATE_LIMIT_PAUSE)
+            else:
+                rate_info = (result.get("data") or {}).pop("rateLimit", None)
+                if response_cache and result.get("data") and not result.get("errors"):
+                    await response_cache.store(url, query, result)
+                return result  # type: ignore
+            finally:
+                self.scheduler.release(ticket, rate_info)
+
+        return {}  # not reachable. The last attempt either returns or raises.
+
+    async def query(
+        self,
+        query: str,
+        raise_errors=True,
+        region: str = "",
+        priority: int = Priority.NORMAL,
+        cache: bool = True,
+    ) -> dict[str, typing.Any]:
 
         # Format Inputs
         if not query:
             return {}
-        gql_query = f"query {{ {query} }}"
 
         # 1. Select URL
-        region = (region or "").upper()
-        regional_urls = {
-            "CN": self.URL_API_CN,
-            "KR": self.URL_API_KR,
-        }
-        url = regional_urls.get(region, self.URL_API)
+        url = self.get_url(region)
 
         try:
             # 2. Run
-            result = await super().query(url, gql_query)
+            result = await self.run_query(url, query, priority=priority, cache=cache)
 
             # Check for Errors
             if raise_errors:
@@ -205,10 +321,10 @@ class WarcraftlogsClient(BaseClient):
         except InvalidReport:
             # 3. Retry regional FF Logs endpoints when a report is absent on the global endpoint.
             if not region and url == self.URL_API:
-                for retry_region, retry_url in regional_urls.items():
+                for retry_region in ("CN", "KR"):
                     try:
                         logger.info("[WCL] Report not found on Global. Retrying on %s endpoint...", retry_region)
-                        result = await super().query(retry_url, gql_query)
+                        result = await self.run_query(self.get_url(retry_region), query, priority=priority, cache=cache)
 
                         if raise_errors:
                             self.raise_errors(result)
@@ -218,15 +334,16 @@ class WarcraftlogsClient(BaseClient):
                         continue
             raise
 
-    async def multiquery(self, queries: list[str], raise_errors=True) -> list[typing.Any]:
+    async def multiquery(self, queries: list[str], raise_errors=True, priority: int = Priority.NORMAL) -> list[typing.Any]:
         """Execute a list of queries as a batch.
 
         Args:
             queries(list[str]): the queries to run
+            priority(int, optional): scheduler priority for all queries
 
         Returns:
             data[object]: the results in the same order
 
         """
-        tasks = [self.query(query, raise_errors=raise_errors) for query in queries]
+        tasks = [self.query(query, raise_errors=raise_errors, priority=priority) for query in queries]
         return await asyncio.gather(*tasks)  # type: ignore
@@ -9,7 +9,7 @@ from .fight_rankings import FightRankings, FightRankingsFight, FightRankingsItem
 from .query import Query
 from .report_actor import ReportActor
 from .report_data import Report, ReportData
-from .report_events import ReportEvent
+from .report_events import AnyReportEvent, FastReportEvent, ReportEvent
 from .report_fight import ReportFight
 from .report_master_data import ReportMasterData
 from .report_summary import DeathEvent, ReportSummary
@@ -1,3 +1,6 @@
+# IMPORT STANDARD LIBRARIES
+import typing
+
 # IMPORT THIRD PARTY LIBRARIES
 from pydantic import BaseModel, Field, AliasChoices
 
@@ -18,3 +21,48 @@ class ReportEvent(BaseModel):
     abilityGameID: int = Field(0, validation_alias=AliasChoices("abilityID", "abilityGameID"))
 
     fight: int = 0
+
+
+class FastReportEvent:
+    """Lightweight version of `ReportEvent`, for the hot path of processing casts.
+
+    Built straight from the API response, without any validation.
+    Used for fights with thousands of events, where validating each one adds up.
+    """
+
+    __slots__ = ("timestamp", "type", "sourceID", "targetID", "abilityGameID", "fight")
+
+    def __init__(
+        self,
+        timestamp: int = 0,
+        type: str = "cast",
+        sourceID: int = 0,
+        targetID: int = 0,
+        abilityGameID: int = 0,
+        fight: int = 0,
+    ) -> None:
+        self.timestamp = timestamp
+        self.type = type
+        self.sourceID = sourceID
+        self.targetID = targetID
+        self.abilityGameID = abilityGameID
+        self.fight = fight
+
+    def __repr__(self) -> str:
+        return f"FastReportEvent(type={self.type}, ability={self.abilityGameID}, ts={self.timestamp})"
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FastReportEvent":
+        get = data.get
+        return cls(
+            get("timestamp", 0),
+            get("type", "cast"),
+            get("sourceID", 0),
+            get("targetID", 0),
+            data["abilityID"] if "abilityID" in data else get("abilityGameID", 0),
+            get("fight", 0),
+        )
+
+
+AnyReportEvent = typing.Union[ReportEvent, FastReportEvent]
+"""Either kind of Event. Both share the same attributes, so all hooks processing events accept them."""
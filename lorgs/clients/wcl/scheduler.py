@@ -0,0 +1,322 @@
+"""Schedule Requests against the Warcraftlogs Rate Limit.
+
+Warcraftlogs charges "points" per query, with a fixed budget per hour.
+The `RequestScheduler` keeps track of that budget based on the `rateLimitData`
+returned alongside each query, estimates the cost of each new query based on
+previous queries of the same kind and hands out slots in priority order.
+
+Requests run as fast as the budget allows. Once the budget for the current hour
+is used up, any further requests are held back until the budget resets,
+instead of running into 429-errors.
+
+"""
+from __future__ import annotations
+
+# IMPORT STANDARD LIBRARIES
+import asyncio
+import heapq
+import itertools
+import os
+import re
+import time
+import typing
+
+# IMPORT LOCAL LIBRARIES
+from lorgs.logger import logger
+
+
+RATE_LIMIT_RESERVE = int(os.getenv("WCL_RATE_LIMIT_RESERVE") or 50)
+"""int: Points kept in reserve, to absorb errors in the cost estimates."""
+
+RATE_LIMIT_PAUSE = 30
+"""int: Seconds to pause all requests after a 429, if the response doesn't tell us how long to wait."""
+
+DEFAULT_QUERY_COST = 5.0
+"""float: Cost assumed for queries of a kind we haven't seen before."""
+
+COST_SMOOTHING = 0.2
+"""float: Weight of new samples in the moving average of the query costs."""
+
+RATE_LIMIT_QUERY = """
+    rateLimit: rateLimitData
+    {
+        pointsSpentThisHour
+        limitPerHour
+        pointsResetIn
+    }
+"""
+"""str: Query part added to each query, to keep track of the budget without extra requests."""
+
+
+# fields which have an significant impact on the cost of a query.
+COST_FIELDS = ("characterRankings", "fightRankings", "rankings", "events", "table", "masterData", "fights")
+RE_COST_FIELDS = re.compile(r"\b(%s)\s*[({]" % "|".join(COST_FIELDS))
+RE_ROOT_FIELD = re.compile(r"^\s*(?:query\s*)?{?\s*(\w+)")
+
+
+class Priority:
+    """Priorities for queued Requests. Lower values are run first."""
+
+    HIGH = 0
+    """eg.: Rankings, which are required to know what else to load."""
+
+    NORMAL = 10
+
+    LOW = 20
+    """eg.: optional enrichment of already loaded data."""
+
+
+def get_query_kind(query: str) -> str:
+    """Classify a query by the fields relevant to its cost.
+
+    Example:
+        >>> get_query_kind('reportData { report(code: "abc") { events(...) {data} } }')
+        "reportData:events"
+
+    """
+    match = RE_ROOT_FIELD.match(query)
+    root = match.group(1) if match else ""
+    fields = sorted(set(RE_COST_FIELDS.findall(query)))
+    return ":".join([root, *fields])
+
+
+class Ticket:
+    """A single Request, waiting for or holding a slot."""
+
+    def __init__(self, kind: str, cost: float, priority: int = Priority.NORMAL) -> None:
+        self.kind = kind
+        self.cost = cost
+        self.priority = priority
+        self.queued_at = time.monotonic()
+        self.started_at = 0.0
+
+    def __repr__(self) -> str:
+        return f"Ticket(kind={self.kind}, cost={self.cost:.1f}, priority={self.priority})"
+
+
+class RequestScheduler:
+    """Hands out slots to run requests, based on concurrency and the remaining points."""
+
+    def __init__(self, max_concurrency: int = 10, reserve: int = RATE_LIMIT_RESERVE) -> None:
+        self.max_concurrency = max_concurrency
+        self.reserve = reserve
+
+        # budget, as last reported by Warcraftlogs
+        self.limit_per_hour = 0
+        self.points_spent = 0.0
+        """Points spent in the current hour. Includes estimates for requests completed without a budget update."""
+        self.points_observed = 0.0
+        """Points spent in the current hour, as last reported by Warcraftlogs."""
+        self.reset_at = 0.0
+        """Monotonic time at which the budget resets."""
+
+        self.paused_until = 0.0
+        """Monotonic time until which no new requests are started (eg.: after a 429)."""
+
+        # moving average of the cost per query kind
+        self.costs: dict[str, float] = {}
+
+        self._inflight: set[Ticket] = set()
+        self._unattributed: list[Ticket] = []
+        """Tickets completed since the last budget update."""
+
+        self._queue: list[tuple[int, int, Ticket, asyncio.Future]] = []
+        self._counter = itertools.count()
+        self._timer: typing.Optional[asyncio.TimerHandle] = None
+
+        # stats
+        self.num_requests = 0
+        self.points_total = 0.0
+        """Points spent since the scheduler was created, across all hours."""
+        self.num_rate_limited = 0
+        self.wait_time = 0.0
+
+    ############################################################################
+    # Budget
+    #
+
+    @property
+    def has_budget_info(self) -> bool:
+        return self.limit_per_hour > 0
+
+    @property
+    def reset_in(self) -> float:
+        """Seconds until the budget resets."""
+        return max(self.reset_at - time.monotonic(), 0)
+
+    @property
+    def points_reserved(self) -> float:
+        """Points (estimated to be) used by the currently running requests."""
+        return sum(ticket.cost for ticket in self._inflight)
+
+    @property
+    def points_left(self) -> float:
+        """Points left in the current hour, minus the ones already reserved."""
+        if not self.has_budget_info:
+            return float("inf")
+        return self.limit_per_hour - self.points_spent - self.points_reserved
+
+    def estimate_cost(self, kind: str) -> float:
+        return self.costs.get(kind, DEFAULT_QUERY_COST)
+
+    def update_costs(self, spent: float) -> None:
+        """Attribute the `spent` points to the tickets completed since the last update.
+
+        If multiple requests completed in between, the points are split based on their estimates.
+        This is only an approximation, as requests which are still running might already be included.
+        """
+        tickets, self._unattributed = self._unattributed, []
+        if not tickets or spent < 0:
+            return
+
+        total_estimate = sum(ticket.cost for ticket in tickets) or 1
+        for ticket in tickets:
+            cost = spent * ticket.cost / total_estimate
+            old_cost = self.costs.get(ticket.kind)
+            self.costs[ticket.kind] = cost if old_cost is None else old_cost + COST_SMOOTHING * (cost - old_cost)
+
+    def update(self, rate_info: dict[str, typing.Any]) -> None:
+        """Update the budget from a `rateLimitData`-response."""
+        if not rate_info:
+            return
+
+        limit_per_hour = int(rate_info.get("limitPerHour") or 0)
+        points_spent = float(rate_info.get("pointsSpentThisHour") or 0)
+        reset_at = time.monotonic() + float(rate_info.get("pointsResetIn") or 0)
+
+        if points_spent >= self.points_observed:
+            spent = points_spent - self.points_observed
+        elif reset_at > self.reset_at + 60:
+            # a new hour has started
+            spent = points_spent
+        else:
+            # response which got overtaken by a more recent one
+            return
+
+        self.update_costs(spent)
+        if self.has_budget_info:  # the first update also contains points spent before we started
+            self.points_total += spent
+        self.limit_per_hour = limit_per_hour
+        self.points_spent = points_spent
+        self.points_observed = points_spent
+        self.reset_at = reset_at
+        self._dispatch()
+
+    def pause(self, seconds: float = RATE_LIMIT_PAUSE) -> None:
+        """Hold back all new requests for the given number of seconds."""
+        self.num_rate_limited += 1
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        logger.warning("[Scheduler] rate limited. pausing requests for %.0fs", seconds)
+        self._dispatch()
+
+    ############################################################################
+    # Slots
+    #
+
+    def get_wait_time(self, ticket: Ticket) -> float:
+        """Seconds until the `ticket` could be started. 0 if it can start right away.
+
+        Returns -1 if we need to wait for running requests to complete first.
+        """
+        now = time.monotonic()
+        if self.paused_until > now:
+            return self.paused_until - now
+
+        if len(self._inflight) >= self.max_concurrency:
+            return -1
+
+        if not self.has_budget_info:
+            # until we know the budget, only run a single request at a time
+            return -1 if self._inflight else 0
+
+        if self.reset_at <= now:
+            # the budget has been reset. Assume we got our full budget back,
+            # until the next response tells us otherwise.
+            self.points_spent = 0
+            self.points_observed = 0
+            self.reset_at = now + 60 * 60
+
+        if self.points_left - self.reserve >= ticket.cost:
+            return 0
+
+        if self._inflight:
+            return -1  # running requests will update the budget
+
+        return self.reset_in
+
+    def _dispatch(self) -> None:
+        """Start as many queued tickets as the budget allows."""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._queue:
+            _, _, ticket, future = self._queue[0]
+            if future.done():  # cancelled while waiting
+                heapq.heappop(self._queue)
+                continue
+
+            wait_time = self.get_wait_time(ticket)
+            if wait_time < 0:
+                return  # wait for running requests
+            if wait_time > 0:
+                self._timer = future.get_loop().call_later(wait_time, self._dispatch)
+                return
+
+            heapq.heappop(self._queue)
+            ticket.started_at = time.monotonic()
+            self.wait_time += ticket.started_at - ticket.queued_at
+            self._inflight.add(ticket)
+            future.set_result(ticket)
+
+    async def acquire(self, query: str, priority: int = Priority.NORMAL) -> Ticket:
+        """Wait for a slot to run the given query."""
+        kind = get_query_kind(query)
+        ticket = Ticket(kind=kind, cost=self.estimate_cost(kind), priority=priority)
+
+        future: asyncio.Future[Ticket] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._counter), ticket, future))
+        self._dispatch()
+
+        try:
+            return await future
+        except asyncio.CancelledError:
+            if ticket in self._inflight:
+                self.release(ticket)
+            raise
+
+    def release(self, ticket: Ticket, rate_info: typing.Optional[dict[str, typing.Any]] = None) -> None:
+        """Return the slot, and update the budget from the response."""
+        self._inflight.discard(ticket)
+        self.num_requests += 1
+
+        if rate_info:
+            self._unattributed.append(ticket)
+            self.update(rate_info)
+        else:
+            # no info from the server. Assume our estimate was right
+            self.points_spent += ticket.cost
+        self._dispatch()
+
+    ############################################################################
+    # Metrics
+    #
+
+    def metrics(self) -> dict[str, typing.Any]:
+        """Return the current state of the budget and queue."""
+        reset_in = self.reset_in
+        points_left = self.points_left if self.has_budget_info else 0
+        return {
+            "limit_per_hour": self.limit_per_hour,
+            "points_spent": round(self.points_spent, 1),
+            "points_left": round(points_left, 1),
+            "reset_in": round(reset_in),
+            "sustainable_rate": round(points_left / reset_in, 2) if reset_in else 0,
+            "inflight": len(self._inflight),
+            "queued": len(self._queue),
+            "requests": self.num_requests,
+            "points_total": round(self.points_total, 1),
+            "rate_limited": self.num_rate_limited,
+            "wait_time": round(self.wait_time, 1),
+            "costs": {kind: round(cost, 2) for kind, cost in sorted(self.costs.items())},
+        }
@@ -0,0 +1,228 @@
+"""Compression for stored JSON (Rankings in S3 and the files written by the updater).
+
+Spec Rankings contain thousands of very similar cast entries, so they
+compress extremely well. Each `Codec` wraps one compression format:
+
+    - "identity": no compression
+    - "gzip": supported everywhere (browsers, S3, CDNs).
+    - "br": brotli. Better ratio, supported by all browsers. (requires `brotli`)
+    - "zstd": zstandard. Fastest, and can use a dictionary trained on
+              existing rankings (see `train_zstd_dictionary`). (requires `zstandard`)
+
+`decode` detects the format of compressed data on its own, so readers don't
+need to know which codec has been used to store it.
+
+"""
+from __future__ import annotations
+
+# IMPORT STANDARD LIBRARIES
+import gzip
+import importlib.util
+import json
+import os
+import typing
+from pathlib import Path
+
+
+# optional third party libraries. Only imported when a codec using them is used.
+HAS_BROTLI = importlib.util.find_spec("brotli") is not None
+HAS_ZSTANDARD = importlib.util.find_spec("zstandard") is not None
+
+
+ZSTD_DICTIONARY_PATH = os.getenv("ZSTD_DICTIONARY_PATH") or ""
+"""str: Path to a zstd dictionary. Required to read anything written with it."""
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+class Codec:
+    """Compression Format for stored data."""
+
+    name: str = "identity"
+    """Name of the Codec. Also used as HTTP Content-Encoding."""
+
+    extension: str = ""
+    """File extension. eg.: ".gz"."""
+
+    magic: bytes = b""
+    """Bytes at the start of the encoded data, to detect the format."""
+
+    level: int = 0
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(level={self.level})"
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    def encode(self, data: bytes) -> bytes:
+        return data
+
+    def decode(self, data: bytes) -> bytes:
+        return data
+
+
+class GzipCodec(Codec):
+    name = "gzip"
+    extension = ".gz"
+    magic = GZIP_MAGIC
+
+    def __init__(self, level: int = 6) -> None:
+        self.level = level
+
+    def encode(self, data: bytes) -> bytes:
+        # mtime=0: same input -> same output. Keeps ETags stable.
+        return gzip.compress(data, compresslevel=self.level, mtime=0)
+
+    def decode(self, data: bytes) -> bytes:
+        return gzip.decompress(data)
+
+
+class BrotliCodec(Codec):
+    name = "br"
+    extension = ".br"
+
+    def __init__(self, level: int = 9) -> None:
+        self.level = level
+
+    @property
+    def available(self) -> bool:
+        return HAS_BROTLI
+
+    def encode(self, data: bytes) -> bytes:
+        import brotli
+
+        compress: typing.Callable[..., bytes] = brotli.compress
+        return compress(data, quality=self.level)
+
+    def decode(self, data: bytes) -> bytes:
+        import brotli
+
+        decompress: typing.Callable[[bytes], bytes] = brotli.decompress
+        return decompress(data)
+
+
+class ZstdCodec(Codec):
+    name = "zstd"
+    extension = ".zst"
+    magic = ZSTD_MAGIC
+
+    def __init__(self, level: int = 10, dictionary_path: str = ZSTD_DICTIONARY_PATH) -> None:
+        self.level = level
+        self.dictionary_path = dictionary_path
+        self._dictionary: typing.Any = None
+
+    @property
+    def available(self) -> bool:
+        return HAS_ZSTANDARD
+
+    @property
+    def dictionary(self) -> typing.Any:
+        if self._dictionary is None and self.dictionary_path:
+            import zstandard
+
+            self._dictionary = zstandard.ZstdCompressionDict(Path(self.dictionary_path).read_bytes())
+        return self._dictionary
+
+    def encode(self, data: bytes) -> bytes:
+        import zstandard
+
+        compress: typing.Callable[[bytes], bytes] = zstandard.ZstdCompressor(level=self.level, dict_data=self.dictionary).compress
+        return compress(data)
+
+    def decode(self, data: bytes) -> bytes:
+        import zstandard
+
+        # the size is stored in the frame header, so no `max_output_size` is required
+        decompress: typing.Callable[[bytes], bytes] = zstandard.ZstdDecompressor(dict_data=self.dictionary).decompress
+        return decompress(data)
+
+
+CODECS: dict[str, Codec] = {codec.name: codec for codec in (Codec(), GzipCodec(), BrotliCodec(), ZstdCodec())}
+"""All Codecs by name."""
+
+
+def get_codec(name: str) -> Codec:
+    """Get a Codec by name. Falls back to no compression for unknown or unavailable codecs."""
+    codec = CODECS.get(name or "identity")
+    if codec is None or not codec.available:
+        return CODECS["identity"]
+    return codec
+
+
+def detect(data: bytes) -> Codec:
+    """Get the Codec used to encode the given data."""
+    for codec in CODECS.values():
+        if codec.magic and data.startswith(codec.magic):
+            return codec
+    return CODECS["identity"]
+
+
+def decode(data: bytes, encoding: str = "") -> bytes:
+    """Decode data in any format. `encoding` can be given if known (eg.: from a Content-Encoding header)."""
+    codec = CODECS.get(encoding) if encoding else None
+    return (codec or detect(data)).decode(data)
+
+
+################################################################################
+# Files
+#
+
+
+def dump_json(data: typing.Any) -> bytes:
+    """Serialize data the same way for all files."""
+    return json.dumps(data, ensure_ascii=False, default=str).encode("utf-8")
+
+
+def write_file(path: typing.Union[str, Path], data: bytes, codec: str = "identity", siblings: typing.Iterable[str] = ()) -> Path:
+    """Write a file, compressed with the given codec.
+
+    Args:
+        path: path without the extension of the codec. eg.: "data/ranking.json"
+        data: content to write
+        codec: codec to use for the main file
+        siblings: additional codecs to write precompressed copies with.
+            eg.: ["gzip", "br"] for "data/ranking.json.gz" and "data/ranking.json.br"
+
+    Returns:
+        the path of the main file
+
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    main_codec = get_codec(codec)
+    main_path = path.with_name(path.name + main_codec.extension)
+    main_path.write_bytes(main_codec.encode(data))
+
+    for name in siblings:
+        sibling_codec = get_codec(name)
+        if sibling_codec is main_codec or not sibling_codec.extension:
+            continue  # unavailable, or the same as the main file
+        path.with_name(path.name + sibling_codec.extension).write_bytes(sibling_codec.encode(data))
+
+    return main_path
+
+
+def read_file(path: typing.Union[str, Path]) -> bytes:
+    """Read a file written by `write_file`. The codec is detected by the extension or content."""
+    path = Path(path)
+    codec = next((codec for codec in CODECS.values() if codec.extension and path.suffix == codec.extension), None)
+    data = path.read_bytes()
+    return codec.decode(data) if codec else decode(data)
+
+
+def train_zstd_dictionary(paths: typing.Iterable[typing.Union[str, Path]], size: int = 112_640) -> bytes:
+    """Train a zstd dictionary on existing files (eg.: all current spec rankings).
+
+    Store the result somewhere and point `ZSTD_DICTIONARY_PATH` to it.
+    """
+    if not HAS_ZSTANDARD:
+        raise RuntimeError("zstandard is not installed")
+    import zstandard
+
+    samples = [read_file(path) for path in paths]
+    dictionary: bytes = zstandard.train_dictionary(size, samples).as_bytes()
+    return dictionary
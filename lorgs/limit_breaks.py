@@ -2,8 +2,11 @@
 
 from __future__ import annotations
 
+import functools
+
 from lorgs.models.wow_spell import SpellTag
 from lorgs.models.wow_spell import WowSpell
+from lorgs.models.wow_spell import build_spell_query
 
 
 LIMIT_BREAKS = [
@@ -46,3 +49,9 @@ LIMIT_BREAK_SPELL_IDS = set(LIMIT_BREAK_SPELL_BY_ID)
 
 def is_limit_break_spell_id(spell_id: int) -> bool:
     return spell_id in LIMIT_BREAK_SPELL_IDS
+
+
+@functools.cache
+def get_limit_break_query() -> str:
+    """Filter expression for all Limit Breaks. They never change, so its only built once."""
+    return build_spell_query(*LIMIT_BREAKS)
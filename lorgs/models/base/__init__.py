@@ -1,4 +1,4 @@
 from .base import BaseModel
-from .dynamodb import DynamoDBModel
+from .dynamodb import DynamoDBModel, SecondaryIndex
 from .memory import MemoryModel
 from .s3 import S3Model
@@ -0,0 +1,264 @@
+"""Build Models from trusted Data, without running the full validation.
+
+Data we've stored ourselves (eg.: a `SpecRanking` saved to S3) has already been
+validated when the model was created. Running it through `__init__` again is by
+far the slowest part of reading it back.
+
+`construct` builds the same tree of models, recursively constructing any child
+models, but only converts the values pydantic would convert (eg.: datetimes).
+`post_init` is called on each model, just like `BaseModel.__init__` does,
+which restores the links to parent objects (eg.: `fight.report`).
+
+Note:
+    Only use this on data produced by `model_dump` / `model_dump_json`.
+    Models with custom validators are always created using `__init__`.
+
+"""
+
+from __future__ import annotations
+
+# IMPORT STANDARD LIBRARIES
+import contextlib
+import copy
+import datetime
+import enum
+import functools
+import gc
+import inspect
+import threading
+import types
+import typing
+from typing import Any, Callable, Optional, Type, TypeVar
+
+# IMPORT THIRD PARTY LIBRARIES
+import pydantic
+import typing_extensions
+from pydantic_core import PydanticUndefined
+
+# IMPORT LOCAL LIBRARIES
+from lorgs.models.base import base
+
+
+T = TypeVar("T", bound=pydantic.BaseModel)
+
+Converter = Callable[[Any], Any]
+
+IMMUTABLE_TYPES = (type(None), bool, int, float, str, bytes, tuple, frozenset, enum.Enum, datetime.datetime)
+
+PLAIN_TYPES = (Any, bool, int, str, list, dict, type(None))
+"""Types used as they are. JSON can't hold anything which would need to be converted."""
+
+
+Step = tuple[str, Optional[str], Optional[Converter], Any, Optional[Callable[[], Any]]]
+"""(field name, key in the data or None to use the default, converter, default, default factory)"""
+
+Shape = tuple[tuple[Step, ...], frozenset[str]]
+"""(steps to get the value of each field, names of the fields which are set)"""
+
+
+_builders: dict[type, Callable[[dict[str, Any]], Any]] = {}
+
+_gc_lock = threading.Lock()
+_gc_pauses = 0
+"""Number of `construct` calls (across all threads) currently running with the garbage collector paused."""
+_gc_paused = False
+"""Whether the garbage collector was disabled by us (and not by someone else)."""
+
+
+def _has_validators(model_cls: Type[pydantic.BaseModel]) -> bool:
+    decorators = model_cls.__pydantic_decorators__
+    return bool(
+        decorators.validators
+        or decorators.field_validators
+        or decorators.root_validators
+        or decorators.model_validators
+    )
+
+
+def _parse_datetime(value: Any) -> datetime.datetime:
+    if isinstance(value, str):
+        try:
+            return datetime.datetime.fromisoformat(value)
+        except ValueError:
+            pass
+    return pydantic.TypeAdapter(datetime.datetime).validate_python(value)
+
+
+def _get_converter(annotation: Any) -> Optional[Converter]:
+    """Get the function to convert a value to the given type. None if the value can be used as is."""
+    if annotation in PLAIN_TYPES:
+        return None
+
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+
+    # Optional[X]
+    if origin in (typing.Union, types.UnionType):
+        options = [arg for arg in args if arg is not type(None)]
+        converters = [_get_converter(arg) for arg in options]
+        if not any(converters):
+            return None
+        if len(options) == 1 and converters[0]:
+            convert = converters[0]
+
+            def convert_optional(value: Any) -> Any:
+                return None if value is None else convert(value)
+
+            return convert_optional
+
+    # list[X]
+    elif origin is list:
+        item_converter = _get_converter(args[0]) if args else None
+        if item_converter is None:
+            return None
+        convert_item = item_converter
+
+        def convert_list(values: Any) -> Any:
+            return [convert_item(value) for value in values]
+
+        return convert_list
+
+    elif origin is dict or typing_extensions.is_typeddict(annotation):
+        return None
+
+    elif inspect.isclass(annotation):
+        if issubclass(annotation, pydantic.BaseModel):
+            return functools.partial(_build, annotation)
+        if annotation is float:
+            return float
+        if annotation is datetime.datetime:
+            return _parse_datetime
+        if issubclass(annotation, enum.Enum):
+            return annotation
+
+    # anything else goes through regular validation
+    return pydantic.TypeAdapter(annotation).validate_python
+
+
+def _get_keys(name: str, field: pydantic.fields.FieldInfo, populate_by_name: bool) -> tuple[str, ...]:
+    """Keys under which the value of a field can be stored, in the order pydantic checks them."""
+    keys: list[str] = []
+    if isinstance(field.validation_alias, pydantic.AliasChoices):
+        keys += [choice for choice in field.validation_alias.choices if isinstance(choice, str)]
+    elif isinstance(field.validation_alias, str):
+        keys.append(field.validation_alias)
+    elif field.alias:
+        keys.append(field.alias)
+
+    if populate_by_name or not keys:
+        keys.append(name)
+    return tuple(dict.fromkeys(keys))
+
+
+def _compile(model_cls: Type[T]) -> Callable[[dict[str, Any]], T]:
+    """Create the function to construct instances of the given model."""
+    if _has_validators(model_cls) or model_cls.model_config.get("extra") == "allow":
+        return lambda data: model_cls(**data)
+
+    populate_by_name = bool(model_cls.model_config.get("populate_by_name"))
+    fields = [
+        (name, _get_keys(name, field, populate_by_name), _get_converter(field.annotation), field)
+        for name, field in model_cls.model_fields.items()
+    ]
+
+    # The stored data of most instances only uses a few different sets of keys
+    # eg.: casts with and without a duration. So we work out once, where each
+    # field gets its value from, for each of those.
+    shapes: dict[tuple[str, ...], Optional[Shape]] = {}
+
+    def get_shape(keys: tuple[str, ...]) -> Optional[Shape]:
+        steps: list[Step] = []
+        for name, field_keys, converter, field in fields:
+            key = next((key for key in field_keys if key in keys), None)
+            if key:
+                steps.append((name, key, converter, None, None))
+                continue
+
+            default = field.get_default(call_default_factory=False)
+            default_factory = field.default_factory
+            if default_factory is None and default is PydanticUndefined:
+                return None  # missing a required field
+            if default_factory is None and not isinstance(default, IMMUTABLE_TYPES):
+                default_factory = functools.partial(copy.deepcopy, default)
+            steps.append((name, None, None, default, default_factory))
+
+        fields_set = frozenset(name for name, key, *_ in steps if key)
+        return tuple(steps), fields_set
+
+    post_init = getattr(model_cls, "post_init", None)
+    if post_init is base.BaseModel.post_init:
+        post_init = None  # nothing to do
+
+    new = model_cls.__new__
+    setattr_ = object.__setattr__
+    has_private = bool(model_cls.__private_attributes__)
+
+    def build(data: dict[str, Any]) -> T:
+        keys = tuple(data)
+        if keys in shapes:
+            shape = shapes[keys]
+        else:
+            shape = shapes[keys] = get_shape(keys)
+        if shape is None:
+            return model_cls(**data)  # let the validation raise the error
+
+        steps, fields_set = shape
+        values: dict[str, Any] = {}
+        for name, key, converter, default, default_factory in steps:
+            if key is None:
+                values[name] = default_factory() if default_factory else default
+            elif converter is None:
+                values[name] = data[key]
+            else:
+                values[name] = converter(data[key])
+
+        instance = new(model_cls)
+        setattr_(instance, "__dict__", values)
+        setattr_(instance, "__pydantic_fields_set__", set(fields_set))
+        setattr_(instance, "__pydantic_extra__", None)
+        if has_private:
+            instance.model_post_init(None)  # sets the defaults for private attributes
+        else:
+            setattr_(instance, "__pydantic_private__", None)
+
+        if post_init:
+            post_init(instance)
+        return instance
+
+    return build
+
+
+@contextlib.contextmanager
+def _pause_gc() -> typing.Iterator[None]:
+    """Pause the garbage collector, until the last thread constructing models is done.
+
+    Creating thousands of objects triggers the garbage collector over and over,
+    while none of them could be collected. Doing so takes longer than building them.
+    """
+    global _gc_pauses, _gc_paused
+    with _gc_lock:
+        if _gc_pauses == 0 and gc.isenabled():
+            gc.disable()
+            _gc_paused = True
+        _gc_pauses += 1
+    try:
+        yield
+    finally:
+        with _gc_lock:
+            _gc_pauses -= 1
+            if _gc_pauses == 0 and _gc_paused:
+                gc.enable()
+                _gc_paused = False
+
+
+def _build(model_cls: Type[T], data: dict[str, Any]) -> T:
+    build: Optional[Callable[[dict[str, Any]], T]] = _builders.get(model_cls)
+    if build is None:
+        build = _builders[model_cls] = _compile(model_cls)
+    return build(data)
+
+
+def construct(model_cls: Type[T], data: dict[str, Any]) -> T:
+    """Create an instance of `model_cls` from trusted data (including all child models)."""
+    with _pause_gc():
+        return _build(model_cls, data)
@@ -5,14 +5,17 @@ from __future__ import annotations
 # IMPORT STANDARD LIBRARIES
 import decimal
 import json
+import time
 import typing
+from typing import ClassVar
 
 # IMPORT THIRD PARTY LIBRARIES
 import boto3
-from boto3.dynamodb.conditions import Attr
+import pydantic
+from boto3.dynamodb.conditions import Attr, ConditionBase, Key
 
 # IMPORT LOCAL LIBRARIES
-from lorgs.logger import Timer
+from lorgs.logger import Timer, logger
 from lorgs.models.base import base
 
 
@@ -22,16 +25,62 @@ if typing.TYPE_CHECKING:
 
 dynamodb = boto3.resource("dynamodb")
 
+BATCH_GET_SIZE = 100
+"""Max number of keys in a single `batch_get_item`-request."""
+
+BATCH_RETRIES = 8
+"""Number of times unprocessed keys are requested again (with an increasing delay)."""
+
 
 TBaseModel = typing.TypeVar("TBaseModel", bound="DynamoDBModel")
 
 
+class SecondaryIndex(typing.NamedTuple):
+    """A Global Secondary Index on the table of a model."""
+
+    name: str
+    """Name of the index in DynamoDB."""
+
+    pkey: str
+    """Attribute used as partition key."""
+
+    skey: str = ""
+    """Attribute used as sort key (optional)."""
+
+    def covers(self, attributes: typing.Iterable[str]) -> bool:
+        """Check if the index can be queried for the given attributes."""
+        return self.pkey in attributes
+
+
+def build_condition(condition_type: typing.Callable[[str], typing.Any], **kwargs: typing.Any) -> typing.Optional[ConditionBase]:
+    """Combine "name == value"-conditions for all kwargs."""
+    expr = None
+    for name, value in kwargs.items():
+        condition = condition_type(name).eq(value)
+        expr = condition if expr is None else expr & condition
+    return expr
+
+
+def dump_item(model: pydantic.BaseModel, exclude_unset: bool = True, **kwargs: typing.Any) -> dict[str, typing.Any]:
+    """Convert a model into a json compatible dict, ready to be stored in DynamoDB."""
+    # this back and fort serialization makes sure all complex objects
+    # are converted into json compatible formats.
+    # There is some work done to simplify this: https://github.com/pydantic/pydantic/discussions/4456
+    return json.loads(  # type: ignore
+        model.model_dump_json(exclude_unset=exclude_unset, by_alias=True, **kwargs),
+        parse_float=decimal.Decimal,  # dynamodb wants floats as decimals
+    )
+
+
 class DynamoDBModel(base.BaseModel):
     pkey_name: typing.ClassVar[str] = "pk"
     skey_name: typing.ClassVar[str] = "sk"
     pkey: typing.ClassVar[str] = "{id}"
     skey: typing.ClassVar[str] = ""
 
+    indexes: ClassVar[tuple[SecondaryIndex, ...]] = ()
+    """Secondary indexes on the table. Used by `query` and `first` to avoid scanning the whole table."""
+
     @classmethod
     def get_table(cls) -> "Table":
         return dynamodb.Table(cls.get_table_name())
@@ -63,43 +112,136 @@ class DynamoDBModel(base.BaseModel):
             return cls(**item)
 
     @classmethod
-    def first(cls: typing.Type[TBaseModel], **kwargs: typing.Any) -> typing.Optional[TBaseModel]:
-        """Returns the first Item matching the given keywords."""
+    def get_many(cls: typing.Type[TBaseModel], keys: typing.Iterable[dict[str, typing.Any]]) -> list[typing.Optional[TBaseModel]]:
+        """Get multiple Items at once.
 
-        table = cls.get_table()
+        Args:
+            keys: the kwargs to get each item (as passed to `get`)
+
+        Returns:
+            the items in the same order (None for missing items)
+
+        """
+        table_name = cls.get_table_name()
+        key_names = [name for name in (cls.pkey_name, cls.skey_name if cls.skey else "") if name]
+
+        def key_tuple(item: dict[str, typing.Any]) -> tuple:
+            return tuple(item.get(name) for name in key_names)
+
+        item_keys = [cls.get_keys(**kwargs) for kwargs in keys]
+        unique_keys = list({key_tuple(key): key for key in item_keys}.values())  # duplicates are not allowed
+
+        items: dict[tuple, dict[str, typing.Any]] = {}
+        for i in range(0, len(unique_keys), BATCH_GET_SIZE):
+            request = {table_name: {"Keys": unique_keys[i : i + BATCH_GET_SIZE]}}
+            for attempt in range(BATCH_RETRIES + 1):
+                with Timer(f"BATCH GET: {len(request[table_name]['Keys'])} items"):
+                    response = dynamodb.batch_get_item(RequestItems=request)
+                for item in response.get("Responses", {}).get(table_name, []):
+                    items[key_tuple(item)] = item
+
+                request = response.get("UnprocessedKeys") or {}
+                if not request:
+                    break
+                if attempt == BATCH_RETRIES:
+                    raise RuntimeError(f"{table_name}: {len(request[table_name]['Keys'])} keys remained unprocessed.")
+                time.sleep(min(0.05 * 2**attempt, 2))
+
+        results: list[typing.Optional[TBaseModel]] = []
+        for key in item_keys:
+            item = items.get(key_tuple(key))
+            results.append(cls(**item) if item else None)
+        return results
+
+    @classmethod
+    def get_index(cls, attributes: typing.Iterable[str]) -> typing.Optional[SecondaryIndex]:
+        """The index to use to search for the given attributes (preferring the ones using both keys)."""
+        attributes = set(attributes)
+        indexes = [index for index in cls.indexes if index.covers(attributes)]
+        indexes.sort(key=lambda index: bool(index.skey and index.skey in attributes), reverse=True)
+        return indexes[0] if indexes else None
 
+    @classmethod
+    def query_items(cls, **kwargs: typing.Any) -> typing.Iterator[dict[str, typing.Any]]:
+        """Yield all raw items matching the given keywords, page by page."""
         if not kwargs:
             raise ValueError("Need to provide some search arguments.")
 
-        expr = None
-        for name, value in kwargs.items():
-            attr = Attr(name).eq(value)
-            if not expr:
-                expr = attr
-            else:
-                expr = expr & attr
-
-        response = table.scan(FilterExpression=expr)  # type: ignore
-        items = response["Items"]
-        if not items:
-            return None
+        table = cls.get_table()
+        index = cls.get_index(kwargs)
+
+        request: dict[str, typing.Any] = {}
+        if index:
+            key_attrs = {name: kwargs[name] for name in (index.pkey, index.skey) if name and name in kwargs}
+            filter_attrs = {name: value for name, value in kwargs.items() if name not in key_attrs}
+            request["IndexName"] = index.name
+            request["KeyConditionExpression"] = build_condition(Key, **key_attrs)
+            operation, run = "QUERY", table.query
+        else:
+            logger.warning("%s: no index for %s. Scanning the whole table.", cls.get_table_name(), sorted(kwargs))
+            filter_attrs = kwargs
+            operation, run = "SCAN", table.scan
+
+        filter_expr = build_condition(Attr, **filter_attrs)
+        if filter_expr is not None:
+            request["FilterExpression"] = filter_expr
+
+        yield from cls.paginate(run, request, label=f"{operation}: {kwargs}")
+
+    @classmethod
+    def query_partition(cls, skey_prefix: str = "", **kwargs: typing.Any) -> typing.Iterator[dict[str, typing.Any]]:
+        """Yield all raw items in the partition of the given keywords.
+
+        Args:
+            skey_prefix: only include the items with a sort key starting with this
+            kwargs: values to fill in the `pkey`
+
+        """
+        pkey = cls.pkey.format(**kwargs)
+        condition = Key(cls.pkey_name).eq(pkey)
+        if skey_prefix:
+            condition = condition & Key(cls.skey_name).begins_with(skey_prefix)
+
+        table = cls.get_table()
+        request = {"KeyConditionExpression": condition}
+        yield from cls.paginate(table.query, request, label=f"QUERY: {pkey}/{skey_prefix}*")
+
+    @staticmethod
+    def paginate(
+        run: typing.Callable[..., typing.Any], request: dict[str, typing.Any], label: str
+    ) -> typing.Iterator[dict[str, typing.Any]]:
+        """Run a query/scan-request and yield the items of all pages."""
+        while True:
+            with Timer(label):
+                response = run(**request)
+            yield from response.get("Items", [])
+
+            last_key = response.get("LastEvaluatedKey")
+            if not last_key:
+                return
+            request["ExclusiveStartKey"] = last_key
+
+    @classmethod
+    def query(cls: typing.Type[TBaseModel], **kwargs: typing.Any) -> typing.Iterator[TBaseModel]:
+        """Yield all Items matching the given keywords.
+
+        Uses a secondary index covering the keywords, if there is one.
+        Otherwise the whole table gets scanned.
+        """
+        for item in cls.query_items(**kwargs):
+            yield cls(**item)
 
-        item = items[0]
-        return cls(**item)
+    @classmethod
+    def first(cls: typing.Type[TBaseModel], **kwargs: typing.Any) -> typing.Optional[TBaseModel]:
+        """Returns the first Item matching the given keywords."""
+        return next(cls.query(**kwargs), None)
 
     ############################################################################
     # Save to DB
     #
 
-    def json_dict(self, exclude_unset: bool = True) -> dict[str, typing.Any]:
-        # convert into json compatible dict
-        # this back and fort serialization makes sure all complex objects
-        # are converted into json compatible formats.
-        # There is some work done to simplify this: https://github.com/pydantic/pydantic/discussions/4456
-        return json.loads(  # type: ignore
-            self.model_dump_json(exclude_unset=exclude_unset, by_alias=True),
-            parse_float=decimal.Decimal,  # dynamodb wants floats as decimals
-        )
+    def json_dict(self, exclude_unset: bool = True, **kwargs: typing.Any) -> dict[str, typing.Any]:
+        return dump_item(self, exclude_unset=exclude_unset, **kwargs)
 
     def save(self, exclude_unset: bool = True) -> None:
         data = self.json_dict(exclude_unset=exclude_unset)
@@ -111,3 +253,14 @@ class DynamoDBModel(base.BaseModel):
         # save
         table = self.get_table()
         table.put_item(Item=data)
+
+    @classmethod
+    def save_many(cls, items: typing.Iterable["DynamoDBModel"], exclude_unset: bool = True) -> None:
+        """Save multiple Items using batched writes (unprocessed items are retried by the `batch_writer`)."""
+        key_names = [name for name in (cls.pkey_name, cls.skey_name if cls.skey else "") if name]
+        table = cls.get_table()
+        with table.batch_writer(overwrite_by_pkeys=key_names) as batch:
+            for item in items:
+                data = item.json_dict(exclude_unset=exclude_unset)
+                data.update(item.get_keys(**data))
+                batch.put_item(Item=data)
@@ -1,14 +1,21 @@
 """Object store in Memory.
 
-This model keeps a reference to all its instance in memory using a weakref-set,
+This model keeps a weak reference to all its instance in memory,
 proving us with database-like access to the objects.
 
+Lookups on the attributes listed in `index_keys` use a hash-index instead of
+scanning all instances. The indexes are built on first use, and updated for
+each new or modified instance.
+
+If multiple instances match a lookup, the one registered most recently is returned.
+
 """
 from __future__ import annotations
 
 # IMPORT STANDARD LIBRARIES
-from typing import ClassVar, Optional, TypeVar, Type
-from weakref import WeakSet
+import itertools
+from typing import Any, ClassVar, Iterator, Optional, TypeVar, Type
+from weakref import WeakKeyDictionary, WeakValueDictionary
 from collections import defaultdict
 
 # IMPORT LOCAL LIBRARIES
@@ -18,26 +25,114 @@ from lorgs.models.base import base
 
 T = TypeVar("T", bound="MemoryModel")
 
+Instances = WeakValueDictionary[int, Any]
+"""Map of registration number -> instance (in order of registration)."""
+
+
+class Index:
+    """Map of attribute value -> instances with that value."""
+
+    def __init__(self) -> None:
+        self.instances: defaultdict[Any, Instances] = defaultdict(WeakValueDictionary)
+        self.values: WeakKeyDictionary[Any, Any] = WeakKeyDictionary()  # instance -> indexed value
+
+    def add(self, number: int, instance: Any, value: Any) -> None:
+        self.instances[value][number] = instance
+        self.values[instance] = value
+
+    def update(self, number: int, instance: Any, value: Any) -> None:
+        """Move an instance to its new value (if it changed)."""
+        old_value = self.values.get(instance)
+        if old_value == value and instance in self.values:
+            return
+
+        instances = self.instances.get(old_value)
+        if instances is not None:
+            instances.pop(number, None)
+            if not instances:
+                del self.instances[old_value]
+        self.add(number, instance, value)
+
+    def get(self, value: Any) -> Optional[Instances]:
+        return self.instances.get(value)
+
+
+def iter_newest(instances: Instances) -> Iterator[Any]:
+    """Iterate over the instances, starting with the one registered most recently."""
+    for _, instance in sorted(instances.items(), key=lambda item: item[0], reverse=True):
+        yield instance
+
 
 class MemoryModel(base.BaseModel):
     """Model which keeps track of all created instances in memory."""
 
     # dict to track created instances.
-    # keys = ModelClass / Values = Set of Instances
-    __instances__: ClassVar[defaultdict] = defaultdict(WeakSet)
+    # keys = ModelClass / Values = Instances
+    __instances__: ClassVar[defaultdict[type, Instances]] = defaultdict(WeakValueDictionary)
+
+    # registration number of each instance.
+    __numbers__: ClassVar[WeakKeyDictionary[MemoryModel, int]] = WeakKeyDictionary()
+    __counter__: ClassVar[Iterator[int]] = itertools.count()
+
+    # dict to track the lookup indexes.
+    # keys = ModelClass / Values = {attribute name: Index}
+    __indexes__: ClassVar[defaultdict[type, dict[str, Index]]] = defaultdict(dict)
+
+    index_keys: ClassVar[tuple[str, ...]] = ()
+    """Attributes (or properties) to look up instances by, without a full scan."""
 
     def post_init(self) -> None:
         super().post_init()
-        self.__instances__[type(self)].add(self)
+        cls = type(self)
+        number = next(self.__counter__)
+        self.__numbers__[self] = number
+        self.__instances__[cls][number] = self
+        for name, index in self.__indexes__[cls].items():
+            index.add(number, self, getattr(self, name))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        indexes = self.__indexes__.get(type(self))
+        if not indexes:
+            return
+
+        number = self.__numbers__.get(self)
+        if number is None:
+            return  # not registered (yet)
+
+        for key, index in indexes.items():
+            # properties might depend on any attribute
+            if key == name or key not in self.model_fields:
+                index.update(number, self, getattr(self, key))
+
+    @classmethod
+    def get_index(cls, name: str) -> Index:
+        """Return the index for the given attribute, building it if required."""
+        indexes = cls.__indexes__[cls]
+        index = indexes.get(name)
+        if index is None:
+            index = Index()
+            for number, instance in list(cls.__instances__[cls].items()):
+                index.add(number, instance, getattr(instance, name))
+            indexes[name] = index
+        return index
 
     @classmethod
     def get(cls: Type[T], **kwargs) -> Optional[T]:
-        instances = cls.__instances__[cls]
-        return utils.get(instances, **kwargs)
+        for name in cls.index_keys:
+            if name in kwargs:
+                kwargs = dict(kwargs)
+                candidates = cls.get_index(name).get(kwargs.pop(name))
+                if not candidates:
+                    return None
+                return utils.get(iter_newest(candidates), **kwargs)
+
+        instances = cls.__instances__[cls]  # already in order of registration
+        return utils.get(reversed(list(instances.values())), **kwargs)
 
     @classmethod
     def list(cls: Type[T]) -> list[T]:
-        return list(cls.__instances__[cls])
+        return list(cls.__instances__[cls].values())
 
     def __hash__(self) -> int:
         # Restore the default implementation because pydantic overwrites it.
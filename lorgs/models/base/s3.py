@@ -5,26 +5,40 @@ from __future__ import annotations
 # IMPORT STANDARD LIBRARIES
 import json
 import os
-from typing import Any, ClassVar, Optional, Type, TypeVar
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, ClassVar, Iterable, Optional, Type, TypeVar
 
 # IMPORT THIRD PARTY LIBRARIES
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
 # IMPORT LOCAL LIBRARIES
+from lorgs import codecs
 from lorgs.logger import Timer
 from lorgs.models.base import base
+from lorgs.models.base.construct import construct
+from lorgs.models.base.s3_cache import S3Cache
 
 
 T = TypeVar("T", bound="S3Model")
 
 
-s3client = boto3.client("s3")
+S3_MAX_WORKERS = int(os.getenv("S3_MAX_WORKERS") or 16)
+"""Number of objects transferred at the same time by `get_many`/`save_many`."""
+
+s3client = boto3.client("s3", config=Config(max_pool_connections=S3_MAX_WORKERS))
+
+s3cache = S3Cache()
+"""Models loaded using `S3Model.get_cached`."""
 
 
 class S3Model(base.BaseModel):
     bucket: ClassVar[str] = os.getenv("DATA_BUCKET") or "lorrgs"
 
+    codec: ClassVar[str] = os.getenv("S3_CODEC") or "gzip"
+    """Compression used to store new objects. Reading detects the format on its own."""
+
     @classmethod
     def get_key(cls, **kwargs) -> str:
         key = super().get_key(**kwargs)
@@ -43,8 +57,12 @@ class S3Model(base.BaseModel):
         except ClientError:
             raise KeyError("Invalid Key: %s", key)
 
-        body = data["Body"]
-        return json.loads(body.read())
+        return json.loads(cls.read_body(data))
+
+    @staticmethod
+    def read_body(data: dict[str, Any]) -> bytes:
+        """Read and decompress the body of a `get_object` response."""
+        return codecs.decode(data["Body"].read(), data.get("ContentEncoding") or "")
 
     @classmethod
     def get(cls: Type[T], **kwargs: Any) -> Optional[T]:
@@ -54,27 +72,93 @@ class S3Model(base.BaseModel):
         except KeyError:
             return None
 
-        # TODO: arrg, 04.01.2023
-        # We'd pref to use `model_construct` here as its a lot faster than `__init__`
-        # Unfortunetly however we need to recurisvely construct child models,
-        # which is not supported with `model_construct` as of right now.
-        # We could solve this by implementing our own: `model_construct` that
-        # somehow handles the creation of child models.
-        return cls(**content)
+        # the content has been validated when it was saved.
+        # So we can skip the (much slower) validation in `__init__`.
+        return construct(cls, content)
+
+    @classmethod
+    def get_many(cls: Type[T], keys: Iterable[dict[str, Any]]) -> list[Optional[T]]:
+        """Get multiple Items at once.
+
+        Args:
+            keys: the kwargs to get each item (as passed to `get`)
+
+        Returns:
+            the items in the same order (None for missing items)
+
+        """
+        keys = list(keys)
+        if not keys:
+            return []
+        with ThreadPoolExecutor(max_workers=min(S3_MAX_WORKERS, len(keys))) as pool:
+            return list(pool.map(lambda kwargs: cls.get(**kwargs), keys))
+
+    @classmethod
+    def get_cached(cls: Type[T], **kwargs: Any) -> Optional[T]:
+        """Get an Item from the Store, reusing the previous result if it hasn't changed.
+
+        Note:
+            The returned instance is shared between all callers, and must not be modified.
+
+        """
+        key = cls.get_key(**kwargs)
+        entry = s3cache.get(key)
+        cached: Optional[T] = entry.obj if entry else None  # the key includes the table of the model
+        if entry and s3cache.is_fresh(entry):
+            s3cache.hits += 1
+            return cached
+
+        request = {"Bucket": cls.bucket, "Key": key}
+        if entry:
+            request["IfNoneMatch"] = entry.etag
+
+        try:
+            with Timer(f"s3.get_raw: {key}"):
+                data = s3client.get_object(**request)
+        except ClientError as e:
+            if entry and e.response.get("ResponseMetadata", {}).get("HTTPStatusCode") == 304:
+                s3cache.revalidated += 1
+                s3cache.touch(key)
+                return cached
+
+            s3cache.pop(key)
+            return None
+
+        s3cache.misses += 1
+        body = cls.read_body(data)
+        obj = construct(cls, json.loads(body))
+        s3cache.set(key, obj, etag=data["ETag"], size=len(body))
+        return obj
+
+    @classmethod
+    def save_many(cls, items: Iterable["S3Model"], exclude_unset=True, **kwargs: Any) -> None:
+        """Save multiple Items at once. Raises the first error, after all items have been tried."""
+        items = list(items)
+        if not items:
+            return
+        with ThreadPoolExecutor(max_workers=min(S3_MAX_WORKERS, len(items))) as pool:
+            futures = [pool.submit(item.save, exclude_unset=exclude_unset, **kwargs) for item in items]
+        for future in futures:
+            future.result()
 
     def save(self, exclude_unset=True, **kwargs: Any) -> None:
         if os.getenv("AWS_ACCESS_KEY_ID") == "testing":
             return
 
         key = self.get_key(**dict(self))
+        s3cache.pop(key)
         data = self.model_dump_json(
             exclude_unset=exclude_unset,
             by_alias=True,
             **kwargs,
         )
+
+        codec = codecs.get_codec(self.codec)
+        extra_args = {"ContentEncoding": codec.name} if codec.extension else {}
         s3client.put_object(
             Bucket=self.bucket,
             Key=key,
-            Body=data,
+            Body=codec.encode(data.encode("utf-8")),
             ContentType="application/json",
+            **extra_args,
         )
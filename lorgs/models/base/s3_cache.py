@@ -0,0 +1,110 @@
+"""In-Memory Cache for Objects loaded from S3.
+
+Rankings only change when the updater saves a new version, but are read on
+every request. This cache keeps the loaded models in memory, keyed by their
+S3-Key. Once an entry is older than `CACHE_TTL`, its revalidated using the
+ETag of the stored object. So unchanged objects are never downloaded again.
+
+The total size is limited by the size of the JSON each entry was loaded from,
+with the least recently used entries getting dropped first.
+
+"""
+from __future__ import annotations
+
+# IMPORT STANDARD LIBRARIES
+import os
+import threading
+import time
+import typing
+from collections import OrderedDict
+
+
+CACHE_TTL = int(os.getenv("S3_CACHE_TTL") or 5 * 60)
+"""int: Seconds until an entry gets revalidated. Matches the max-age of the API responses."""
+
+CACHE_MAX_SIZE = int(os.getenv("S3_CACHE_MAX_SIZE") or 64 * 1024 * 1024)
+"""int: Max total size (in bytes of JSON) of all entries."""
+
+
+class CacheEntry(typing.NamedTuple):
+    obj: typing.Any
+    etag: str
+    size: int
+    checked: float
+    """time the entry has been loaded or revalidated."""
+
+
+class S3Cache:
+    """LRU-Cache with a memory limit and revalidation after a TTL."""
+
+    def __init__(self, ttl: int = CACHE_TTL, max_size: int = CACHE_MAX_SIZE) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+
+        self.entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+        # stats
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def __repr__(self) -> str:
+        return f"S3Cache(entries={len(self.entries)}, size={self.size})"
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: str) -> typing.Optional[CacheEntry]:
+        """Get an entry (fresh or expired). None if the key is not cached."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry:
+                self.entries.move_to_end(key)
+            return entry
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return time.time() - entry.checked < self.ttl
+
+    def set(self, key: str, obj: typing.Any, etag: str, size: int) -> None:
+        if size > self.max_size:
+            return
+
+        with self.lock:
+            self._pop(key)
+            self.entries[key] = CacheEntry(obj=obj, etag=etag, size=size, checked=time.time())
+            self.size += size
+
+            while self.size > self.max_size:
+                self._pop(next(iter(self.entries)))
+
+    def touch(self, key: str) -> None:
+        """Mark an entry as valid again."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry:
+                self.entries[key] = entry._replace(checked=time.time())
+
+    def pop(self, key: str) -> None:
+        with self.lock:
+            self._pop(key)
+
+    def _pop(self, key: str) -> None:
+        entry = self.entries.pop(key, None)
+        if entry:
+            self.size -= entry.size
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def metrics(self) -> dict[str, typing.Any]:
+        return {
+            "entries": len(self.entries),
+            "size": self.size,
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+        }
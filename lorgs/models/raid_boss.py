@@ -30,6 +30,8 @@ class Phase(WowSpell):
 class RaidBoss(WowActor):
     """A raid boss in the Game."""
 
+    index_keys: typing.ClassVar[tuple[str, ...]] = ("id", "full_name_slug")
+
     id: int
     """The Encounter ID."""
 
@@ -63,6 +65,7 @@ class RaidBoss(WowActor):
     def add_phase(self, **kwargs: typing.Any) -> Phase:
         phase = Phase(**kwargs)
         self.phases.append(phase)
+        WowSpell.invalidate_queries()
         return phase
 
     @property
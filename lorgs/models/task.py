@@ -23,6 +23,8 @@ class Task(DynamoDBModel):
         DONE = "done"
         FAILED = "failed"
 
+        FINISHED = (DONE, FAILED)
+
     task_id: str = ""
     status: str = STATUS.NEW
     updated: datetime.datetime = pydantic.Field(default_factory=datetime.datetime.now)
@@ -32,5 +34,22 @@ class Task(DynamoDBModel):
     # Config
 
     key: typing.ClassVar[str] = "{table_name}:{task_id}"
+    # Note: Tasks used to fall back to the default pkey ("{id}"), which failed to
+    # build their keys (KeyError). So there are no rows stored under any other key.
+    pkey: typing.ClassVar[str] = "{task_id}"
     # expire time for the tasks (1 hour)
     ttl: typing.ClassVar[int] = 60 * 60
+
+    def get_info(self) -> dict[str, typing.Any]:
+        """The info sent to the clients following the task.
+
+        Note: "task_id" used to be the unformatted `key` template ("{table_name}:{task_id}").
+        It now contains the actual id (no client relies on it).
+        """
+        return {
+            "task_id": self.task_id,
+            "status": self.status,
+            "message": self.message,
+            "updated": self.updated.isoformat(),
+            "items": self.items,
+        }
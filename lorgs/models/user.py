@@ -48,6 +48,9 @@ class User(base.DynamoDBModel):
 
     # Config
     pkey: typing.ClassVar[str] = "{discord_id}"
+    indexes: typing.ClassVar[tuple[base.SecondaryIndex, ...]] = (
+        base.SecondaryIndex(name="discord_tag-index", pkey="discord_tag"),
+    )
 
     ################################
     # Properties
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 # IMPORT STANDARD LIBRARIES
 import abc
+import asyncio
 import os
 import textwrap
 import typing
@@ -16,11 +17,14 @@ from lorgs import utils
 from lorgs.clients import wcl
 from lorgs.logger import logger
 from lorgs.models import warcraftlogs_base
-from lorgs.models.warcraftlogs_cast import Cast, process_auras, process_until_events, add_cast_counters
-from lorgs.models.wow_spell import SpellType, WowSpell, build_spell_query
+from lorgs.models.warcraftlogs_cast import Cast, CastEvent, process_auras, process_until_events, add_cast_counters
+from lorgs.models.wow_spell import SpellType, WowSpell
 
 DEBUG_QUERIES = os.getenv("MSPEC_DEBUG_QUERIES") == "1"
 
+EVENTS_PAGE_LIMIT = 10000
+"""int: Max number of events per page (the maximum allowed by the API)."""
+
 
 if typing.TYPE_CHECKING:
     from lorgs.models.warcraftlogs_fight import Fight
@@ -69,10 +73,10 @@ class BaseActor(warcraftlogs_base.BaseModel):
     def actor_type(self) -> "WowActor":
         return self.get_actor_type()
 
-    async def load(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+    async def load(self, raise_errors=False) -> None:
         self.event_actor_load.send(self, status="start")
         try:
-            await super().load(*args, **kwargs)
+            await self.load_events(raise_errors=raise_errors)
         except:
             self.event_actor_load.send(self, status="failed")
             raise
@@ -85,23 +89,26 @@ class BaseActor(warcraftlogs_base.BaseModel):
     #
     ############################################################################
 
+    def get_query_attributes(self) -> tuple[str, ...]:
+        """Names of the spell lists on the actor type to be queried."""
+        return ("all_spells", "all_buffs", "all_debuffs", "all_events")
+
     def get_query_abilities(self) -> list[WowSpell]:
         """Get all abilities to be queried."""
-        return [
-            *self.actor_type.all_spells,
-            *self.actor_type.all_buffs,
-            *self.actor_type.all_debuffs,
-            *self.actor_type.all_events,
-        ]
+        return utils.flatten(getattr(self.actor_type, attribute) for attribute in self.get_query_attributes())
 
     def get_sub_query(self) -> str:
         """Get the Query for fetch all relevant data for this actor."""
-        # combine all parts
-        abilities = self.get_query_abilities()
-        query = build_spell_query(*abilities)
-        return query
+        # the filter only depends on the actor type, so its cached there.
+        return self.actor_type.get_spell_query(*self.get_query_attributes())
+
+    def get_query(self, start_time: typing.Optional[int] = None) -> str:
+        """Query for a single page of events.
+
+        Args:
+            start_time: start of the page. Defaults to the start of the fight.
 
-    def get_query(self) -> str:
+        """
         if not self.fight:
             raise ValueError("missing fight")
         if not self.fight.report:
@@ -138,51 +145,97 @@ class BaseActor(warcraftlogs_base.BaseModel):
                 report(code: "{self.fight.report.report_id}")
                 {{
                     events(
-                        startTime: {self.fight.start_time_rel},
+                        startTime: {self.fight.start_time_rel if start_time is None else start_time},
                         endTime: {self.fight.end_time_rel},
-                        filterExpression: "{sub_query}"
+                        filterExpression: "{sub_query}",
+                        limit: {EVENTS_PAGE_LIMIT}
                     )
-                    {{data}}
+                    {{data nextPageTimestamp}}
                 }}
             }}
         """
         )
 
+    async def iter_event_pages(
+        self, start_time: typing.Optional[int] = None, raise_errors=False
+    ) -> typing.AsyncIterator[list[dict[str, typing.Any]]]:
+        """Iterate over all pages of events, following `nextPageTimestamp`.
+
+        The request for the next page is sent before the current page is
+        handed out, so it can be processed while the next one is loading.
+
+        Yields:
+            the raw event data of each page
+
+        """
+        query = self.get_query(start_time=start_time)
+        if not query:
+            return
+
+        next_page: typing.Optional[asyncio.Future] = asyncio.ensure_future(
+            self.client.query(query=query, raise_errors=raise_errors)
+        )
+        try:
+            while next_page:
+                result = await next_page
+                report = (result.get("reportData") or {}).get("report") or {}
+                events = report.get("events") or {}
+
+                next_timestamp = events.get("nextPageTimestamp")
+                next_page = None
+                if next_timestamp:
+                    next_query = self.get_query(start_time=next_timestamp)
+                    next_page = asyncio.ensure_future(self.client.query(query=next_query, raise_errors=raise_errors))
+                    await asyncio.sleep(0)  # let the request get started
+
+                yield events.get("data") or []
+        finally:
+            if next_page and not next_page.done():
+                next_page.cancel()
+
+    async def load_events(self, raise_errors=False) -> None:
+        """Load all pages of events, and convert them into casts."""
+        events: list[wcl.FastReportEvent] = []
+        async for page in self.iter_event_pages(raise_errors=raise_errors):
+            events += map(wcl.FastReportEvent.from_dict, page)
+
+        self.process_report_events(events)
+
     ############################################################################
     #
     # Process
     #
     ############################################################################
 
-    def process_events(self, events: list[wcl.ReportEvent]) -> list[wcl.ReportEvent]:
+    def process_events(self, events: typing.Sequence[wcl.AnyReportEvent]) -> typing.Sequence[wcl.AnyReportEvent]:
         """Hook to preprocess the entire list of  Cast/Events.
 
         Args:
-            events (list[wcl.ReportEvent]): The list of Events to be processed
+            events (Sequence[wcl.AnyReportEvent]): The list of Events to be processed
 
         Returns:
-            events (list[wcl.ReportEvent]): The processed list of Events
+            events (Sequence[wcl.AnyReportEvent]): The processed list of Events
 
         """
         return events
 
-    def process_event(self, event: wcl.ReportEvent) -> wcl.ReportEvent:
+    def process_event(self, event: wcl.AnyReportEvent) -> wcl.AnyReportEvent:
         """Hook to preprocess each Cast/Event
 
         Args:
-            event (wcl.ReportEvent): The Event to be processed
+            event (wcl.AnyReportEvent): The Event to be processed
 
         Returns:
-            event (wcl.ReportEvent): The processed Event
+            event (wcl.AnyReportEvent): The processed Event
 
         """
         return event
 
-    def should_include_cast_event(self, event: wcl.ReportEvent, cast_actor_id: int) -> bool:
+    def should_include_cast_event(self, event: wcl.AnyReportEvent, cast_actor_id: int) -> bool:
         """Return whether a raw event belongs in this actor's cast list."""
         return not self._has_source_id or cast_actor_id == self.source_id
 
-    def set_source_id_from_events(self, casts: list[wcl.ReportEvent], force=False):
+    def set_source_id_from_events(self, casts: typing.Sequence[wcl.AnyReportEvent], force=False):
         """Set the Source ID from the cast data.
 
         In some cases (eg.: data pulled from spec rankings) we don't know the source ID upfront..
@@ -202,9 +255,15 @@ class BaseActor(warcraftlogs_base.BaseModel):
     def process_query_result(self, **query_data: typing.Any) -> None:
         """Process the result of a casts-query to create Cast objects."""
         query_data = query_data.get("reportData") or query_data
-        report_data = wcl.ReportData(**query_data)
-        casts_data = report_data.report.events
+        report_data = query_data.get("report") or {}
+        events_data = (report_data.get("events") or {}).get("data") or []
+        self.process_report_events([wcl.FastReportEvent.from_dict(event) for event in events_data])
+
+    def process_report_events(self, casts_data: typing.Sequence[wcl.AnyReportEvent]) -> None:
+        """Create the Cast objects from all events of the fight.
 
+        All steps run on lightweight `CastEvent`s. Only the remaining ones are turned into `Cast`s at the end.
+        """
         if not casts_data:
             logger.debug("casts_data is empty")
             return
@@ -216,7 +275,8 @@ class BaseActor(warcraftlogs_base.BaseModel):
 
         ##############################
         # Main
-        self.casts = []  # cl;ear out any old data
+        fight_start = self.fight.start_time_rel if self.fight else 0
+        casts: list[CastEvent] = []
         for cast_data in casts_data:
             cast_data = self.process_event(cast_data)
 
@@ -231,21 +291,23 @@ class BaseActor(warcraftlogs_base.BaseModel):
                 continue
 
             # create the cast object
-            cast = Cast.from_report_event(cast_data)
-            cast.timestamp -= self.fight.start_time_rel if self.fight else 0
-            self.casts.append(cast)
+            cast = CastEvent.from_report_event(cast_data)
+            cast.timestamp -= fight_start
+            casts.append(cast)
 
         ##############################
         # Post Processing
-        self.casts = process_until_events(self.casts)
-        self.casts = process_auras(self.casts)
+        casts = process_until_events(casts)
+        casts = process_auras(casts)
 
         # Filter out same event at the same time (eg.: raid wide debuff apply)
-        self.casts = utils.uniqify(self.casts, key=lambda cast: (cast.spell_id, int(cast.timestamp / 1000)))
+        casts = utils.uniqify(casts, key=lambda cast: (cast.spell_id, int(cast.timestamp / 1000)))
 
         # make sure casts are sorted correctly
         # avoids weird UI overlaps, and just feels cleaner
-        self.casts = sorted(self.casts, key=lambda cast: cast.timestamp)
+        casts.sort(key=lambda cast: cast.timestamp)
 
         # we do this at the very end after all the filtering has been done.
-        self.casts = add_cast_counters(self.casts)
+        casts = add_cast_counters(casts)
+
+        self.casts = [cast.to_cast() for cast in casts]
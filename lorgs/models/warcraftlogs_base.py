@@ -3,6 +3,7 @@ from __future__ import annotations
 # IMPORT STANRD LIBRARIES
 import abc
 import asyncio
+import contextlib
 import contextvars
 import json
 import re
@@ -13,6 +14,7 @@ import pydantic
 
 # IMPORT LOCAL LIBRARIES
 from lorgs.clients.wcl import WarcraftlogsClient
+from lorgs.clients.wcl.batch import QueryBatch
 from lorgs.logger import logger
 from lorgs.models import base
 
@@ -91,13 +93,44 @@ def reset_wcl_client_override(token: contextvars.Token) -> None:
     WCL_CLIENT_OVERRIDE.reset(token)
 
 
+@contextlib.contextmanager
+def query_batch(across_reports: bool = False) -> typing.Iterator[QueryBatch]:
+    """Combine the queries for the same report made within this block.
+
+    Only applies to tasks created inside the block (eg.: by `asyncio.gather`).
+
+    Args:
+        across_reports: also combine queries for different reports
+
+    """
+    client = get_client()
+    batch: QueryBatch
+    if isinstance(client, QueryBatch) and client.across_reports == across_reports:
+        batch = client
+    else:
+        client = client.client if isinstance(client, QueryBatch) else client
+        batch = QueryBatch(client, across_reports=across_reports)
+
+    # the batch stands in for the client (anything it doesn't handle is passed through)
+    token = set_wcl_client_override(typing.cast(WarcraftlogsClient, batch))
+    try:
+        yield batch
+    finally:
+        reset_wcl_client_override(token)
+
+
+def get_client() -> WarcraftlogsClient:
+    """The client to run queries with (the override for the current context, or the shared instance)."""
+    override = WCL_CLIENT_OVERRIDE.get()
+    if override is not None:
+        return override
+    return WarcraftlogsClient.get_instance()
+
+
 class wclclient_mixin:
     @property
     def client(self) -> WarcraftlogsClient:
-        override = WCL_CLIENT_OVERRIDE.get()
-        if override is not None:
-            return override
-        return WarcraftlogsClient.get_instance()
+        return get_client()
 
     @abc.abstractmethod
     def get_query(self) -> str:
@@ -127,13 +160,15 @@ class wclclient_mixin:
     async def load_many(self: W, items: list[W], raise_errors=False) -> None:
         """Load multiple objects at once.
 
+        Queries for the same report are combined into a single request.
+
         Args:
             items(list[wclclient_mixin]): the objects to load
-            chunks_size[int, optional]: load in chunks of this size.
 
         """
-        tasks = [item.load(raise_errors=raise_errors) for item in items]
-        await asyncio.gather(*tasks)
+        with query_batch():
+            tasks = [item.load(raise_errors=raise_errors) for item in items]
+            await asyncio.gather(*tasks)
 
     async def load(self, raise_errors=False) -> None:
         query = self.get_query()
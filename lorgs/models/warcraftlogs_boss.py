@@ -10,7 +10,6 @@ from lorgs.clients import wcl
 from lorgs.models import warcraftlogs_actor
 from lorgs.models.raid_boss import RaidBoss
 from lorgs.models.warcraftlogs_cast import Cast
-from lorgs.models.wow_spell import WowSpell
 
 
 if typing.TYPE_CHECKING:
@@ -65,17 +64,13 @@ class Boss(warcraftlogs_actor.BaseActor):
     #
     ############################################################################
 
-    def get_query_abilities(self) -> list[WowSpell]:
-        """Get all abilities to be queried."""
+    def get_query_attributes(self) -> tuple[str, ...]:
         if self.query_mode == self.QueryModes.PHASES:
-            return self.raid_boss.phases  # type: ignore
+            return ("phases",)
 
-        return [
-            *super().get_query_abilities(),
-            *self.raid_boss.phases,
-        ]
+        return (*super().get_query_attributes(), "phases")
 
-    def process_phase_events(self, events: list[wcl.ReportEvent]) -> None:
+    def process_phase_events(self, events: typing.Sequence[wcl.AnyReportEvent]) -> None:
 
         if not self.fight:
             return
@@ -118,6 +113,6 @@ class Boss(warcraftlogs_actor.BaseActor):
                 count=count,
             )
 
-    def process_events(self, events: list[wcl.ReportEvent]) -> list[wcl.ReportEvent]:
+    def process_events(self, events: typing.Sequence[wcl.AnyReportEvent]) -> typing.Sequence[wcl.AnyReportEvent]:
         self.process_phase_events(events)
         return events
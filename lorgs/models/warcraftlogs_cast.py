@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 # IMPORT STANDARD LIBRARIES
-from collections import defaultdict
+from collections import defaultdict, deque
 from typing import TYPE_CHECKING, Optional
 import typing
 
@@ -42,10 +42,49 @@ MRT_EVENT_ABBREVIATION = {
 }
 
 
-class Cast(base.BaseModel):
+class CastMixin:
+    """Read-only helpers shared by `Cast` and `CastEvent`.
+
+    Anything modifying a cast lives in the processing functions below,
+    as the attributes are only declared here (`CastEvent` keeps them in its own slots).
+    """
+
+    __slots__ = ()
+
+    spell_id: int
+    timestamp: int
+    duration: Optional[int]
+    counter: int
+    event_type: str
+
+    @property
+    def spell(self) -> Optional[WowSpell]:
+        return WowSpell.get(spell_id=self.spell_id)
+
+    @property
+    def combatlog_event_type(self) -> str:
+        return WCL_TO_MRT_EVENT.get(self.event_type, "UNKNOWN")
+
+    @property
+    def mrt_trigger(self) -> str:
+        """eg.: SCC:442432:1"""
+        event = MRT_EVENT_ABBREVIATION.get(self.combatlog_event_type, self.combatlog_event_type)
+        return f"{event}:{self.spell_id}:{self.counter}"
+
+    def get_duration(self) -> int:
+        if self.duration:
+            return self.duration
+
+        if self.spell:
+            return int(self.spell.duration * 1000)
+
+        return 0
+
+
+class Cast(CastMixin, base.BaseModel):
     """An Instance of a Cast of a specific Spell in a Fight."""
 
-    spell_id: int = pydantic.Field(validation_alias=pydantic.AliasChoices("id", "spell_id"), serialization_alias="spell_id")
+    spell_id: int = pydantic.Field(validation_alias=pydantic.AliasChoices("id", "spell_id"), serialization_alias="spell_id")
     """ID of the spell/aura."""
 
     timestamp: int = pydantic.Field(alias="ts")
@@ -64,8 +103,8 @@ class Cast(base.BaseModel):
     #############################
 
     @classmethod
-    def from_report_event(cls, event: "wcl.ReportEvent") -> "Cast":
-        spell_id = WowSpell.resolve_spell_id(event.abilityGameID, event.type)
+    def from_report_event(cls, event: "wcl.AnyReportEvent") -> "Cast":
+        spell_id = WowSpell.resolve_event_spell_id(event.abilityGameID, event.type)
         return cls(
             spell_id=spell_id,
             timestamp=event.timestamp,
@@ -81,48 +120,82 @@ class Cast(base.BaseModel):
         time_fmt = utils.format_time(self.timestamp)
         return f"Cast(id={self.spell_id}, ts={time_fmt})"
 
-    @property
-    def spell(self) -> Optional[WowSpell]:
-        return WowSpell.get(spell_id=self.spell_id)
 
-    @property
-    def combatlog_event_type(self) -> str:
-        return WCL_TO_MRT_EVENT.get(self.event_type, "UNKNOWN")
+class CastEvent(CastMixin):
+    """Lightweight Cast, used while processing the events of a fight.
 
-    @property
-    def mrt_trigger(self) -> str:
-        """eg.: SCC:442432:1"""
-        event = MRT_EVENT_ABBREVIATION.get(self.combatlog_event_type, self.combatlog_event_type)
-        return f"{event}:{self.spell_id}:{self.counter}"
+    All processing steps (auras, until-events, counters, ...) work on these,
+    and only the remaining ones are turned into `Cast`-models at the end.
+    """
 
-    def get_duration(self) -> int:
-        if self.duration:
-            return self.duration
+    __slots__ = ("spell_id", "timestamp", "duration", "counter", "event_type")
 
-        if self.spell:
-            return int(self.spell.duration * 1000)
+    def __init__(self, spell_id: int, timestamp: int, event_type: str = "cast") -> None:
+        self.spell_id = spell_id
+        self.timestamp = timestamp
+        self.duration: Optional[int] = None
+        self.counter = 0
+        self.event_type = event_type
 
-        return 0
+    def __repr__(self) -> str:
+        return f"CastEvent(id={self.spell_id}, ts={self.timestamp}, type={self.event_type})"
 
-    ############################################################################
-    # Cast Processing functions
-    #
-    def convert_to_start_event(self) -> None:
-        """Convert this Cast into a start event.
+    @classmethod
+    def from_report_event(cls, event: "wcl.AnyReportEvent") -> "CastEvent":
+        spell_id = WowSpell.resolve_event_spell_id(event.abilityGameID, event.type)
+        return cls(spell_id, event.timestamp, event.type)
 
-        eg.: Convert from "remove debuff" to "apply debuff"
-        and automatically shift the timestamp based on the spell default duration
+    def to_cast(self) -> Cast:
+        """Create the `Cast`, skipping validation as all values are known to be valid.
+
+        The set fields match those of a Cast that went through the same steps,
+        so `exclude_unset` still only drops the duration if it was never set.
         """
-        duration = self.get_duration()
-        if not duration:
-            # TMP hack for eg.: Phase Events, where we're only interested in remove event
-            return
+        cast = Cast.__new__(Cast)
+        object.__setattr__(
+            cast,
+            "__dict__",
+            {
+                "spell_id": self.spell_id,
+                "timestamp": self.timestamp,
+                "duration": self.duration,
+                "counter": self.counter,
+                "event_type": self.event_type,
+            },
+        )
+        fields_set = {"spell_id", "timestamp", "counter", "event_type"}
+        if self.duration is not None:
+            fields_set.add("duration")
+        object.__setattr__(cast, "__pydantic_fields_set__", fields_set)
+        object.__setattr__(cast, "__pydantic_extra__", None)
+        object.__setattr__(cast, "__pydantic_private__", None)
+        return cast
+
+
+CastT = typing.TypeVar("CastT", Cast, CastEvent)
+
 
-        self.event_type = self.event_type.replace("remove", "apply")
-        self.timestamp -= duration
+################################################################################
+# Cast Processing functions
+#
+
+
+def convert_to_start_event(cast: CastT) -> None:
+    """Convert the Cast into a start event.
+
+    eg.: Convert from "remove debuff" to "apply debuff"
+    and automatically shift the timestamp based on the spell default duration
+    """
+    duration = cast.get_duration()
+    if not duration:
+        # TMP hack for eg.: Phase Events, where we're only interested in remove event
+        return
 
+    cast.event_type = cast.event_type.replace("remove", "apply")
+    cast.timestamp -= duration
 
-def process_auras(events: list[Cast]) -> list[Cast]:
+
+def process_auras(events: list[CastT]) -> list[CastT]:
     """Calculate Aura Durations from "applybuff" to "applydebuff".
 
     Also converts "removebuff" events without matching "apply"
@@ -130,7 +203,7 @@ def process_auras(events: list[Cast]) -> list[Cast]:
 
     """
     # spell id --> application event
-    active_buffs: dict[int, Cast] = {}
+    active_buffs: dict[int, CastT] = {}
 
     for event in events:
         spell_id = event.spell_id
@@ -161,21 +234,68 @@ def process_auras(events: list[Cast]) -> list[Cast]:
                 event.spell_id = -1
             else:
                 # Automatically create start event
-                event.convert_to_start_event()
+                convert_to_start_event(event)
 
     return [event for event in events if event.spell_id >= 0]
 
 
-def process_until_events(casts: list[Cast]) -> list[Cast]:
-    """Dynamically set the duration from the corresponding "until"-event."""
+def process_until_events(casts: list[CastT]) -> list[CastT]:
+    """Dynamically set the duration from the corresponding "until"-event.
+
+    Each cast is ended by the first unused "until"-event after it.
+    Casts are expected to be sorted by time, in which case this runs in a
+    single pass, using a queue of possible end events per spell id.
+    """
+    # spell id -> spell id of its "until"-event
+    until_ids: dict[int, Optional[int]] = {}
+
+    def get_until_id(spell_id: int) -> Optional[int]:
+        if spell_id not in until_ids:
+            spell = WowSpell.get(spell_id=spell_id) if spell_id >= 0 else None
+            until_id = spell.until.spell_id if (spell and spell.until) else None
+            until_ids[spell_id] = until_id if isinstance(until_id, int) else None  # named spells never show up in events
+        return until_ids[spell_id]
+
+    if any(a.timestamp > b.timestamp for a, b in zip(casts, casts[1:])):
+        return _process_until_events_unsorted(casts, get_until_id)
+
+    # queues of possible end events, per spell id
+    end_ids = {get_until_id(cast.spell_id) for cast in casts}
+    end_events: dict[int, deque[CastT]] = defaultdict(deque)
+    for cast in casts:
+        if cast.spell_id in end_ids:
+            end_events[cast.spell_id].append(cast)
+
+    for cast in casts:
+        until_id = get_until_id(cast.spell_id)
+        if until_id is None:
+            continue
+
+        # events up to this point can't end this, or any later cast
+        queue = end_events[until_id]
+        while queue and queue[0].timestamp <= cast.timestamp:
+            queue.popleft()
+        if not queue:
+            continue
+
+        end_event = queue.popleft()
+        end_event.spell_id = -1  # flag for filtering
+        cast.duration = end_event.timestamp - cast.timestamp
+
+    return [c for c in casts if c.spell_id > 0]
 
+
+def _process_until_events_unsorted(
+    casts: list[CastT], get_until_id: typing.Callable[[int], Optional[int]]
+) -> list[CastT]:
+    """Fallback for casts which are not sorted by time."""
     for cast in casts:
-        spell = cast.spell
-        if not (spell and spell.until):
+        until_id = get_until_id(cast.spell_id)
+        if until_id is None:
             continue
 
         # find valid "until"-events
-        end_events = [e for e in casts if (e.timestamp > cast.timestamp) and (e.spell_id == spell.until.spell_id)]
+        end_events = [e for e in casts if (e.timestamp > cast.timestamp) and (e.spell_id == until_id)]
         if not end_events:
             continue
 
@@ -186,7 +306,7 @@ def process_until_events(casts: list[Cast]) -> list[Cast]:
     return [c for c in casts if c.spell_id > 0]
 
 
-def add_cast_counters(events: list[Cast]) -> list[Cast]:
+def add_cast_counters(events: list[CastT]) -> list[CastT]:
     """Adds a counter to each event, tracking how many times
     each (event_type, spell_id) pair has occurred.
 
@@ -206,3 +326,120 @@ def add_cast_counters(events: list[Cast]) -> list[Cast]:
         cast.counter = counters[key]
 
     return events
+
+
+################################################################################
+# Columnar Encoding
+#
+# Rankings contain thousands of casts, each serialized as its own object:
+#
+#   [{"spell_id": 123, "ts": 1000}, {"spell_id": 456, "ts": 2500, "d": 10000}, ...]
+#
+# The columnar encoding stores the same casts as parallel arrays instead:
+#
+#   {"encoding": "columns", "spell_id": [123, 456], "ts": [1000, 1500], "d": [0, 10000]}
+#
+# - timestamps are stored as the difference to the previous cast.
+# - durations are 0 for casts without duration. (omitted if no cast has one)
+# - counters are omitted for casts stored without them. An empty list means
+#   they are derived by counting the casts of each spell in order (which is
+#   how they are usually set). Otherwise all counters are listed.
+#
+# Both the aliased ("ts", "d", "c") and the full field names ("timestamp",
+# "duration", "counter", as used by `Player.as_dict`) are supported. Decoding
+# returns the casts with the same keys used to encode them.
+#
+
+CAST_COLUMNS_ENCODING = "columns"
+
+CAST_COLUMN_KEYS = {
+    "ts": ("ts", "d", "c"),
+    "timestamp": ("timestamp", "duration", "counter"),
+}
+"""time key -> (time key, duration key, counter key)"""
+
+
+def get_cast_counters(spell_ids: typing.Iterable[int]) -> list[int]:
+    """Counters as set by `add_cast_counters`, for casts of a single event type."""
+    counters: dict[int, int] = defaultdict(int)
+    result: list[int] = []
+    for spell_id in spell_ids:
+        counters[spell_id] += 1
+        result.append(counters[spell_id])
+    return result
+
+
+def get_cast_column_keys(casts: list[typing.Any]) -> Optional[tuple[str, str, str]]:
+    """The keys used by the given casts. None if they can't be encoded."""
+    if not casts or not all(isinstance(cast, dict) for cast in casts):
+        return None
+
+    time_key = next((key for key in CAST_COLUMN_KEYS if key in casts[0]), None)
+    if not time_key:
+        return None
+
+    keys = CAST_COLUMN_KEYS[time_key]
+    allowed = {"spell_id", *keys}
+    if any(cast.keys() - allowed or "spell_id" not in cast or time_key not in cast for cast in casts):
+        return None
+    return keys
+
+
+def encode_cast_columns(casts: list[dict[str, typing.Any]]) -> dict[str, typing.Any]:
+    """Encode serialized casts into parallel arrays. See above for the format."""
+    time_key, duration_key, counter_key = get_cast_column_keys(casts) or CAST_COLUMN_KEYS["ts"]
+
+    spell_ids = [cast["spell_id"] for cast in casts]
+    timestamps = [cast[time_key] for cast in casts]
+    columns: dict[str, typing.Any] = {
+        "encoding": CAST_COLUMNS_ENCODING,
+        "spell_id": spell_ids,
+        time_key: [ts - prev for ts, prev in zip(timestamps, [0] + timestamps)],
+    }
+
+    durations = [cast.get(duration_key) or 0 for cast in casts]
+    if any(durations):
+        columns[duration_key] = durations
+
+    if any(counter_key in cast for cast in casts):
+        counters = [cast.get(counter_key, 0) for cast in casts]
+        columns[counter_key] = [] if counters == get_cast_counters(spell_ids) else counters
+    return columns
+
+
+def decode_cast_columns(columns: dict[str, typing.Any]) -> list[dict[str, typing.Any]]:
+    """Decode casts encoded with `encode_cast_columns`."""
+    time_key = next((key for key in CAST_COLUMN_KEYS if key in columns), "ts")
+    _, duration_key, counter_key = CAST_COLUMN_KEYS[time_key]
+
+    spell_ids: list[int] = columns.get("spell_id") or []
+    durations = columns.get(duration_key) or [0] * len(spell_ids)
+    counters: Optional[list[int]] = columns.get(counter_key)
+    if counters == []:
+        counters = get_cast_counters(spell_ids)
+
+    casts: list[dict[str, typing.Any]] = []
+    ts = 0
+    for i, (spell_id, delta, duration) in enumerate(zip(spell_ids, columns.get(time_key) or [], durations)):
+        ts += delta
+        cast = {"spell_id": spell_id, time_key: ts}
+        if duration:
+            cast[duration_key] = duration
+        if counters is not None:
+            cast[counter_key] = counters[i]
+        casts.append(cast)
+    return casts
+
+
+def use_cast_columns(data: typing.Any) -> typing.Any:
+    """Replace all lists of casts (any value under a "casts"-key) in a serialized payload with their columnar encoding."""
+    if isinstance(data, dict):
+        return {
+            key: encode_cast_columns(value)
+            if key == "casts" and isinstance(value, list) and get_cast_column_keys(value)
+            else use_cast_columns(value)
+            for key, value in data.items()
+        }
+    if isinstance(data, list):
+        return [use_cast_columns(value) for value in data]
+    return data
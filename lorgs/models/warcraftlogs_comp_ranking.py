@@ -64,6 +64,36 @@ class FilterExpression(pydantic.BaseModel):
         op = self.OPS[self.op]
         return op(values.get(self.attr, 0), self.value)
 
+    def get_mask(self, counts: dict[int, int], all_fights: int) -> int:
+        """Bitmask of all fights matching this expression.
+
+        Args:
+            counts: bitmask of the fights for each (non zero) count of our attribute
+            all_fights: bitmask of all fights
+
+        """
+        op = self.OPS[self.op]
+        mask = 0
+        for count, fights in counts.items():
+            if op(count, self.value):
+                mask |= fights
+
+        # fights without any
+        if op(0, self.value):
+            any_count = 0
+            for fights in counts.values():
+                any_count |= fights
+            mask |= all_fights & ~any_count
+        return mask
+
+
+def iter_bits(mask: int) -> typing.Iterator[int]:
+    """Yield the index of each bit set in the mask, in ascending order."""
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
 
 class FightComposition(typing_extensions.TypedDict):
     roles: dict[str, int]
@@ -135,6 +165,104 @@ class CompRankingReport(warcraftlogs_report.Report):
     fights: list[CompRankingFight] = []  # type: ignore # mypy doesn't like reassignment
 
 
+class CompRankingIndex(pydantic.BaseModel):
+    """Columns with the composition of each fight (with a composition) in the ranking.
+
+    Fights are in the same order as in `CompRanking.reports`,
+    referenced by `(report index, fight index)` in `locations`.
+    """
+
+    locations: list[tuple[int, int]] = []
+    durations: list[int] = []
+    roles: dict[str, list[int]] = {}
+    """role code -> number of players with the role in each fight."""
+    specs: dict[str, list[int]] = {}
+    """spec slug -> number of players with the spec in each fight."""
+
+    _bitsets: dict[tuple[str, str], dict[int, int]] = pydantic.PrivateAttr(default_factory=dict)
+
+    @classmethod
+    def build(cls, reports: list[CompRankingReport]) -> "CompRankingIndex":
+        locations = [
+            (report_index, fight_index)
+            for report_index, report in enumerate(reports)
+            for fight_index, fight in enumerate(report.fights)
+            if fight.composition
+        ]
+        fights = [reports[r].fights[f] for r, f in locations]
+
+        def build_columns(kind: str) -> dict[str, list[int]]:
+            columns: dict[str, list[int]] = defaultdict(lambda: [0] * len(fights))
+            for i, fight in enumerate(fights):
+                for name, count in fight.composition[kind].items():  # type: ignore
+                    columns[name][i] = count
+            return dict(columns)
+
+        return cls(
+            locations=locations,
+            durations=[fight.duration for fight in fights],
+            roles=build_columns("roles"),
+            specs=build_columns("specs"),
+        )
+
+    def is_valid_for(self, reports: list[CompRankingReport]) -> bool:
+        """Check if the index still matches the reports."""
+        num_fights = sum(1 for report in reports for fight in report.fights if fight.composition)
+        if num_fights != len(self.locations):
+            return False
+        try:
+            return all(reports[r].fights[f].duration == d for (r, f), d in zip(self.locations, self.durations))
+        except IndexError:
+            return False
+
+    @property
+    def all_fights(self) -> int:
+        return (1 << len(self.locations)) - 1
+
+    def get_bitsets(self, kind: str, name: str) -> dict[int, int]:
+        """Bitmask of the fights for each count of the given role/spec."""
+        key = (kind, name)
+        if key not in self._bitsets:
+            column = getattr(self, kind).get(name) or []
+            bitsets: dict[int, int] = defaultdict(int)
+            for i, count in enumerate(column):
+                if count:
+                    bitsets[count] |= 1 << i
+            self._bitsets[key] = dict(bitsets)
+        return self._bitsets[key]
+
+    def get_killtime_mask(self, killtime_min: int = 0, killtime_max: int = 0) -> int:
+        """Bitmask of the fights within the given kill times (in milliseconds)."""
+        mask = 0
+        for i, duration in enumerate(self.durations):
+            if killtime_min and duration < killtime_min:
+                continue
+            if killtime_max and duration > killtime_max:
+                continue
+            mask |= 1 << i
+        return mask
+
+    def filter(
+        self,
+        roles: typing.Iterable[FilterExpression] = (),
+        specs: typing.Iterable[FilterExpression] = (),
+        killtime_min: int = 0,
+        killtime_max: int = 0,
+    ) -> int:
+        """Bitmask of all fights matching all filters."""
+        all_fights = self.all_fights
+        mask = all_fights
+        if killtime_min or killtime_max:
+            mask &= self.get_killtime_mask(killtime_min, killtime_max)
+
+        for kind, expressions in (("roles", roles), ("specs", specs)):
+            for expr in expressions:
+                if not mask:
+                    return 0
+                mask &= expr.get_mask(self.get_bitsets(kind, expr.attr), all_fights)
+        return mask
+
+
 class CompRanking(base.S3Model, warcraftlogs_base.wclclient_mixin):
     """A Group/List of reports for a given Boss."""
 
@@ -147,6 +275,12 @@ class CompRanking(base.S3Model, warcraftlogs_base.wclclient_mixin):
     reports: list[CompRankingReport] = []
     """all reports for this boss."""
 
+    index: Optional[CompRankingIndex] = None
+    """Composition of all fights, to filter them without going through each fight."""
+
+    _index_checked: Optional[list] = pydantic.PrivateAttr(default=None)
+    """The list of reports the index has been checked against."""
+
     # Config
     key: typing.ClassVar[str] = "{boss_slug}"
 
@@ -210,7 +344,7 @@ class CompRanking(base.S3Model, warcraftlogs_base.wclclient_mixin):
 
         # execute the query
         query = self.get_query(metric=metric, page=page)
-        query_result = await self.client.query(query)
+        query_result = await self.client.query(query, priority=wcl.Priority.HIGH)
         query_result = query_result["worldData"]
 
         # parse data
@@ -254,11 +388,66 @@ class CompRanking(base.S3Model, warcraftlogs_base.wclclient_mixin):
         await self.load_many(fights_to_load, raise_errors=False)  # type: ignore
 
         self.sort_reports()
+        self.update_index()
         self.updated = datetime.datetime.utcnow()
 
     def sort_reports(self) -> None:
         self.reports = sort_reports(self.reports)
 
+    ############################################################################
+    # Filter
+    #
+    def update_index(self) -> None:
+        self.index = CompRankingIndex.build(self.reports)
+        self._index_checked = self.reports
+
+    def get_index(self) -> CompRankingIndex:
+        """The index for the current reports (rebuilding it, if it's missing or outdated)."""
+        if self._index_checked is not self.reports:
+            if not (self.index and self.index.is_valid_for(self.reports)):
+                self.update_index()
+            self._index_checked = self.reports
+        return self.index  # type: ignore
+
+    def filter_reports(
+        self,
+        roles: typing.Iterable[str] = (),
+        specs: typing.Iterable[str] = (),
+        killtime_min: int = 0,
+        killtime_max: int = 0,
+        limit: typing.Optional[int] = None,
+        offset: int = 0,
+    ) -> list[CompRankingReport]:
+        """Get copies of the reports, with only the fights matching all filters.
+
+        Args:
+            roles/specs: filter expressions (eg.: "heal.eq.2")
+            killtime_min/killtime_max: in seconds
+            limit/offset: pagination of the reports (`limit=None` returns all reports, 0 returns none)
+
+        """
+        index = self.get_index()
+        mask = index.filter(
+            roles=[FilterExpression.parse_str(expr) for expr in roles],
+            specs=[FilterExpression.parse_str(expr) for expr in specs],
+            killtime_min=killtime_min * 1000,
+            killtime_max=killtime_max * 1000,
+        )
+
+        # group the matching fights by report
+        fights_by_report: dict[int, list[CompRankingFight]] = {}
+        for i in iter_bits(mask):
+            report_index, fight_index = index.locations[i]
+            if report_index not in fights_by_report:
+                if limit is not None and len(fights_by_report) >= offset + limit:
+                    break
+                fights_by_report[report_index] = []
+            fights_by_report[report_index].append(self.reports[report_index].fights[fight_index])
+
+        # the reports are shared (eg.: by `get_cached`). So we return copies.
+        items = list(fights_by_report.items())[offset:]
+        return [self.reports[report_index].model_copy(update={"fights": fights}) for report_index, fights in items]
+
 
 def sort_reports(reports: list[CompRankingReport]) -> list[CompRankingReport]:
     def key(report: CompRankingReport):
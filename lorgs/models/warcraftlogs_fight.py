@@ -16,6 +16,7 @@ from lorgs.clients import wcl
 from lorgs.logger import logger
 from lorgs.models import warcraftlogs_base
 from lorgs.models.warcraftlogs_boss import Boss
+from lorgs.models.warcraftlogs_fight_registry import get_fight_registry
 from lorgs.models.warcraftlogs_player import Player
 from lorgs.models.wow_spec import WowSpec
 
@@ -224,6 +225,13 @@ class Fight(warcraftlogs_base.BaseModel):
         """
         )
 
+    async def load(self, raise_errors=False) -> None:
+        # share the summary with other rankings in the same sweep
+        registry = get_fight_registry()
+        if registry and self.report:
+            return await registry.load_fight(self)
+        return await super().load(raise_errors=raise_errors)
+
     def process_players(self, summary_data: "wcl.ReportSummary"):
         self.players = []
 
@@ -0,0 +1,303 @@
+"""Registry to share Fight Data between multiple Spec Rankings.
+
+The same top pulls show up in the rankings of most specs. Without sharing,
+each `SpecRanking` would load the summary, phases and boss casts of those
+fights again, and run a separate events query for every player.
+
+While a `FightRegistry` is active (see `set_fight_registry`):
+    - the summary of each fight is only loaded once.
+    - the events for each actor (player or boss) are only loaded once.
+    - all actors of the same fight are loaded with a single query,
+      using one aliased `events`-field per actor.
+
+The registry stores the raw query results, and each model processes them on
+its own. So every ranking still ends up with its own Fight/Player objects.
+
+"""
+from __future__ import annotations
+
+# IMPORT STANDARD LIBRARIES
+import asyncio
+import contextvars
+import functools
+import textwrap
+import typing
+from collections import defaultdict
+
+# IMPORT THIRD PARTY LIBRARIES
+import pydantic
+
+# IMPORT LOCAL LIBRARIES
+from lorgs.logger import logger
+from lorgs.models import warcraftlogs_base
+from lorgs.models.warcraftlogs_actor import EVENTS_PAGE_LIMIT
+
+
+if typing.TYPE_CHECKING:
+    from lorgs.clients.wcl.client import WarcraftlogsClient
+    from lorgs.models.warcraftlogs_actor import BaseActor
+    from lorgs.models.warcraftlogs_fight import Fight
+
+
+FightKey = tuple[str, int]
+"""(report_id, fight_id)"""
+
+ActorKey = tuple[str, int, str]
+"""(report_id, fight_id, filter expression)"""
+
+
+FIGHT_REGISTRY: contextvars.ContextVar[typing.Optional["FightRegistry"]] = contextvars.ContextVar(
+    "FIGHT_REGISTRY",
+    default=None,
+)
+
+
+def get_fight_registry() -> typing.Optional["FightRegistry"]:
+    return FIGHT_REGISTRY.get()
+
+
+def set_fight_registry(registry: typing.Optional["FightRegistry"]) -> contextvars.Token:
+    return FIGHT_REGISTRY.set(registry)
+
+
+def reset_fight_registry(token: contextvars.Token) -> None:
+    FIGHT_REGISTRY.reset(token)
+
+
+def get_fight_key(fight: "Fight") -> FightKey:
+    if not fight.report:
+        raise ValueError("Missing Parent Report")
+    return (fight.report.report_id, fight.fight_id)
+
+
+class FightRegistry:
+    """Query results for fights, shared for the duration of a sweep."""
+
+    def __init__(self) -> None:
+        self.summaries: dict[FightKey, asyncio.Future] = {}
+        self.events: dict[ActorKey, asyncio.Future] = {}
+
+        self._tasks: set[asyncio.Future] = set()
+        """Running queries, which nobody awaits directly (the event loop only keeps weak references)."""
+
+        # stats
+        self.num_queries = 0
+        self.num_hits = 0
+
+    def __repr__(self) -> str:
+        return f"FightRegistry(fights={len(self.summaries)}, actors={len(self.events)})"
+
+    def metrics(self) -> dict[str, int]:
+        return {
+            "fights": len(self.summaries),
+            "actors": len(self.events),
+            "queries": self.num_queries,
+            "hits": self.num_hits,
+        }
+
+    @property
+    def client(self) -> "WarcraftlogsClient":
+        return warcraftlogs_base.get_client()
+
+    ############################################################################
+    # Fights
+    #
+
+    async def _load_summary(self, fight: "Fight") -> dict[str, typing.Any]:
+        self.num_queries += 1
+        return await self.client.query(query=fight.get_query(), raise_errors=False)
+
+    async def load_fight(self, fight: "Fight") -> None:
+        """Load the summary of a fight, or reuse the result from an earlier load."""
+        key = get_fight_key(fight)
+
+        future = self.summaries.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._load_summary(fight))
+            self.summaries[key] = future
+        else:
+            self.num_hits += 1
+
+        try:
+            result = await asyncio.shield(future)
+        except Exception:
+            self.summaries.pop(key, None)  # allow the next ranking to retry
+            raise
+
+        if not result:
+            return
+
+        try:
+            fight.process_query_result(**result)
+        except pydantic.ValidationError as e:
+            logger.warning(e)
+
+    ############################################################################
+    # Actors
+    #
+
+    @staticmethod
+    def get_actor_key(actor: "BaseActor") -> typing.Optional[ActorKey]:
+        """Key to identify the query for an actor. None if the actor has nothing to query."""
+        if not actor.fight:
+            raise ValueError("missing fight")
+
+        sub_query = actor.get_sub_query()
+        if not sub_query:
+            return None
+        report_id, fight_id = get_fight_key(actor.fight)
+        return (report_id, fight_id, sub_query)
+
+    @staticmethod
+    def get_fight_events_query(fight: "Fight", aliases: dict[str, str]) -> str:
+        """Query the events for multiple filters in a single query.
+
+        Args:
+            fight: the fight to load the events for
+            aliases: map of alias -> filterExpression
+
+        """
+        if not fight.report:
+            raise ValueError("Missing Parent Report")
+
+        parts = "\n".join(
+            f"""{alias}: events(startTime: {fight.start_time_rel}, endTime: {fight.end_time_rel}, filterExpression: "{sub_query}", limit: {EVENTS_PAGE_LIMIT}) {{data nextPageTimestamp}}"""
+            for alias, sub_query in aliases.items()
+        )
+        return textwrap.dedent(
+            f"""\
+            reportData
+            {{
+                report(code: "{fight.report.report_id}")
+                {{
+                    {parts}
+                }}
+            }}
+            """
+        )
+
+    @staticmethod
+    async def _load_remaining_pages(actor: "BaseActor", start_time: int) -> list[dict[str, typing.Any]]:
+        events: list[dict[str, typing.Any]] = []
+        async for page in actor.iter_event_pages(start_time=start_time):
+            events += page
+        return events
+
+    def _fail_actor(self, key: ActorKey, exception: BaseException) -> None:
+        """Fail the query of an actor. It's removed from the registry, so the next ranking can retry."""
+        future = self.events.pop(key, None)
+        if future and not future.done():
+            future.set_exception(exception)
+
+    def _release_actors(self, futures: dict[ActorKey, asyncio.Future], task: asyncio.Future) -> None:
+        """Don't leave anyone waiting, once the query is done (eg.: if it got cancelled before it even started)."""
+        for key, future in futures.items():
+            if future.done():
+                continue
+            if self.events.get(key) is future:
+                del self.events[key]
+            if task.cancelled():
+                future.cancel()
+            else:
+                future.set_exception(task.exception() or RuntimeError(f"No events returned for {key}"))
+
+    async def _load_fight_events(self, fight: "Fight", items: list[tuple[ActorKey, "BaseActor"]]) -> None:
+        """Run a single events query for all actors of the same fight, and resolve their futures.
+
+        Actors with more events than fit on a single page load the remaining pages on their own.
+        Any actor without a result (eg.: its part of the query failed) fails on its own.
+        """
+        aliases = {f"actor_{i}": key[2] for i, (key, _) in enumerate(items)}
+        query = self.get_fight_events_query(fight, aliases)
+
+        self.num_queries += 1
+        try:
+            result = await self.client.query(query=query, raise_errors=False)
+            report_data = (result.get("reportData") or {}).get("report") or {}
+
+            pages: list[dict[str, typing.Any]] = [report_data.get(alias) or {} for alias in aliases]
+            remaining = await asyncio.gather(
+                *(
+                    self._load_remaining_pages(actor, page["nextPageTimestamp"])
+                    for page, (_, actor) in zip(pages, items)
+                    if page.get("nextPageTimestamp")
+                ),
+                return_exceptions=True,
+            )
+        except Exception as e:
+            for key, _ in items:
+                self._fail_actor(key, e)
+            return
+
+        remaining_iter = iter(remaining)
+        for page, (key, _) in zip(pages, items):
+            if not page:
+                self._fail_actor(key, ValueError(f"No events returned for {key}"))
+                continue
+
+            events = list(page.get("data") or [])
+            if page.get("nextPageTimestamp"):
+                more_events = next(remaining_iter)
+                if isinstance(more_events, BaseException):
+                    self._fail_actor(key, more_events)
+                    continue
+                events += more_events
+            # same shape as the result of `BaseActor.get_query`
+            self.events[key].set_result({"reportData": {"report": {"events": {"data": events}}}})
+
+    async def _load_actor(self, actor: "BaseActor", future: typing.Optional[asyncio.Future]) -> None:
+        actor.event_actor_load.send(actor, status="start")
+        try:
+            result = await asyncio.shield(future) if future else {}
+            if result:
+                actor.process_query_result(**result)
+        except pydantic.ValidationError as e:
+            logger.warning(e)
+        except (Exception, asyncio.CancelledError):
+            actor.event_actor_load.send(actor, status="failed")
+            raise
+        actor.event_actor_load.send(actor, status="success")
+
+    async def load_actors(self, actors: typing.Sequence["BaseActor"]) -> list[typing.Optional[BaseException]]:
+        """Load the casts for multiple actors.
+
+        Actors which have been loaded before reuse the existing results.
+        All remaining actors are grouped by fight, with a single query per fight.
+
+        Returns:
+            the exception raised while loading each actor (or None)
+
+        """
+        futures: list[typing.Optional[asyncio.Future]] = []
+        missing: dict[FightKey, list[tuple[ActorKey, "BaseActor"]]] = defaultdict(list)
+        fights: dict[FightKey, "Fight"] = {}
+
+        loop = asyncio.get_running_loop()
+        for actor in actors:
+            key = self.get_actor_key(actor)
+            if key is None:
+                futures.append(None)
+                continue
+
+            future = self.events.get(key)
+            if future is None:
+                future = loop.create_future()
+                self.events[key] = future
+                fight_key: FightKey = (key[0], key[1])
+                missing[fight_key].append((key, actor))
+                fights[fight_key] = actor.fight  # type: ignore
+            else:
+                self.num_hits += 1
+            futures.append(future)
+
+        for fight_key, items in missing.items():
+            task = asyncio.ensure_future(self._load_fight_events(fights[fight_key], items))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            task.add_done_callback(functools.partial(self._release_actors, {key: self.events[key] for key, _ in items}))
+
+        results = await asyncio.gather(
+            *(self._load_actor(actor, future) for actor, future in zip(actors, futures)),
+            return_exceptions=True,
+        )
+        return [result if isinstance(result, BaseException) else None for result in results]
@@ -6,12 +6,12 @@ from typing import Optional
 
 # IMPORT LOCAL LIBRARIES
 from lorgs.clients import wcl
-from lorgs.limit_breaks import LIMIT_BREAKS
+from lorgs.limit_breaks import get_limit_break_query
 from lorgs.limit_breaks import is_limit_break_spell_id
 from lorgs.models.warcraftlogs_actor import BaseActor
 from lorgs.models.wow_class import WowClass
 from lorgs.models.wow_spec import WowSpec
-from lorgs.models.wow_spell import WowSpell, build_spell_query
+from lorgs.models.wow_spell import WowSpell
 
 
 DANCER_SPEC_SLUG = "dancer-dancer"
@@ -88,21 +88,21 @@ class Player(BaseActor):
         target_filter = get_filter("target")
 
         # Casts
-        casts_query = build_spell_query(*self.actor_type.all_spells)
+        casts_query = self.actor_type.get_spell_query("all_spells")
         if casts_query and source_filter:
             casts_query = f"{source_filter} and ({casts_query})"
 
         # Limit Break is a raid event: every row should show it, regardless of who pressed it.
-        limit_break_query = build_spell_query(*LIMIT_BREAKS)
+        limit_break_query = get_limit_break_query()
         casts_query = self.combine_queries(casts_query, limit_break_query)
 
         # Auras
-        auras_query = build_spell_query(*self.actor_type.all_buffs, *self.actor_type.all_debuffs)
+        auras_query = self.actor_type.get_spell_query("all_buffs", "all_debuffs")
         if auras_query and target_filter:
             auras_query = f"{target_filter} and ({auras_query})"
 
         # Events
-        events_query = build_spell_query(*self.actor_type.all_events)
+        events_query = self.actor_type.get_spell_query("all_events")
         if events_query and source_filter:
             events_query = f"{source_filter} and ({events_query})"
 
@@ -159,7 +159,7 @@ class Player(BaseActor):
             }
             self.deaths.append(death_data)
 
-    def process_event_resurrect(self, event: "wcl.ReportEvent"):
+    def process_event_resurrect(self, event: "wcl.AnyReportEvent"):
         fight_start = self.fight.start_time_rel if self.fight else 0
 
         data: dict[str, typing.Any] = {}
@@ -184,7 +184,7 @@ class Player(BaseActor):
 
         self.resurrects.append(data)
 
-    def process_event(self, event: "wcl.ReportEvent") -> wcl.ReportEvent:
+    def process_event(self, event: "wcl.AnyReportEvent") -> wcl.AnyReportEvent:
         # Ankh doesn't shows as a regular spell
         spell_id = event.abilityGameID
         if spell_id in (21169,):  # Ankh
@@ -196,7 +196,7 @@ class Player(BaseActor):
 
         return super().process_event(event)
 
-    def process_events(self, events: list[wcl.ReportEvent]) -> list[wcl.ReportEvent]:
+    def process_events(self, events: typing.Sequence[wcl.AnyReportEvent]) -> typing.Sequence[wcl.AnyReportEvent]:
         if self.spec_slug != DANCER_SPEC_SLUG:
             return super().process_events(events)
 
@@ -230,7 +230,7 @@ class Player(BaseActor):
         self.dance_partners = sorted(partners_by_source_id.values(), key=lambda partner: partner["first_ts"])
         return super().process_events(events)
 
-    def should_include_cast_event(self, event: "wcl.ReportEvent", cast_actor_id: int) -> bool:
+    def should_include_cast_event(self, event: "wcl.AnyReportEvent", cast_actor_id: int) -> bool:
         if event.type == "cast" and is_limit_break_spell_id(event.abilityGameID):
             return True
         return super().should_include_cast_event(event, cast_actor_id)
@@ -18,6 +18,7 @@ from lorgs.models.base.s3 import S3Model
 from lorgs.models.raid_boss import RaidBoss
 from lorgs.models.warcraftlogs_boss import Boss
 from lorgs.models.warcraftlogs_fight import Fight
+from lorgs.models.warcraftlogs_fight_registry import get_fight_registry
 from lorgs.models.warcraftlogs_player import Player
 from lorgs.models.warcraftlogs_report import Report
 from lorgs.models.wow_spec import WowSpec
@@ -41,6 +42,13 @@ RANKING_REGION_LIMITS = {
 
 RANKING_PARTITIONS = tuple(range(1, 11))
 
+RANKING_PARTITION_BATCHES = (1, 2, 3)
+"""Number of partitions to load per request, newest first (any remaining ones are loaded in one go).
+
+The newest partitions usually fill the quotas on their own, so the first requests are kept small.
+See `SpecRanking.load_region_rankings`.
+"""
+
 
 class SpecRanking(S3Model, warcraftlogs_base.wclclient_mixin):
     # Fields
@@ -133,7 +141,7 @@ class SpecRanking(S3Model, warcraftlogs_base.wclclient_mixin):
     ############################################################################
     # Query: Rankings
     #
-    def get_query(self, server_region: str = "") -> str:
+    def get_query(self, server_region: str = "", partitions: typing.Iterable[int] = RANKING_PARTITIONS) -> str:
         """Return the Query to load the rankings for this Spec & Boss."""
         difficulty_id = DIFFICULTY_IDS.get(self.difficulty) or 101
 
@@ -159,7 +167,7 @@ class SpecRanking(S3Model, warcraftlogs_base.wclclient_mixin):
         # 3. 组合查询：Global 用具体名，CN 用 "Global"
         partition_queries = "\n".join(
             f"p{partition}: {build_rankings_query(real_class_name, f'partition: {partition}')}"
-            for partition in RANKING_PARTITIONS
+            for partition in partitions
         )
 
         return textwrap.dedent(
@@ -183,6 +191,32 @@ class SpecRanking(S3Model, warcraftlogs_base.wclclient_mixin):
                     key = (report.report_id, fight.fight_id, player.name)
                     yield key
 
+    def remove_old_fights(self, keys: typing.Collection[tuple[str, int, str]]) -> None:
+        """Remove all fights whose ranker is no longer part of the ranking.
+
+        Args:
+            keys: (report_id, fight_id, name) of each current ranking entry
+
+        """
+        kept = 0
+        removed = 0
+        for report in self.reports:
+            fights = [
+                fight
+                for fight in report.fights
+                if any(
+                    (report.report_id, fight.fight_id, player.name) in keys
+                    for player in fight.players
+                    if player.spec_slug == self.spec_slug
+                )
+            ]
+            removed += len(report.fights) - len(fights)
+            kept += len(fights)
+            report.fights = fights
+
+        self.reports = [report for report in self.reports if report.fights]
+        logger.info(f"[Incremental] kept {kept} fights, removed {removed} fights.")
+
     def add_new_fight(self, ranking_data: wcl.CharacterRanking) -> None:
         report_data = ranking_data.report
 
@@ -264,12 +298,27 @@ class SpecRanking(S3Model, warcraftlogs_base.wclclient_mixin):
             self.add_new_fight(ranking_data)
             old_reports.add(key)
 
+    @classmethod
+    def get_ranking_bucket(cls, ranking: wcl.CharacterRanking) -> str:
+        """Name of the quota (see `RANKING_REGION_LIMITS`) a ranking counts towards."""
+        region = cls.normalize_region(ranking.server.region)
+        if region == "CN":
+            return "cn"
+        if region == "KR":
+            return "kr"
+        return "global"
+
     def process_query_result(self, **query_result: typing.Any):
         """Process the Ranking Results."""
         self.process_query_results(query_result)
 
-    def process_query_results(self, *query_results: typing.Any):
-        """Process and merge ranking results from one or more FF Logs endpoints."""
+    def process_query_results(self, *query_results: typing.Any, prune_old: bool = False):
+        """Process and merge ranking results from one or more FF Logs endpoints.
+
+        Args:
+            prune_old: remove existing fights, which are no longer part of the ranking
+
+        """
 
         def valid_rankings(rankings: list[wcl.CharacterRanking]) -> list[wcl.CharacterRanking]:
             return [ranking for ranking in rankings if not ranking.hidden and ranking.report]
@@ -292,13 +341,7 @@ class SpecRanking(S3Model, warcraftlogs_base.wclclient_mixin):
             "kr": [],
         }
         for ranking in ranking_by_key.values():
-            region = self.normalize_region(ranking.server.region)
-            if region == "CN":
-                regional_rankings["cn"].append(ranking)
-            elif region == "KR":
-                regional_rankings["kr"].append(ranking)
-            else:
-                regional_rankings["global"].append(ranking)
+            regional_rankings[self.get_ranking_bucket(ranking)].append(ranking)
 
         for rankings in regional_rankings.values():
             rankings.sort(key=lambda ranking: ranking.amount, reverse=True)
@@ -319,17 +362,73 @@ class SpecRanking(S3Model, warcraftlogs_base.wclclient_mixin):
             len(kr_rankings),
             len(rankings),
         )
+        if prune_old:
+            self.remove_old_fights({(r.report.code, r.report.fightID, r.name) for r in rankings})
         self.add_new_fights(rankings)
         self.post_init()
 
-    async def load_rankings(self, regions: Optional[typing.Iterable[str]] = None) -> None:
+    async def load_rankings(self, regions: Optional[typing.Iterable[str]] = None, prune_old: bool = False) -> None:
         """Fetch the current Ranking Data"""
-        query_results = []
-        for region in regions or ("",):
-            query = self.get_query(server_region=region)
-            result = await self.client.query(query, region=region)
-            query_results.append(result)
-        self.process_query_results(*query_results)
+        query_results = await asyncio.gather(*(self.load_region_rankings(region) for region in regions or ("",)))
+        self.process_query_results(*query_results, prune_old=prune_old)
+
+    def get_region_buckets(self, region: str) -> list[str]:
+        """Names of the quotas filled by the rankings of the given server region."""
+        region = self.normalize_region(region)
+        if region == "CN":
+            return ["cn"]
+        if region == "KR":
+            return ["kr"]
+        return ["global"]
+
+    def get_ranking_cutoffs(self, encounter_data: dict[str, typing.Any]) -> dict[str, float]:
+        """Lowest amount that still makes it into each quota (only for quotas which are filled)."""
+        amounts: dict[tuple[str, int, str], tuple[str, float]] = {}
+        for partition_data in encounter_data.values():
+            for ranking in wcl.CharacterRankings(**(partition_data or {})).rankings:
+                if ranking.hidden or not ranking.report:
+                    continue
+                key = (ranking.report.code, ranking.report.fightID, ranking.name)
+                old_amount = amounts.get(key, ("", 0.0))[1]
+                amounts[key] = (self.get_ranking_bucket(ranking), max(old_amount, ranking.amount))
+
+        cutoffs: dict[str, float] = {}
+        for bucket, limit in RANKING_REGION_LIMITS.items():
+            bucket_amounts = sorted((amount for b, amount in amounts.values() if b == bucket), reverse=True)
+            if len(bucket_amounts) >= limit:
+                cutoffs[bucket] = bucket_amounts[limit - 1]
+        return cutoffs
+
+    async def load_region_rankings(self, region: str = "") -> dict[str, typing.Any]:
+        """Load the rankings of the most recent partitions, until the quota of the region is filled.
+
+        Partitions are loaded newest first, in small batches (see `RANKING_PARTITION_BATCHES`).
+        Once the quota is filled, the older partitions (past patches) are skipped.
+        """
+        remaining = sorted(RANKING_PARTITIONS, reverse=True)
+        buckets = self.get_region_buckets(region)
+        batch_sizes = iter(RANKING_PARTITION_BATCHES)
+
+        encounter_data: dict[str, typing.Any] = {}
+        while remaining:
+            batch_size = next(batch_sizes, len(remaining))
+            partitions, remaining = remaining[:batch_size], remaining[batch_size:]
+
+            query = self.get_query(server_region=region, partitions=partitions)
+            result = await self.client.query(query, region=region, priority=wcl.Priority.HIGH)
+            encounter_data.update((result.get("worldData") or {}).get("encounter") or {})
+
+            cutoffs = self.get_ranking_cutoffs(encounter_data)
+            if all(bucket in cutoffs for bucket in buckets):
+                break
+
+        logger.info(
+            "[Partitions] region=%s loaded=%s skipped=%s",
+            region or "global",
+            len(RANKING_PARTITIONS) - len(remaining),
+            len(remaining),
+        )
+        return {"worldData": {"encounter": encounter_data}}
 
     def _build_report_metric_totals_query(self, report: Report) -> str:
         fight_ids = sorted({fight.fight_id for fight in report.fights if fight.fight_id})
@@ -367,24 +466,33 @@ class SpecRanking(S3Model, warcraftlogs_base.wclclient_mixin):
 
                     yield fight_id, name, spec.full_name_slug, amount
 
-    async def load_metric_totals(self) -> None:
-        """Overwrite fight-summary totals with ranking totals for the active metric."""
+    async def load_metric_totals(self, reports: Optional[list[Report]] = None) -> None:
+        """Overwrite fight-summary totals with ranking totals for the active metric.
+
+        Args:
+            reports: only load the totals for these reports (default: all)
+
+        """
         if not self._should_load_buddies():
             return
 
-        reports = [report for report in self.reports if report.report_id and report.fights]
+        reports = reports if reports is not None else self.reports
+        reports = [report for report in reports if report.report_id and report.fights]
         if not reports:
             return
 
-        tasks = [
-            self.client.query(
-                self._build_report_metric_totals_query(report),
-                raise_errors=False,
-                region=report.region,
-            )
-            for report in reports
-        ]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        # combine the queries for all reports into a few requests
+        with warcraftlogs_base.query_batch(across_reports=True):
+            tasks = [
+                self.client.query(
+                    self._build_report_metric_totals_query(report),
+                    raise_errors=False,
+                    region=report.region,
+                    priority=wcl.Priority.LOW,
+                )
+                for report in reports
+            ]
+            results = await asyncio.gather(*tasks, return_exceptions=True)
 
         metric_totals: dict[tuple[str, int, str, str], float] = {}
         for report, result in zip(reports, results):
@@ -511,12 +619,14 @@ class SpecRanking(S3Model, warcraftlogs_base.wclclient_mixin):
         if not report_queries:
             return
 
-        results = await asyncio.gather(
-            *[
-                self.client.query(query, raise_errors=False, region=report.region)
-                for report, _alias_contexts, query in report_queries
-            ]
-        )
+        # combine the queries for all reports into a few requests
+        with warcraftlogs_base.query_batch(across_reports=True):
+            results = await asyncio.gather(
+                *[
+                    self.client.query(query, raise_errors=False, region=report.region, priority=wcl.Priority.LOW)
+                    for report, _alias_contexts, query in report_queries
+                ]
+            )
 
         applied = 0
         for (report, alias_contexts, _query), result in zip(report_queries, results):
@@ -561,12 +671,11 @@ class SpecRanking(S3Model, warcraftlogs_base.wclclient_mixin):
         if applied:
             logger.info(f"[Dance Partner] Applied {applied} dance partner rows from Buffs tables.")
 
-    async def load_actors(self) -> None:
-        """Load the Casts for all missing fights."""
+    def get_actors_to_load(self) -> list[typing.Any]:
+        """Return the players and bosses whose casts are still missing."""
         # [优化] 只加载主角 (DPS > 0 的那个) 的技能数据
         actors_to_load = [p for p in self.players if p.spec_slug == self.spec_slug and p.total > 0]
         load_role_buddies = bool(self.spec and self.spec.role and self.spec.role.code in ("tank", "heal"))
-        load_dance_partners = self.spec_slug == "dancer-dancer"
         buddy_role_code = self.spec.role.code if load_role_buddies else ""
 
         for i, fight in enumerate(self.fights):
@@ -600,7 +709,13 @@ class SpecRanking(S3Model, warcraftlogs_base.wclclient_mixin):
             if should_load_boss:
                 actors_to_load.append(fight.boss)
 
-        actors_to_load = [actor for actor in actors_to_load if actor and not actor.casts]
+        return [actor for actor in actors_to_load if actor and not actor.casts]
+
+    async def load_actors(self) -> None:
+        """Load the Casts for all missing fights."""
+        load_dance_partners = self.spec_slug == "dancer-dancer"
+
+        actors_to_load = self.get_actors_to_load()
         unique_actors = []
         seen_actors = {}
         duplicate_actors = []
@@ -662,10 +777,15 @@ class SpecRanking(S3Model, warcraftlogs_base.wclclient_mixin):
 
     async def _load_actors_safely(self, actors: list[typing.Any], label: str) -> None:
         """Load actor casts without letting one bad FF Logs response drop the whole ranking."""
-        results = await asyncio.gather(
-            *(actor.load(raise_errors=False) for actor in actors),
-            return_exceptions=True,
-        )
+        registry = get_fight_registry()
+        with warcraftlogs_base.query_batch():
+            if registry:
+                results = await registry.load_actors(actors)
+            else:
+                results = await asyncio.gather(
+                    *(actor.load(raise_errors=False) for actor in actors),
+                    return_exceptions=True,
+                )
         failed = 0
         for actor, result in zip(actors, results):
             if isinstance(result, Exception):
@@ -684,16 +804,54 @@ class SpecRanking(S3Model, warcraftlogs_base.wclclient_mixin):
         limit=50,
         clear_old=False,
         ranking_regions: Optional[typing.Iterable[str]] = None,
+        incremental=False,
     ) -> None:
         """Get Top Ranks for a given boss and spec."""
+        await self.load_fights(
+            limit=limit,
+            clear_old=clear_old,
+            ranking_regions=ranking_regions,
+            incremental=incremental,
+        )
+
+        # 5. Load Spells
+        await self.load_actors()
+
+        logger.info("done")
+
+        self.updated = datetime.datetime.now(datetime.timezone.utc)
+        self.dirty = False
+
+    async def load_fights(
+        self,
+        limit=50,
+        clear_old=False,
+        ranking_regions: Optional[typing.Iterable[str]] = None,
+        incremental=False,
+    ) -> None:
+        """Load the Rankings and Fights, without the casts of each player.
+
+        Args:
+            limit: max number of reports to keep
+            clear_old: remove all existing fights first
+            ranking_regions: ranking endpoints to query
+            incremental: keep the existing fights (including their casts) which
+                are still part of the ranking, and only add the new ones.
+                Fights which fell off the ranking are removed.
+
+        """
         logger.info(f"--- [v4-FINAL] LOADING WITH STRICT MANIFEST (No-Compromise) ---") 
-        logger.info(f"{self.boss.name} vs. {self.spec.name} {self.spec.wow_class.name} START | limit={limit} | clear_old={clear_old}")
+        logger.info(
+            f"{self.boss.name} vs. {self.spec.name} {self.spec.wow_class.name} START "
+            f"| limit={limit} | clear_old={clear_old} | incremental={incremental}"
+        )
 
         if clear_old:
             self.reports = []
+        old_fights = {(report.report_id, fight.fight_id) for report in self.reports for fight in report.fights}
 
         # 1. Load Rankings (绝对真理)
-        await self.load_rankings(regions=ranking_regions)
+        await self.load_rankings(regions=ranking_regions, prune_old=incremental)
         self.reports = self.sort_reports(self.reports)
 
         # ============================================================
@@ -779,15 +937,13 @@ class SpecRanking(S3Model, warcraftlogs_base.wclclient_mixin):
             # ============================================================
 
         # 4. Align buddy totals with the active ranking metric before frontend export.
-        await self.load_metric_totals()
-
-        # 5. Load Spells
-        await self.load_actors()
-        
-        logger.info("done")
-
-        self.updated = datetime.datetime.now(datetime.timezone.utc)
-        self.dirty = False
+        # (existing fights already got theirs, when they were loaded)
+        new_reports = [
+            report
+            for report in self.reports
+            if any((report.report_id, fight.fight_id) not in old_fights for fight in report.fights)
+        ]
+        await self.load_metric_totals(reports=new_reports)
 
 from lorgs.models.warcraftlogs_report import Report
 SpecRanking.model_rebuild()
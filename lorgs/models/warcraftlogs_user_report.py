@@ -5,9 +5,13 @@ from __future__ import annotations
 # IMPORT STANDARD LIBRARIES
 import typing
 import datetime
+from collections import defaultdict
 
 # IMPORT LOCAL LIBRARIES
 from lorgs.models import base
+from lorgs.models.base.dynamodb import dump_item
+from lorgs.models.warcraftlogs_fight import Fight
+from lorgs.models.warcraftlogs_player import Player
 from lorgs.models.warcraftlogs_report import Report
 
 
@@ -17,9 +21,16 @@ TTL_DURATION = datetime.timedelta(days=365)
 class UserReport(Report, base.DynamoDBModel):
     """A single report loaded via the custom reports module.
 
-    Todo:
-        * Test performance when splitting each report into its own row,
-          saved with the same partion, but different secondary key
+    Each report is saved as multiple rows in the same partition:
+        - "overview": the report itself, with a summary of each fight (without any players)
+        - "fight#0004": each loaded fight (without the players)
+        - "fight#0004#player#0012": each player in a loaded fight
+
+    This way, fights and players can be read and written individually,
+    and the rows stay far below DynamoDB's item size limit.
+
+    Reports saved before, contain all fights and players in the overview.
+    Those get split up, the next time they are saved.
 
     """
 
@@ -30,6 +41,8 @@ class UserReport(Report, base.DynamoDBModel):
     # Config
     pkey: typing.ClassVar[str] = "{report_id}"
     skey: typing.ClassVar[str] = "overview"
+    fight_skey: typing.ClassVar[str] = "fight#{fight_id:04d}"
+    player_skey: typing.ClassVar[str] = "fight#{fight_id:04d}#player#{source_id:04d}"
 
     ################################
     # Properties
@@ -38,14 +51,105 @@ class UserReport(Report, base.DynamoDBModel):
     def is_loaded(self) -> bool:
         return bool(self.fights)
 
+    ################################
+    # Rows
+    #
+    def get_row_keys(self, skey: str) -> dict[str, str]:
+        return {self.pkey_name: self.pkey.format(report_id=self.report_id), self.skey_name: skey}
+
+    def get_overview_item(self, exclude_unset: bool = True) -> dict[str, typing.Any]:
+        """The report, with the fights reduced to their summaries."""
+        exclude = {"fights": {"__all__": {"players": True, "boss": {"casts"}}}}
+        item = self.json_dict(exclude_unset=exclude_unset, exclude=exclude)
+        item.update(self.get_keys(**item))
+        return item
+
+    def get_fight_items(
+        self,
+        fight: Fight,
+        player_ids: typing.Sequence[int] = (),
+        exclude_unset: bool = True,
+    ) -> typing.Iterator[dict[str, typing.Any]]:
+        """The rows for a fight and each of the given players (default: all players).
+
+        Only pass the players which got loaded. The others might have been reset
+        by reloading the fight summary, and would overwrite their stored rows.
+        """
+        item = dump_item(fight, exclude_unset=exclude_unset, exclude={"players"})
+        item.update(self.get_row_keys(self.fight_skey.format(fight_id=fight.fight_id)))
+        item["ttl"] = self.ttl
+        yield item
+
+        for player in fight.get_players(*player_ids):
+            item = dump_item(player, exclude_unset=exclude_unset)
+            item.update(self.get_row_keys(self.player_skey.format(fight_id=fight.fight_id, source_id=player.source_id)))
+            item["ttl"] = self.ttl
+            yield item
+
     ################################
     # Methods
     #
-    def save(self, *args: typing.Any, **kwargs: typing.Any) -> None:  # pylint: disable=arguments-differ
-        """Update the timestamp and Save the Report."""
+    def get_fights(self, *fight_ids: int, player_ids: typing.Sequence[int] = ()) -> list[Fight]:
+        """Get fights including their players, using the rows of the requested fights/players.
+
+        All fight rows are read with a single query, and filtered afterwards.
+        Fights without any rows (eg.: not loaded yet) are returned as they are in the overview.
+        """
+        fight_items: dict[int, dict[str, typing.Any]] = {}
+        player_items: defaultdict[int, list[dict[str, typing.Any]]] = defaultdict(list)
+        for item in self.query_partition(skey_prefix="fight#", report_id=self.report_id):
+            # "fight#0004" or "fight#0004#player#0012"
+            parts = item[self.skey_name].split("#")
+            fight_id = int(parts[1])
+            if fight_id not in fight_ids:
+                continue
+
+            if len(parts) == 2:
+                fight_items[fight_id] = item
+            elif not player_ids or int(parts[3]) in player_ids:
+                player_items[fight_id].append(item)
+
+        loaded: dict[int, Fight] = {}
+        for fight_id, item in fight_items.items():
+            fight = Fight(**item, players=[Player(**player_item) for player_item in player_items[fight_id]])
+            fight.report = self
+            loaded[fight_id] = fight
+
+        self.fights = [loaded.get(fight.fight_id, fight) for fight in self.fights]
+        return super().get_fights(*fight_ids)
+
+    def save(
+        self,
+        exclude_unset: bool = True,
+        fight_ids: typing.Sequence[int] = (),
+        player_ids: typing.Sequence[int] = (),
+    ) -> None:
+        """Update the timestamp and Save the Report.
+
+        Besides the overview, only the rows of the given fights/players are written.
+        Fights still stored with their players in the overview (saved before the
+        fights got their own rows) are split up as well.
+
+        Args:
+            fight_ids: fights loaded by the current task
+            player_ids: players loaded in those fights
+
+        """
         self.updated = datetime.datetime.now(datetime.timezone.utc)
 
         ttl = self.updated + TTL_DURATION
         self.ttl = int(ttl.timestamp())
 
-        return super().save(*args, **kwargs)
+        table = self.get_table()
+        with table.batch_writer(overwrite_by_pkeys=[self.pkey_name, self.skey_name]) as batch:
+            batch.put_item(Item=self.get_overview_item(exclude_unset=exclude_unset))
+            for fight in self.fights:
+                if fight.fight_id in fight_ids:
+                    items = self.get_fight_items(fight, player_ids=player_ids, exclude_unset=exclude_unset)
+                elif any(player.casts for player in fight.players):
+                    items = self.get_fight_items(fight, exclude_unset=exclude_unset)
+                else:
+                    continue
+
+                for item in items:
+                    batch.put_item(Item=item)
@@ -3,10 +3,13 @@ from __future__ import annotations
 # IMPORT STANDARD LIBRARIES
 from typing import Any, Optional
 
+# IMPORT THIRD PARTY LIBRARIES
+import pydantic
+
 # IMPORT LOCAL LIBRARIES
 from lorgs import utils
 from lorgs.models import base
-from lorgs.models.wow_spell import WowSpell
+from lorgs.models.wow_spell import WowSpell, build_spell_query
 
 
 class WowActor(base.MemoryModel):
@@ -25,6 +28,9 @@ class WowActor(base.MemoryModel):
     parents: list["WowActor"] = []
     """List of Parent Types. eg.: Classes are parents of Specs."""
 
+    _spell_queries: dict[tuple[str, ...], tuple[int, str]] = pydantic.PrivateAttr(default_factory=dict)
+    """Cached filter expressions. See `get_spell_query`."""
+
     @property
     def full_name_slug(self) -> str:
         return ""
@@ -53,6 +59,30 @@ class WowActor(base.MemoryModel):
         events = [p.all_events for p in self.parents] + [self.events]
         return utils.flatten(events)
 
+    ##########################
+    # Query
+    #
+    def get_spell_query(self, *attributes: str) -> str:
+        """Filter expression to query the spells in the given attributes.
+
+        The expression is only built once, and reused until any spell
+        or actor changes (see `WowSpell.invalidate_queries`).
+
+        Example:
+            >>> spec.get_spell_query("all_buffs", "all_debuffs")
+            "(type='applybuff' and ability.id in (...)) or (...)"
+
+        """
+        revision, query = self._spell_queries.get(attributes, (-1, ""))
+        if revision == WowSpell.query_revision:
+            return query
+
+        revision = WowSpell.query_revision
+        spells = utils.flatten(getattr(self, attribute) for attribute in attributes)
+        query = build_spell_query(*spells)
+        self._spell_queries[attributes] = (revision, query)
+        return query
+
     ##########################
     # Methods
     #
@@ -65,11 +95,13 @@ class WowActor(base.MemoryModel):
             spell = WowSpell(**kwargs)
 
         self.spells.append(spell)
+        WowSpell.invalidate_queries()
         return spell
 
     def add_spells(self, *spells: WowSpell) -> None:
         """Add multiple spells to the actor."""
         self.spells.extend(spells)
+        WowSpell.invalidate_queries()
 
     def add_buff(self, spell: Optional[WowSpell] = None, **kwargs) -> WowSpell:
         """Add a buff to the actor."""
@@ -79,11 +111,13 @@ class WowActor(base.MemoryModel):
             spell = WowSpell(**kwargs)
 
         self.buffs.append(spell)
+        WowSpell.invalidate_queries()
         return spell
 
     def add_buffs(self, *spells: WowSpell) -> None:
         """Add multiple buffs to the actor."""
         self.buffs.extend(spells)
+        WowSpell.invalidate_queries()
 
     def add_debuff(self, spell: Optional[WowSpell] = None, **kwargs) -> WowSpell:
         """Add a debuff to the actor."""
@@ -93,11 +127,13 @@ class WowActor(base.MemoryModel):
             spell = WowSpell(**kwargs)
 
         self.debuffs.append(spell)
+        WowSpell.invalidate_queries()
         return spell
 
     def add_debuffs(self, *spells: WowSpell) -> None:
         """Add multiple debuffs to the actor."""
         self.debuffs.extend(spells)
+        WowSpell.invalidate_queries()
 
     def add_event(self, event: Optional[WowSpell] = None, **kwargs: Any) -> WowSpell:
         """Add a custom event to the actor."""
@@ -106,8 +142,10 @@ class WowActor(base.MemoryModel):
             event = WowSpell(**kwargs)
 
         self.events.append(event)
+        WowSpell.invalidate_queries()
         return event
 
     def add_events(self, *spells: WowSpell) -> None:
         """Add multiple events to the actor."""
         self.events.extend(spells)
+        WowSpell.invalidate_queries()
@@ -17,6 +17,8 @@ if typing.TYPE_CHECKING:
 class WowClass(WowActor):
     """A playable class in wow."""
 
+    index_keys: typing.ClassVar[tuple[str, ...]] = ("name_slug",)
+
     id: int
     """int: class id, mostly used for sorting."""
 
@@ -15,6 +15,8 @@ from lorgs.models.wow_spell import WowSpell
 class WowSpec(WowActor):
     """docstring for Spec"""
 
+    index_keys: typing.ClassVar[tuple[str, ...]] = ("full_name_slug", "name_slug_cap")
+
     name: str
 
     role: "WowRole"
@@ -72,9 +74,9 @@ class WowSpec(WowActor):
     ##########################
     # Methods
     #
-    def add_spell(self, spell: typing.Optional[WowSpell] = None, show: bool = True, **kwargs: typing.Any) -> WowSpell:
+    def add_spell(self, spell: typing.Optional[WowSpell] = None, show: bool = True, **kwargs: typing.Any) -> WowSpell:
         kwargs.setdefault("color", self.wow_class.color)
-        return super().add_spell(spell, show=show, **kwargs)
+        return super().add_spell(spell, show=show, **kwargs)
 
     def add_buff(self, spell: typing.Optional[WowSpell] = None, **kwargs) -> WowSpell:
         kwargs.setdefault("color", self.wow_class.color)
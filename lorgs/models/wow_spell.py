@@ -76,14 +76,25 @@ class SpellTag:
     """Tag for additional job actions that are available for optional timeline monitoring."""
 
 
+QUERY_FIELDS = {"spell_id", "event_type", "variations", "until", "extra_filter", "query"}
+"""Attributes of a spell which are part of its filter expression."""
+
+
 class WowSpell(base.MemoryModel):
     """Container to define a spell."""
 
+    index_keys: ClassVar[tuple[str, ...]] = ("spell_id",)
+
     spell_variations: ClassVar[dict[tuple[Union[int, str], str], Union[int, str]]] = {}
     """Map to track spell variations and their "master"-spells.
         `[key: id of the variation] = id of the "master"-spell`
     """
 
+    query_revision: ClassVar[int] = 0
+    """Incremented whenever a spell or actor changes in a way that affects the queries.
+        Used to invalidate cached filter expressions. See `WowActor.get_spell_query`.
+    """
+
     spell_id: Union[int, str]
     cooldown: float = 0.0
     duration: float = 0.0
@@ -133,9 +144,21 @@ class WowSpell(base.MemoryModel):
 
     def post_init(self) -> None:
         self.wowhead_data = self.wowhead_data or f"spell={self.spell_id}"
-        self.add_variations(*self.variations)
+        # register directly: new spells don't invalidate any existing queries
+        for spell_id in self.variations:
+            self.spell_variations[(spell_id, self.event_type)] = self.spell_id
         return super().post_init()
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name in QUERY_FIELDS:
+            self.invalidate_queries()
+
+    @classmethod
+    def invalidate_queries(cls) -> None:
+        """Mark all cached filter expressions as outdated."""
+        WowSpell.query_revision += 1
+
     @staticmethod
     def spell_ids(spells: list["WowSpell"]) -> list[Union[int, str]]:
         """Converts a list of Spells to their spell_ids."""
@@ -169,6 +192,15 @@ class WowSpell(base.MemoryModel):
         """Resolve a Spell ID for a spell variation to its main-spell."""
         return cls.spell_variations.get((spell_id, event_type)) or spell_id
 
+    @classmethod
+    def resolve_event_spell_id(cls, spell_id: int, event_type: str = "cast") -> int:
+        """Same as `resolve_spell_id`, for the numeric IDs found in events.
+
+        Only numeric main-spells can be matched by events, so named ones are ignored.
+        """
+        main_spell_id = cls.spell_variations.get((spell_id, event_type))
+        return main_spell_id if isinstance(main_spell_id, int) and main_spell_id else spell_id
+
     def __str__(self) -> str:
         return f"<Spell({self.spell_id}, name={self.name})>"
 
@@ -209,6 +241,7 @@ class WowSpell(base.MemoryModel):
         """
         self.variations.append(spell_id)
         self.spell_variations[(spell_id, event_type or self.event_type)] = self.spell_id
+        self.invalidate_queries()
 
     def add_variations(self, *spell_ids: Union[int, str]):
         for spell_id in spell_ids:
@@ -9,6 +9,7 @@ from fastapi.middleware.gzip import GZipMiddleware
 
 # IMPORT LOCAL LIBRARIES
 from lorgs import data  # pylint: disable=unused-import
+from lorrgs_api.data_files import DATA_DIRECTORY, DataFiles
 from lorrgs_api.middlewares import cache_middleware, cors_middleware
 from lorrgs_api.routes import api
 from lorrgs_api.routes import views
@@ -34,8 +35,8 @@ def create_app() -> fastapi.FastAPI:
 
     app.mount("/images", StaticFiles(directory="front_end/images"), name="images")
     
-    # 同样挂载数据文件夹
-    app.mount("/data", StaticFiles(directory="front_end/data"), name="data")
+    # 同样挂载数据文件夹 (with precompressed files, content-hash ETags and "/data/manifest.json")
+    app.mount("/data", DataFiles(directory=DATA_DIRECTORY), name="data")
     
     app.mount("/lorrgs_assets", StaticFiles(directory="lorrgs_assets"), name="assets")
 
@@ -0,0 +1,212 @@
+"""Serve the generated Data Files (`front_end/data`).
+
+Compared to plain `StaticFiles`:
+    - ETags are based on the content of each file, so they only change
+      when the content does (and not each time the updater rewrites a file).
+    - precompressed copies written by the updater (".json.br"/".json.gz") are
+      served as they are, instead of compressing the file on every request.
+    - "manifest.json" lists the hash of each file. The frontend uses those to
+      request "<file>?v=<hash>", which can be cached forever.
+
+Any other URL is revalidated on each request, which costs a 304 as long as
+the file didn't change.
+
+"""
+from __future__ import annotations
+
+# IMPORT STANDARD LIBRARIES
+import hashlib
+import json
+import os
+import stat
+import typing
+from urllib.parse import parse_qs
+
+# IMPORT THIRD PARTY LIBRARIES
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+# IMPORT LOCAL LIBRARIES
+from lorgs import codecs
+
+
+DATA_DIRECTORY = "front_end/data"
+"""str: Folder with the files written by the updater (relative to the project root)."""
+
+MANIFEST_NAME = "manifest.json"
+
+SERVED_ENCODINGS = ("br", "gzip")
+"""Encodings of the precompressed copies we serve, in order of preference.
+zstd is left out on purpose: our copies might use a dictionary browsers don't have."""
+
+CACHE_IMMUTABLE = "public, max-age=31536000, immutable"
+CACHE_REVALIDATE = "no-cache"
+
+
+def get_file_hash(path: str) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()[:16]
+
+
+def parse_accept_encoding(header: str) -> set[str]:
+    """Get the encodings accepted by the client (ignoring any with "q=0")."""
+    accepted: set[str] = set()
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        params = params.replace(" ", "")
+        if name and params not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def get_etag_hashes(header: str) -> set[str]:
+    """Get the content hashes out of an "If-None-Match"-header."""
+    hashes: set[str] = set()
+    for etag in header.split(","):
+        etag = etag.strip().removeprefix("W/").strip('"')
+        hashes.add(etag.split("-")[0])
+    return hashes
+
+
+class DataFiles(StaticFiles):
+    """StaticFiles with content based ETags, precompressed files and a manifest."""
+
+    def __init__(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.hashes: dict[str, tuple[int, int, str]] = {}
+        """full path -> (mtime, size, hash)"""
+
+    def get_hash(self, full_path: str, stat_result: os.stat_result) -> str:
+        """Get the hash of a file. Only reads the file again, if it has been modified."""
+        key = (stat_result.st_mtime_ns, stat_result.st_size)
+        cached = self.hashes.get(full_path)
+        if cached and cached[:2] == key:
+            return cached[2]
+
+        file_hash = get_file_hash(full_path)
+        self.hashes[full_path] = (*key, file_hash)
+        return file_hash
+
+    def lookup_path(self, path: str) -> tuple[str, typing.Optional[os.stat_result]]:
+        # runs in a worker thread. So we use it to hash the file, without blocking the event loop.
+        full_path, stat_result = super().lookup_path(path)
+        if stat_result and stat.S_ISREG(stat_result.st_mode):
+            self.get_hash(full_path, stat_result)
+        return full_path, stat_result
+
+    ############################################################################
+    # Manifest
+    #
+
+    def get_manifest(self) -> dict[str, str]:
+        """Hashes of all JSON files, by file name."""
+        manifest: dict[str, str] = {}
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json") and entry.name != MANIFEST_NAME and entry.is_file():
+                manifest[entry.name] = self.get_hash(entry.path, entry.stat())
+        return dict(sorted(manifest.items()))
+
+    async def manifest_response(self, scope: Scope) -> Response:
+        manifest = await anyio.to_thread.run_sync(self.get_manifest)
+        content = json.dumps({"files": manifest}).encode("utf-8")
+
+        headers = {
+            "ETag": f'"{hashlib.sha256(content).hexdigest()[:16]}"',
+            "Cache-Control": CACHE_REVALIDATE,
+        }
+        response = Response(content, media_type="application/json", headers=headers)
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if path == MANIFEST_NAME and scope["method"] in ("GET", "HEAD"):
+            return await self.manifest_response(scope)
+        return await super().get_response(path, scope)
+
+    ############################################################################
+    # Files
+    #
+
+    def get_precompressed(
+        self, full_path: str, stat_result: os.stat_result, accepted: set[str]
+    ) -> typing.Optional[tuple[codecs.Codec, str, os.stat_result]]:
+        """Find a precompressed copy of the file, the client accepts.
+
+        Copies older than the file itself are ignored.
+        Those are left over, from writing the file without them.
+        """
+        for name in SERVED_ENCODINGS:
+            if name not in accepted:
+                continue
+            codec = codecs.CODECS[name]
+            path = full_path + codec.extension
+            try:
+                sibling_stat = os.stat(path)
+            except OSError:
+                continue
+            if sibling_stat.st_mtime_ns >= stat_result.st_mtime_ns:
+                return codec, path, sibling_stat
+        return None
+
+    def is_not_modified(self, response_headers: Headers, request_headers: Headers) -> bool:
+        # the same content matches, no matter which encoding the client got it in
+        if_none_match = request_headers.get("if-none-match")
+        etag = response_headers.get("etag")
+        if if_none_match and etag:
+            return etag.strip('"').split("-")[0] in get_etag_hashes(if_none_match)
+        return super().is_not_modified(response_headers, request_headers)
+
+    def file_response(
+        self,
+        full_path: typing.Union[str, os.PathLike],
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        full_path = str(full_path)
+        request_headers = Headers(scope=scope)
+        file_hash = self.get_hash(full_path, stat_result)
+
+        # "?v=<hash>" always refers to the same content, and can be cached forever.
+        # If the file has changed since, the latest version is served instead.
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        versioned = query.get("v", [""])[0] == file_hash
+
+        headers = {
+            "ETag": f'"{file_hash}"',
+            "Cache-Control": CACHE_IMMUTABLE if versioned else CACHE_REVALIDATE,
+            "Vary": "Accept-Encoding",
+        }
+
+        precompressed = None
+        if full_path.endswith(".json"):
+            accepted = parse_accept_encoding(request_headers.get("accept-encoding", ""))
+            precompressed = self.get_precompressed(full_path, stat_result, accepted)
+
+        if precompressed:
+            codec, path, sibling_stat = precompressed
+            headers["ETag"] = f'"{file_hash}-{codec.name}"'  # each encoding is a different representation
+            headers["Content-Encoding"] = codec.name
+            response: Response = FileResponse(
+                path,
+                status_code=status_code,
+                stat_result=sibling_stat,
+                method=scope["method"],
+                media_type="application/json",
+            )
+        else:
+            response = FileResponse(full_path, status_code=status_code, stat_result=stat_result, method=scope["method"])
+
+        # replace the default etag (based on mtime and size)
+        response.headers.update(headers)
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
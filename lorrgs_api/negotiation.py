@@ -0,0 +1,35 @@
+"""Pick the Format of API Responses, based on the Request."""
+from __future__ import annotations
+
+# IMPORT STANDARD LIBRARIES
+import typing
+
+# IMPORT THIRD PARTY LIBRARIES
+import fastapi
+
+# IMPORT LOCAL LIBRARIES
+from lorgs.models.warcraftlogs_cast import CAST_COLUMNS_ENCODING, use_cast_columns
+
+
+CAST_FORMAT_PARAM = "casts"
+"""Name of the query parameter and media type parameter to request the cast format.
+
+eg.: "?casts=columns" or "Accept: application/json; casts=columns"
+"""
+
+
+def wants_cast_columns(request: fastapi.Request) -> bool:
+    """Check if the client asked for the columnar encoding of casts."""
+    if request.query_params.get(CAST_FORMAT_PARAM) == CAST_COLUMNS_ENCODING:
+        return True
+
+    accept = request.headers.get("accept", "").replace(" ", "")
+    return f"{CAST_FORMAT_PARAM}={CAST_COLUMNS_ENCODING}" in accept
+
+
+def format_casts(request: fastapi.Request, response: fastapi.Response, data: typing.Any) -> typing.Any:
+    """Encode all casts in a payload, if the client asked for it."""
+    response.headers["Vary"] = "Accept"
+    if wants_cast_columns(request):
+        return use_cast_columns(data)
+    return data
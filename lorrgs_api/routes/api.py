@@ -11,6 +11,7 @@ from lorrgs_api.routes import (
     api_season,
     api_spec_rankings,
     api_tasks,
+    api_timeline_view,
     api_user_reports,
     api_world_data,
     auth,
@@ -29,6 +30,7 @@ router.include_router(api_comp_rankings.router)
 router.include_router(api_season.router)
 router.include_router(api_spec_rankings.router)
 router.include_router(api_tasks.router)
+router.include_router(api_timeline_view.router)
 router.include_router(api_user_reports.router, prefix="/user_reports")
 router.include_router(api_world_data.router)
 router.include_router(auth.router, prefix="/auth")
@@ -6,18 +6,19 @@ import fastapi
 
 # IMPORT LOCAL LIBRARIES
 from lorgs.clients import sqs
-from lorgs.models.warcraftlogs_comp_ranking import CompRanking, CompRankingFight, FilterExpression
+from lorgs.models.warcraftlogs_comp_ranking import CompRanking
 
 
 router = fastapi.APIRouter(tags=["comp_ranking"])
 
 
-@router.get("/comp_ranking/{boss_slug}", response_model_exclude_unset=True)
+@router.get("/comp_ranking/{boss_slug}", response_model_exclude_unset=True, response_model_exclude={"index"})
 async def get_comp_ranking(
     response: fastapi.Response,
     boss_slug: str,
     # Query Params
     limit: int = 100,
+    offset: int = 0,
     roles: list[str] = fastapi.Query([], alias="role"),
     specs: list[str] = fastapi.Query([], alias="spec"),
     killtime_min: int = 0,
@@ -32,39 +33,24 @@ async def get_comp_ranking(
     response.headers["Cache-Control"] = "max-age=300"
 
     # fetch the data
-    comp_ranking = CompRanking.get(boss_slug=boss_slug)
+    comp_ranking = CompRanking.get_cached(boss_slug=boss_slug)
     if not comp_ranking:
         raise fastapi.HTTPException(status_code=404, detail="Not Found.")
 
-    def fight_filter(fight: CompRankingFight):
-        if killtime_min:
-            if fight.duration < (killtime_min * 1000):
-                return False
-        if killtime_max:
-            if fight.duration > (killtime_max * 1000):
-                return False
-
-        if not fight.composition:
-            return False
-
-        for spec_expr in specs:
-            expr = FilterExpression.parse_str(spec_expr)
-            if not expr.run(fight.composition["specs"]):
-                return False
-
-        for role_expr in roles:
-            expr = FilterExpression.parse_str(role_expr)
-            if not expr.run(fight.composition["roles"]):
-                return False
-
-        return True
-
-    for report in comp_ranking.reports:
-        report.fights = [fight for fight in report.fights if fight_filter(fight)]
+    try:
+        reports = comp_ranking.filter_reports(
+            roles=roles,
+            specs=specs,
+            killtime_min=killtime_min,
+            killtime_max=killtime_max,
+            limit=limit,
+            offset=offset,
+        )
+    except ValueError as e:
+        raise fastapi.HTTPException(status_code=400, detail=str(e))
 
-    comp_ranking.reports = [r for r in comp_ranking.reports if r.fights]
-    comp_ranking.reports = comp_ranking.reports[:limit]
-    return comp_ranking
+    # the cached ranking is shared between requests. So we return a copy.
+    return comp_ranking.model_copy(update={"reports": reports})
 
 
 ################################################################################
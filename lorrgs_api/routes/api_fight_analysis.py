@@ -6,11 +6,14 @@ import fastapi
 
 # IMPORT LOCAL LIBRARIES
 from lorgs.models.warcraftlogs_report import Report
+from lorrgs_api.negotiation import format_casts
 
 router = fastapi.APIRouter()
 
 @router.get("/fight_analysis/{report_id}/{fight_id}")
-async def get_fight_analysis(report_id: str, fight_id: int, spec: str | None = None):
+async def get_fight_analysis(
+    request: fastapi.Request, response: fastapi.Response, report_id: str, fight_id: int, spec: str | None = None
+):
     """获取指定战斗的详细施法时间轴数据。
     
     Args:
@@ -49,4 +52,4 @@ async def get_fight_analysis(report_id: str, fight_id: int, spec: str | None = N
     # 6. 返回数据
     # 利用 fight.as_dict()，它会自动包含 players 和里面的 casts
     loaded_player_ids = [p.source_id for p in players_to_load]
-    return fight.as_dict(player_ids=loaded_player_ids)
\ No newline at end of file
+    return format_casts(request, response, fight.as_dict(player_ids=loaded_player_ids))
\ No newline at end of file
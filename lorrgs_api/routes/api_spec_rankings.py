@@ -1,6 +1,9 @@
 """Enpoints dealing with Rankings per Spec."""
 from __future__ import annotations
 
+# IMPORT STANDARD LIBRARIES
+import typing
+
 # IMPORT THIRD PARTY LIBRARIES
 import fastapi
 
@@ -9,11 +12,15 @@ from lorgs.clients import sqs
 from lorgs.logger import logger
 from lorgs.models import warcraftlogs_ranking
 from lorgs.models.wow_spec import WowSpec
+from lorrgs_api.negotiation import format_casts
+
+
 router = fastapi.APIRouter(tags=["spec_ranking"], prefix="/spec_ranking")
 
 
 @router.get("/{spec_slug}/{boss_slug}")
 async def get_spec_ranking(
+    request: fastapi.Request,
     response: fastapi.Response,
     spec_slug: str,
     boss_slug: str,
@@ -21,24 +28,23 @@ async def get_spec_ranking(
     metric: str = "",
     refresh: bool = False,
 ):
-    """Get the Rankings for a given Spec and Boss."""
+    """Get the Rankings for a given Spec and Boss.
+
+    Casts use the columnar encoding, if requested with "?casts=columns".
+    """
     if not metric:
         spec = WowSpec.get(full_name_slug=spec_slug)
         metric = spec.role.metric if spec else "dps"
 
     logger.info(f"{spec_slug}/{boss_slug} | start ({difficulty}/{metric})")
 
-    ranking = warcraftlogs_ranking.SpecRanking.get_or_create(
-        boss_slug=boss_slug,
-        spec_slug=spec_slug,
-        difficulty=difficulty,
-        metric=metric,
-    )
+    kwargs: dict[str, typing.Any] = {"boss_slug": boss_slug, "spec_slug": spec_slug, "difficulty": difficulty, "metric": metric}
+    ranking = warcraftlogs_ranking.SpecRanking.get_cached(**kwargs) or warcraftlogs_ranking.SpecRanking(**kwargs)
 
     # shorter cache timeout for the start of the tier (where frequent changes happen)
     response.headers["Cache-Control"] = "max-age=300"
 
-    return ranking.model_dump(exclude_unset=True, by_alias=True)
+    return format_casts(request, response, ranking.model_dump(exclude_unset=True, by_alias=True))
 
 
 ################################################################################
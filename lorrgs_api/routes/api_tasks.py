@@ -1,29 +1,28 @@
 """Get Information about Tasks."""
 from __future__ import annotations
 
+# IMPORT STANDARD LIBRARIES
+import contextlib
+import typing
+
 # IMPORT THIRD PARTY LIBRARIES
-import asyncio
 import fastapi
 
 # IMPORT LOCAL LIBRARIES
+from lorgs.clients import progress
 from lorgs.models.task import Task
 
 
 router = fastapi.APIRouter(tags=["tasks"], prefix="/tasks")
 
 
-def _get_task_info(task_id: str) -> dict:
+def _get_task_info(task_id: str) -> typing.Optional[dict]:
     task = Task.get(task_id=task_id)
-    if not task:
-        raise KeyError("Task not found")
+    return task.get_info() if task else None
+
 
-    return {
-        "task_id": task.key,
-        "status": task.status,
-        "message": task.message,
-        "updated": task.updated.isoformat(),
-        "items": task.items,
-    }
+def _is_finished(info: dict) -> bool:
+    return info.get("status") in Task.STATUS.FINISHED
 
 
 ################################################################################
@@ -32,36 +31,23 @@ def _get_task_info(task_id: str) -> dict:
 @router.get("/{task_id}")
 async def get_task(response: fastapi.Response, task_id: str):
     response.headers["Cache-Control"] = "no-cache"
-    try:
-        return _get_task_info(task_id)
-    except KeyError:
+    info = _get_task_info(task_id)
+    if not info:
         return "Task not found.", 404
+    return info
 
 
 @router.websocket("/{task_id}")
-async def get_task(websocket: fastapi.WebSocket, task_id: str):
-    """Websocket Connection to request a task's status.
+async def watch_task(websocket: fastapi.WebSocket, task_id: str):
+    """Websocket Connection to follow a task's status.
 
-    Sends the updated Status every 1 second.
-    Stops after 100 iterations
+    Sends the current Status, and again each time the worker publishes an update.
+    Stops once the task is done/failed, or after `progress.WATCH_TIMEOUT` seconds.
 
     """
     await websocket.accept()
 
-    # max number of iterations before giving up
-    max_iterations = 100
-    n_err = 0
-
-    for _ in range(max_iterations):
-        try:
-            info = _get_task_info(task_id)
-        except KeyError:
-            await websocket.send_json({"status": "not found"})
-            n_err += 1
-            await asyncio.sleep(1 + n_err)  # auto-throttle based on number of errros to
-        else:
-            await websocket.send_json(info)
-            await asyncio.sleep(1)
-
-    else:
-        await websocket.send_json({"status": "timeout"})
+    states = progress.watch(task_id, get_state=lambda: _get_task_info(task_id), is_finished=_is_finished)
+    async with contextlib.aclosing(states):
+        async for state in states:
+            await websocket.send_json(state)
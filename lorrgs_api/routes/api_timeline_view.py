@@ -0,0 +1,36 @@
+"""Endpoint to load everything required to render the Timeline of a Spec/Boss at once."""
+from __future__ import annotations
+
+# IMPORT THIRD PARTY LIBRARIES
+import fastapi
+
+# IMPORT LOCAL LIBRARIES
+from lorrgs_api.data_files import get_etag_hashes, parse_accept_encoding
+from lorrgs_api.negotiation import wants_cast_columns
+from lorrgs_api.timeline_view import load_timeline_view
+
+
+router = fastapi.APIRouter(tags=["timeline_view"], prefix="/timeline_view")
+
+
+@router.get("/{spec_slug}/{boss_slug}")
+def get_timeline_view(request: fastapi.Request, spec_slug: str, boss_slug: str, region: str = ""):
+    """Get the Ranking, Spells and Boss Timeline for a given Spec and Boss.
+
+    Casts use the columnar encoding, if requested with "?casts=columns".
+    """
+    region = "" if region.lower() == "all" else region
+    view = load_timeline_view(spec_slug, boss_slug, region, cast_columns=wants_cast_columns(request))
+    if not view:
+        raise fastapi.HTTPException(status_code=404, detail="Ranking not found.")
+
+    headers = {"ETag": view.etag, "Cache-Control": "max-age=300", "Vary": "Accept, Accept-Encoding"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and view.etag.strip('"') in get_etag_hashes(if_none_match):
+        return fastapi.Response(status_code=304, headers=headers)
+
+    if "gzip" in parse_accept_encoding(request.headers.get("accept-encoding", "")):
+        headers["Content-Encoding"] = "gzip"
+        return fastapi.Response(view.content_gzip, media_type="application/json", headers=headers)
+    return fastapi.Response(view.content, media_type="application/json", headers=headers)
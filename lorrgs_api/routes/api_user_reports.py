@@ -15,6 +15,7 @@ from lorgs.clients import sqs
 from lorgs.clients.wcl import InvalidReport
 from lorgs.models.task import Task
 from lorgs.models.warcraftlogs_user_report import UserReport
+from lorrgs_api.negotiation import format_casts
 
 
 router = fastapi.APIRouter()
@@ -36,7 +37,7 @@ async def get_user_report(report_id: str) -> UserReport:
 
 
 @router.get("/{report_id}/fights")
-async def get_fights(report_id: str, fight: str, player: str = ""):
+async def get_fights(request: fastapi.Request, response: fastapi.Response, report_id: str, fight: str, player: str = ""):
     """Get Fights in a report.
 
     Args:
@@ -52,12 +53,12 @@ async def get_fights(report_id: str, fight: str, player: str = ""):
     fight_ids = utils.str_int_list(fight)
     player_ids = utils.str_int_list(player)
 
-    fights = user_report.get_fights(*fight_ids)
+    fights = user_report.get_fights(*fight_ids, player_ids=player_ids)
 
     for f in fights:
         f.players = f.get_players(*player_ids)
 
-    return {"fights": [fight.model_dump(exclude_unset=True, by_alias=True) for fight in fights]}
+    return format_casts(request, response, {"fights": [fight.model_dump(exclude_unset=True, by_alias=True) for fight in fights]})
 
 
 ################################################################################
@@ -0,0 +1,162 @@
+"""Everything required to render the Timeline of one Spec/Boss in a single Response.
+
+The frontend would otherwise load the spec ranking, the spells for the spec and
+for each spec in the party, and the boss timeline, one after another.
+
+Views are built from the files in `front_end/data` (the same ones the frontend
+loads directly) and cached per spec, boss and region. A cached view is reused
+as long as none of the files it has been built from have been modified.
+
+"""
+from __future__ import annotations
+
+# IMPORT STANDARD LIBRARIES
+import gzip
+import hashlib
+import json
+import os
+import typing
+from collections import defaultdict
+
+# IMPORT LOCAL LIBRARIES
+from lorgs import codecs
+from lorgs.boss_timeline import get_boss_timeline
+from lorgs.models.base.s3_cache import S3Cache
+from lorgs.models.raid_boss import RaidBoss
+from lorgs.models.warcraftlogs_cast import use_cast_columns
+from lorrgs_api.data_files import DATA_DIRECTORY
+
+
+Signature = tuple[tuple[str, int], ...]
+"""(path, mtime) of each file a view has been built from. mtime is -1 for missing files."""
+
+
+class TimelineView(typing.NamedTuple):
+    signature: Signature
+    etag: str
+    content: bytes
+    content_gzip: bytes
+
+
+view_cache = S3Cache()
+"""Built Views by (spec, boss, region, cast format)."""
+
+
+def get_mtime(path: str) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return -1
+
+
+def load_json(path: str) -> typing.Any:
+    try:
+        with open(path, "rb") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def is_current(view: TimelineView) -> bool:
+    return all(get_mtime(path) == mtime for path, mtime in view.signature)
+
+
+def get_spell_slot(spell: dict[str, typing.Any]) -> str:
+    return spell.get("display_slot") or f"spell:{spell.get('spell_id')}"
+
+
+def filter_spells(spells: list[dict[str, typing.Any]], spell_ids: set[int]) -> list[dict[str, typing.Any]]:
+    """Only keep the spells which have been cast.
+
+    Spells sharing a display slot with any of them are kept as well, as the
+    frontend picks which one to show based on the level of the content.
+    """
+    slots = {get_spell_slot(spell) for spell in spells if spell.get("spell_id") in spell_ids}
+    return [spell for spell in spells if get_spell_slot(spell) in slots]
+
+
+def get_cast_spell_ids(ranking: dict[str, typing.Any]) -> dict[str, set[int]]:
+    """Ids of all spells cast in the ranking, by spec of the player casting them."""
+    spell_ids: dict[str, set[int]] = defaultdict(set)
+    for report in ranking.get("reports") or []:
+        for fight in report.get("fights") or []:
+            for player in fight.get("players") or []:
+                spell_ids[player.get("spec_slug", "")].update(cast.get("spell_id") for cast in player.get("casts") or [])
+    return spell_ids
+
+
+def build_timeline_view(
+    spec_slug: str, boss_slug: str, region: str = "", cast_columns: bool = False
+) -> typing.Optional[TimelineView]:
+    """Build the view from the current files. None if there is no ranking.
+
+    Args:
+        cast_columns: use the columnar encoding for all casts in the ranking
+
+    """
+    ranking_path = os.path.join(DATA_DIRECTORY, f"spec_ranking_{spec_slug}_{boss_slug}.json")
+    ranking = load_json(ranking_path)
+    if ranking is None:
+        return None
+    signature = [(ranking_path, get_mtime(ranking_path))]
+
+    if region:
+        ranking["reports"] = [report for report in ranking.get("reports") or [] if report.get("region") == region]
+
+    # spells for the spec itself, and anyone else in those fights (eg.: the buddy)
+    spell_ids = get_cast_spell_ids(ranking)
+    spell_ids.setdefault(spec_slug, set())
+    spells: dict[str, list[dict[str, typing.Any]]] = {}
+    for spell_spec_slug, ids in sorted(spell_ids.items()):
+        if not spell_spec_slug:
+            continue
+        spells_path = os.path.join(DATA_DIRECTORY, f"spells_{spell_spec_slug}.json")
+        signature.append((spells_path, get_mtime(spells_path)))
+        spells[spell_spec_slug] = filter_spells(load_json(spells_path) or [], ids)
+
+    boss = RaidBoss.get(full_name_slug=boss_slug)
+    boss_data = {
+        "phases": [
+            {"name": phase.name, "spell_id": phase.spell_id, "event_type": phase.event_type, "count": phase.count}
+            for phase in boss.phases
+        ],
+        "timeline": get_boss_timeline(boss),
+    } if boss else None
+
+    content = codecs.dump_json(
+        {
+            "spec_slug": spec_slug,
+            "boss_slug": boss_slug,
+            "region": region,
+            "ranking": use_cast_columns(ranking) if cast_columns else ranking,
+            "spells": spells,
+            "boss": boss_data,
+        }
+    )
+    return TimelineView(
+        signature=tuple(signature),
+        etag=f'"{hashlib.sha256(content).hexdigest()[:16]}"',
+        content=content,
+        content_gzip=gzip.compress(content, mtime=0),
+    )
+
+
+def load_timeline_view(
+    spec_slug: str, boss_slug: str, region: str = "", cast_columns: bool = False
+) -> typing.Optional[TimelineView]:
+    """Get the view from the cache, or build it if any of its files have changed."""
+    key = f"{spec_slug}/{boss_slug}/{region}" + ("/columns" if cast_columns else "")
+
+    entry = view_cache.get(key)
+    cached: typing.Optional[TimelineView] = entry.obj if entry else None
+    if cached and is_current(cached):
+        view_cache.hits += 1
+        return cached
+
+    view_cache.misses += 1
+    view = build_timeline_view(spec_slug, boss_slug, region, cast_columns=cast_columns)
+    if view:
+        view_cache.set(key, view, etag=view.etag, size=len(view.content) + len(view.content_gzip))
+    else:
+        view_cache.pop(key)
+    return view
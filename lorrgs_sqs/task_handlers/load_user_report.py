@@ -7,16 +7,42 @@ from __future__ import annotations
 
 # IMPORT STANDARD LIBRARIES
 import json
+import os
+import time
 
 # IMPORT LOCAL LIBRARIES
 from lorgs import data  # pylint: disable=unused-import
+from lorgs.clients import progress
+from lorgs.logger import logger
 from lorgs.models import warcraftlogs_actor
 from lorgs.models.task import Task
 from lorgs.models.warcraftlogs_user_report import UserReport
 
 
-def set_task_item_status(task: Task):
-    """Create a Callback to update an Item in Task."""
+TASK_SAVE_INTERVAL = float(os.getenv("TASK_SAVE_INTERVAL") or 5)
+"""float: Seconds between saving snapshots of the item statuses (for subscribers the progress can't reach)."""
+
+
+def get_save_interval(publisher: progress.ProgressPublisher) -> float:
+    """Seconds between snapshots.
+
+    Progress published to a process-local backend never reaches the API,
+    which then only sees the snapshots. So they are saved as often as it reads them.
+    """
+    if publisher.broker.is_local:
+        return min(TASK_SAVE_INTERVAL, progress.LOCAL_REFRESH_INTERVAL)
+    return TASK_SAVE_INTERVAL
+
+
+def set_task_item_status(task: Task, publisher: progress.ProgressPublisher):
+    """Create a Callback to update an Item in Task.
+
+    The items are updated in memory, and published as progress.
+    A snapshot of the Task is saved at most every few seconds (see `get_save_interval`),
+    and once more when the report has been loaded.
+    """
+    save_interval = get_save_interval(publisher)
+    last_saved = time.monotonic()
 
     # map event names to task status
     event_to_status = {
@@ -36,11 +62,34 @@ def set_task_item_status(task: Task):
             return
 
         status = event_to_status.get(status, status)
-        task.set(**{f"items.{fight_id}_{source_id}.status": status})
+        key = f"{fight_id}_{source_id}"
+        task.items.setdefault(key, {"fight": fight_id, "player": source_id})["status"] = status
+        publisher.update(items={key: {"status": status}})
+
+        nonlocal last_saved
+        if time.monotonic() - last_saved < save_interval:
+            return
+        last_saved = time.monotonic()
+
+        task.items = dict(task.items)  # Create a new dict (otherwise pydantic would consider it as unset)
+        try:
+            task.save()
+        except Exception:  # the final status still gets saved
+            logger.exception("Failed to save the progress of task %s", task.task_id)
 
     return handler
 
 
+def set_task_status(task: Task, publisher: progress.ProgressPublisher, status: str) -> None:
+    """Save and publish a new status of the Task (including all of its items)."""
+    task.status = status
+    task.items = dict(task.items)  # Create a new dict (otherwise pydantic would consider it as unset)
+    task.save()
+
+    publisher.update(status=status, items=task.items)
+    publisher.flush()
+
+
 async def load_user_report(report_id: str, fight_ids: list[int] = [], player_ids: list[int] = [], **kwargs) -> None:
     print(f"[load_user_report] report_id={report_id} fight_ids={fight_ids} player_ids={player_ids}")
     if not (report_id and fight_ids and player_ids):
@@ -50,7 +99,7 @@ async def load_user_report(report_id: str, fight_ids: list[int] = [], player_ids
     # loading...
     user_report = UserReport.get_or_create(report_id=report_id)
     await user_report.load_fights(fight_ids=fight_ids, player_ids=player_ids)
-    user_report.save()
+    user_report.save(fight_ids=fight_ids, player_ids=player_ids)
 
 
 async def main(message) -> None:
@@ -58,9 +107,10 @@ async def main(message) -> None:
     # task status Updates
     message_id = message.get("messageId")
     task = Task.get_or_create(task_id=message_id)
-    task.set(status=task.STATUS.IN_PROGRESS)
+    publisher = progress.ProgressPublisher(task_id=message_id)
+    set_task_status(task, publisher, task.STATUS.IN_PROGRESS)
 
-    task_updater = set_task_item_status(task)
+    task_updater = set_task_item_status(task, publisher)
     warcraftlogs_actor.BaseActor.event_actor_load.connect(task_updater)
 
     # parse input
@@ -71,7 +121,9 @@ async def main(message) -> None:
     try:
         await load_user_report(**message_payload)
     except:
-        task.set(status=task.STATUS.FAILED)
+        set_task_status(task, publisher, task.STATUS.FAILED)
         raise
     else:
-        task.set(status=task.STATUS.DONE)
+        set_task_status(task, publisher, task.STATUS.DONE)
+    finally:
+        warcraftlogs_actor.BaseActor.event_actor_load.disconnect(task_updater)
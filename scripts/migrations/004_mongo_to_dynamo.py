@@ -1,5 +1,5 @@
-import json
 import os
+import typing
 from uuid import uuid4
 
 import dotenv
@@ -23,26 +23,19 @@ def get_mongo_users(limit=0) -> list[dict]:
     return users.find(limit=limit)  # type: ignore
 
 
-def main() -> None:
-
-    table = User.get_table()
-    with table.batch_writer() as batch:
-        for data in get_mongo_users(limit=0):
-
-            data = {k: v for k, v in data.items() if v}
-            data["discord_id"] = data.get("discord_id") or data.get("discord_tag") or f"U-{uuid4()}"
+def load_users() -> typing.Iterator[User]:
+    for data in get_mongo_users(limit=0):
+        data = {k: v for k, v in data.items() if v}
+        data["discord_id"] = data.get("discord_id") or data.get("discord_tag") or f"U-{uuid4()}"
+        print("D", data)
 
-            print("D", data)
+        user = User.construct(**data)
+        print("U", user)
+        yield user
 
-            user = User.construct(**data)
-            print("U", user)
 
-            item = json.loads(user.json(exclude_unset=True))
-            item.update(user.get_keys(**item))
-            print("I", item)
-
-            batch.put_item(Item=item)
-            continue
+def main() -> None:
+    User.save_many(load_users())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,70 @@
+"""Create the secondary indexes declared on our DynamoDB Models.
+
+Assumes the tables use on-demand capacity (no provisioned throughput for the indexes).
+"""
+# IMPORT STANDARD LIBRARIES
+import time
+
+# IMPORT THIRD PARTY LIBRARIES
+import dotenv
+
+# IMPORT LOCAL LIBRARIES
+from lorgs.models.base import DynamoDBModel
+from lorgs.models.user import User
+
+
+dotenv.load_dotenv()
+
+
+def wait_until_active(table, index_name: str) -> None:
+    """Wait for the index to be created (the next one can only be created afterwards)."""
+    while True:
+        table.reload()
+        status = {index["IndexName"]: index["IndexStatus"] for index in table.global_secondary_indexes or []}
+        if status.get(index_name) == "ACTIVE":
+            return
+        time.sleep(10)
+
+
+def create_indexes(model: type[DynamoDBModel]) -> None:
+    table = model.get_table()
+    existing = {index["IndexName"] for index in table.global_secondary_indexes or []}
+
+    for index in model.indexes:
+        if index.name in existing:
+            print(f"{table.name}: {index.name} exists")
+            continue
+
+        key_schema = [{"AttributeName": index.pkey, "KeyType": "HASH"}]
+        if index.skey:
+            key_schema.append({"AttributeName": index.skey, "KeyType": "RANGE"})
+
+        # DynamoDB only allows one index to be created per update
+        table.update(
+            AttributeDefinitions=[{"AttributeName": key["AttributeName"], "AttributeType": "S"} for key in key_schema],
+            GlobalSecondaryIndexUpdates=[
+                {
+                    "Create": {
+                        "IndexName": index.name,
+                        "KeySchema": key_schema,
+                        "Projection": {"ProjectionType": "ALL"},
+                    }
+                }
+            ],
+        )
+        print(f"{table.name}: creating {index.name}")
+        wait_until_active(table, index.name)
+
+
+MODELS: list[type[DynamoDBModel]] = [User]
+"""Models which declare secondary `indexes`."""
+
+
+def main() -> None:
+    for model in MODELS:
+        if model.indexes:
+            create_indexes(model)
+
+
+if __name__ == "__main__":
+    main()
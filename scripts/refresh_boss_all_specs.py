@@ -5,7 +5,6 @@ from __future__ import annotations
 
 import argparse
 import asyncio
-import json
 import os
 import sys
 from pathlib import Path
@@ -21,7 +20,7 @@ if hasattr(sys.stderr, "reconfigure"):
     sys.stderr.reconfigure(encoding="utf-8", errors="replace")
 
 DEFAULT_LIMIT = 100
-DELAY_SECONDS = 1.0
+DELAY_SECONDS = 0.0  # requests are paced by the client, based on the remaining rate limit points
 
 dotenv.load_dotenv(PROJECT_ROOT / ".env")
 
@@ -33,13 +32,15 @@ if not os.getenv("WCL_AUTH_TOKEN") and not (os.getenv("WCL_CLIENT_ID") and os.ge
 os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
 os.environ["AWS_ACCESS_KEY_ID"] = "testing"
 os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+os.environ.setdefault("WCL_CACHE_PATH", str(PROJECT_ROOT / ".runtime" / "wcl_cache.sqlite"))
 
+from lorgs import codecs  # noqa: E402
 from lorgs import data  # noqa: E402,F401  # load static data registrations
 from lorgs.clients.wcl.client import WarcraftlogsClient  # noqa: E402
 from lorgs.data.classes import ALL_SPECS  # noqa: E402
 from lorgs.models.raid_boss import RaidBoss  # noqa: E402
 from lorgs.models.warcraftlogs_ranking import SpecRanking  # noqa: E402
-from updater import BOSS_CONFIG, DEFAULT_METRIC, DEFAULT_RANKING_REGIONS  # noqa: E402
+from updater import BOSS_CONFIG, DEFAULT_METRIC, DEFAULT_RANKING_REGIONS, get_ranking_path, load_previous_ranking  # noqa: E402
 
 
 def parse_ranking_regions(raw_regions: list[str]) -> tuple[str, ...]:
@@ -87,28 +88,27 @@ async def refresh_spec(
     metric: str,
     limit: int,
     ranking_regions: tuple[str, ...],
+    incremental: bool = False,
 ) -> tuple[str, int, dict[str, int], Path | None, str]:
     spec_slug = spec.full_name_slug
-    ranking = SpecRanking(
+    output_path = PROJECT_ROOT / get_ranking_path(spec_slug, boss_slug)
+    ranking = load_previous_ranking(str(output_path), difficulty, metric) if incremental else None
+    ranking = ranking or SpecRanking(
         boss_slug=boss_slug,
         spec_slug=spec_slug,
         difficulty=difficulty,
         metric=metric,
     )
 
-    await ranking.load(limit=limit, clear_old=True, ranking_regions=ranking_regions)
+    await ranking.load(limit=limit, clear_old=not incremental, ranking_regions=ranking_regions, incremental=incremental)
     fight_count = len(ranking.fights)
     region_counts = count_regions(ranking)
 
     if not fight_count:
         return spec_slug, 0, region_counts, None, "no fights"
 
-    output_path = PROJECT_ROOT / "front_end" / "data" / f"spec_ranking_{spec_slug}_{boss_slug}.json"
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(
-        json.dumps(ranking.model_dump(exclude_unset=True, by_alias=True), ensure_ascii=False, default=str),
-        encoding="utf-8",
-    )
+    content = codecs.dump_json(ranking.model_dump(exclude_unset=True, by_alias=True))
+    codecs.write_file(output_path, content, siblings=("gzip", "br"))
     return spec_slug, fight_count, region_counts, output_path, "written"
 
 
@@ -119,6 +119,11 @@ async def main() -> None:
     parser.add_argument("--metric", help="Override the metric from updater.py.")
     parser.add_argument("--difficulty", help="Override the difficulty from updater.py.")
     parser.add_argument("--delay", type=float, default=DELAY_SECONDS)
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Keep the fights of the existing JSON which are still ranked, and only load the new ones.",
+    )
     parser.add_argument("--spec", action="append", help="Only refresh this spec slug. Can be passed multiple times.")
     parser.add_argument(
         "--regions",
@@ -164,6 +169,7 @@ async def main() -> None:
                     metric,
                     args.limit,
                     ranking_regions,
+                    incremental=args.incremental,
                 )
             except aiohttp.ClientResponseError as error:
                 failed += 1
@@ -195,6 +201,7 @@ async def main() -> None:
         print(f"written specs: {written}")
         print(f"skipped specs: {skipped}")
         print(f"failed specs: {failed}")
+        print(f"rate limit: {WarcraftlogsClient.get_instance().get_metrics()}")
     finally:
         client = WarcraftlogsClient._instance
         if client and client.session:
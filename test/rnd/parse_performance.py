@@ -1,8 +1,14 @@
 from datetime import datetime
 import json
+import random
 
 import cattrs
+from lorgs import utils
+from lorgs.clients import wcl
 from lorgs.logger import Timer
+from lorgs.models.base.construct import construct
+from lorgs.models.warcraftlogs_cast import Cast, add_cast_counters, process_auras, process_until_events
+from lorgs.models.warcraftlogs_player import Player
 from lorgs.models.warcraftlogs_ranking import SpecRanking
 
 
@@ -71,8 +77,102 @@ def load1() -> None:
     # print(data)
 
 
+################################################################################
+# Casts
+#
+
+def make_events(n: int) -> list[dict]:
+    """Create `n` events, similar to the ones of a long ultimate pull."""
+    event_types = ["cast", "cast", "cast", "applybuff", "removebuff", "applydebuff", "removedebuff"]
+    events = []
+    for i in range(n):
+        events.append(
+            {
+                "timestamp": 1000 + i * 250,
+                "type": random.choice(event_types),
+                "sourceID": random.choice([1, 1, 1, 2]),
+                "targetID": random.choice([1, 2, -1]),
+                "abilityGameID": random.randint(1, 50),
+                "fight": 1,
+            }
+        )
+    return events
+
+
+def process_casts_pydantic(events_data: list[dict]) -> list[Cast]:
+    """The previous pipeline: validating every event and creating a `Cast` for each."""
+    report_data = wcl.ReportData(report={"events": {"data": events_data}})
+    casts = []
+    for event in report_data.report.events:
+        actor_id = event.targetID if event.type in ("applybuff", "removebuff", "resurrect") else event.sourceID
+        if actor_id == 1:
+            casts.append(Cast.from_report_event(event))
+    casts = process_until_events(casts)
+    casts = process_auras(casts)
+    casts = utils.uniqify(casts, key=lambda cast: (cast.spell_id, int(cast.timestamp / 1000)))
+    casts = sorted(casts, key=lambda cast: cast.timestamp)
+    return add_cast_counters(casts)
+
+
+def process_casts_fast(events_data: list[dict]) -> list[Cast]:
+    actor = Player(source_id=1)
+    actor.process_query_result(report={"events": {"data": events_data}})
+    return actor.casts
+
+
+def bench_casts(n_events=2_000, n=50) -> None:
+    events_data = make_events(n_events)
+
+    # both need to give the same result
+    old = [cast.model_dump() for cast in process_casts_pydantic(events_data)]
+    new = [cast.model_dump() for cast in process_casts_fast(events_data)]
+    assert old == new, "results differ"
+
+    print(f"processing {n_events} events")
+    test(n, process_casts_pydantic, events_data)
+    test(n, process_casts_fast, events_data)
+
+
+################################################################################
+# Spec Rankings
+#
+
+def make_spec_ranking(n_reports=100, n_casts=200) -> dict:
+    """Create the stored data of a `SpecRanking`, with a single player per fight."""
+    reports = []
+    for i in range(n_reports):
+        casts = [{"spell_id": random.randint(1, 50), "ts": j * 1000, "d": 5000, "c": 1} for j in range(n_casts)]
+        fight = {
+            "fight_id": 1,
+            "start_time": "2024-01-01T20:00:00Z",
+            "duration": 600_000,
+            "players": [{"source_id": 1, "name": f"player{i}", "spec_slug": "paladin-holy", "total": 12345.6, "casts": casts}],
+            "boss": {"boss_slug": "boss", "casts": casts[:20]},
+            "phases": [{"ts": 120_000, "name": "P2"}],
+        }
+        reports.append({"report_id": f"report{i:04d}", "start_time": "2024-01-01T19:00:00Z", "fights": [fight]})
+
+    return {"spec_slug": "paladin-holy", "boss_slug": "boss", "reports": reports, "updated": "2024-01-02T00:00:00Z"}
+
+
+def bench_spec_ranking(n=10) -> None:
+    data = make_spec_ranking()
+
+    # both need to give the same result
+    old = SpecRanking(**data)
+    new = construct(SpecRanking, data)
+    assert old.model_dump_json(exclude_unset=True) == new.model_dump_json(exclude_unset=True), "results differ"
+    assert new.reports[0].fights[0].players[0].fight.report is new.reports[0]
+
+    print("spec ranking: __init__ vs construct")
+    test(n, lambda: SpecRanking(**data))
+    test(n, construct, SpecRanking, data)
+
+
 def main() -> None:
-    load1()
+    bench_casts()
+    bench_spec_ranking()
+    # load1()
 
 
 if __name__ == "__main__":
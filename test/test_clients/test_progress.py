@@ -0,0 +1,155 @@
+import asyncio
+import contextlib
+import threading
+
+import pytest
+
+from lorgs.clients import progress
+
+
+class RecordingBroker(progress.MemoryBroker):
+    def __init__(self) -> None:
+        super().__init__()
+        self.published: list[dict] = []
+
+    def publish(self, task_id, update):
+        self.published.append(update)
+        super().publish(task_id, update)
+
+
+class BlockingRedisBroker(progress.RedisBroker):
+    """Holds each message, until `release` is set."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.release = threading.Event()
+        self.sent: list[tuple[str, str, str]] = []
+
+    def send(self, channel, message):
+        self.release.wait(timeout=1)
+        self.sent.append((channel, message, threading.current_thread().name))
+
+
+def is_finished(state: dict) -> bool:
+    return state.get("status") == "done"
+
+
+def test__merge_update():
+    state = {"status": "waiting", "items": {"1_2": {"fight": 1, "status": "waiting"}}}
+    update = {"status": "in-progress", "items": {"1_2": {"status": "done"}, "1_3": {"status": "in-progress"}}}
+
+    assert progress.merge_update(state, update) == {
+        "status": "in-progress",
+        "items": {"1_2": {"fight": 1, "status": "done"}, "1_3": {"status": "in-progress"}},
+    }
+    assert state["items"]["1_2"]["status"] == "waiting"  # not modified
+
+
+def test__broker__is_abstract():
+    with pytest.raises(TypeError):
+        progress.Broker()  # type: ignore
+
+
+def test__redis_broker__publish_without_loop():
+    broker = BlockingRedisBroker()
+    broker.release.set()
+    broker.publish("task", {"status": "done"})
+
+    assert broker.sent == [("task_progress:task", '{"status": "done"}', threading.current_thread().name)]
+
+
+def test__redis_broker__publish_does_not_block_the_loop():
+    broker = BlockingRedisBroker()
+
+    async def run():
+        broker.publish("task", {"status": "in-progress"})
+        broker.publish("task", {"status": "done"})
+        assert not broker.sent  # still waiting in the publish thread
+        broker.release.set()
+
+    asyncio.run(run())
+    broker.executor.shutdown(wait=True)
+
+    assert [message for _, message, _ in broker.sent] == ['{"status": "in-progress"}', '{"status": "done"}']
+    assert all(thread.startswith("task-progress") for _, _, thread in broker.sent)
+
+
+def test__publisher__coalesces_updates():
+    broker = RecordingBroker()
+
+    async def run():
+        publisher = progress.ProgressPublisher("task", broker=broker, interval=0.01)
+        publisher.update(items={"1_2": {"status": "in-progress"}})
+        publisher.update(items={"1_3": {"status": "in-progress"}})
+        publisher.update(items={"1_2": {"status": "done"}})
+        await asyncio.sleep(0.05)
+
+        publisher.update(status="done")
+        publisher.flush()
+
+    asyncio.run(run())
+    assert broker.published == [
+        {"items": {"1_2": {"status": "done"}, "1_3": {"status": "in-progress"}}},
+        {"status": "done"},
+    ]
+
+
+def test__watch__pushes_updates(monkeypatch):
+    broker = RecordingBroker()
+    monkeypatch.setattr(progress, "_broker", broker)
+    reads = []
+
+    def get_state():
+        reads.append(True)
+        return {"status": "waiting", "items": {"1_2": {"status": "waiting"}}}
+
+    async def publish():
+        await asyncio.sleep(0.01)
+        broker.publish("task", {"status": "in-progress", "items": {"1_2": {"status": "in-progress"}}})
+        await asyncio.sleep(0.01)
+        broker.publish("task", {"status": "done", "items": {"1_2": {"status": "done"}}})
+
+    async def run():
+        states = progress.watch("task", get_state=get_state, is_finished=is_finished, refresh_interval=10)
+        asyncio.create_task(publish())
+        async with contextlib.aclosing(states):
+            return [state async for state in states]
+
+    states = asyncio.run(run())
+    assert [state["status"] for state in states] == ["waiting", "in-progress", "done"]
+    assert states[-1]["items"] == {"1_2": {"status": "done"}}
+    assert len(reads) == 1  # no polling
+    assert not broker.subscribers  # unsubscribed
+
+
+def test__watch__refreshes_without_updates(monkeypatch):
+    monkeypatch.setattr(progress, "_broker", progress.MemoryBroker())
+    stored = iter([None, {"status": "in-progress"}, {"status": "done"}])
+
+    async def run():
+        states = progress.watch("task", get_state=lambda: next(stored), is_finished=is_finished, refresh_interval=0.01)
+        return [state async for state in states]
+
+    assert asyncio.run(run()) == [{"status": "not found"}, {"status": "in-progress"}, {"status": "done"}]
+
+
+def test__watch__timeout(monkeypatch):
+    monkeypatch.setattr(progress, "_broker", progress.MemoryBroker())
+
+    async def run():
+        states = progress.watch("task", get_state=lambda: {"status": "waiting"}, is_finished=is_finished, timeout=0.02)
+        return [state async for state in states]
+
+    assert asyncio.run(run()) == [{"status": "waiting"}, {"status": "timeout"}]
+
+
+def test__watch__refreshes_often_with_local_broker(monkeypatch):
+    monkeypatch.setattr(progress, "_broker", progress.MemoryBroker())
+    monkeypatch.setattr(progress, "LOCAL_REFRESH_INTERVAL", 0.01)
+    stored = iter([{"status": "waiting"}, {"status": "done"}])
+
+    async def run():
+        states = progress.watch("task", get_state=lambda: next(stored), is_finished=is_finished, timeout=1)
+        return [state async for state in states]
+
+    assert asyncio.run(run()) == [{"status": "waiting"}, {"status": "done"}]
@@ -0,0 +1,184 @@
+import asyncio
+
+from lorgs.clients.wcl.batch import QueryBatch, build_report_query
+from lorgs.clients.wcl.cache import ResponseCache
+from lorgs.clients.wcl.client import WarcraftlogsClient
+
+
+class FakeClient:
+    raise_errors = WarcraftlogsClient.raise_errors
+
+    def __init__(self, cache=None, errors=None):
+        self.queries = []
+        self.cache = cache
+        self.errors = errors or []
+
+    def get_url(self, region=""):
+        return f"url/{region}"
+
+    async def run_query(self, url, query, priority=0, cache=True):
+        self.queries.append(query)
+        if "q0:" in query:
+            return {"data": {"reportData": {"q0": {"id": 0}, "q1": {"id": 1}}}, "errors": self.errors}
+        return {"data": {"reportData": {"report": {"id": "single"}}}}
+
+    async def query(self, query, raise_errors=True, region="", priority=0, cache=True):
+        result = await self.run_query(self.get_url(region), query, priority=priority, cache=cache)
+        if raise_errors:
+            self.raise_errors(result)
+        return result["data"]
+
+
+def test__build_report_query__single():
+    assert build_report_query("abc", "fights { id }") == 'reportData { report(code: "abc") { fights { id } } }'
+
+
+def test__query__combines_same_report():
+    client = FakeClient()
+    batch = QueryBatch(client)
+
+    async def run():
+        return await asyncio.gather(
+            batch.query('reportData { report(code: "abc") { a } }'),
+            batch.query('reportData\n{\n    report(code: "abc")\n    {\n        b\n    }\n}\n'),
+        )
+
+    results = asyncio.run(run())
+    assert len(client.queries) == 1
+    assert 'q0: report(code: "abc") {  a  }' in client.queries[0]
+    assert results == [{"reportData": {"report": {"id": 0}}}, {"reportData": {"report": {"id": 1}}}]
+
+
+def test__query__separate_reports():
+    client = FakeClient()
+    batch = QueryBatch(client)
+
+    async def run():
+        return await asyncio.gather(
+            batch.query('reportData { report(code: "abc") { a } }'),
+            batch.query('reportData { report(code: "xyz") { a } }'),
+        )
+
+    results = asyncio.run(run())
+    assert len(client.queries) == 2
+    assert results[0] == {"reportData": {"report": {"id": "single"}}}
+
+
+def test__query__passthrough():
+    client = FakeClient()
+    batch = QueryBatch(client)
+    asyncio.run(batch.query("worldData { encounter(id: 1) { name } }"))
+    assert client.queries == ["worldData { encounter(id: 1) { name } }"]
+
+
+def test__query__max_size():
+    client = FakeClient()
+    batch = QueryBatch(client, max_size=2)
+
+    async def run():
+        queries = [batch.query(f'reportData {{ report(code: "abc") {{ f{i} }} }}') for i in range(3)]
+        return await asyncio.gather(*queries)
+
+    asyncio.run(run())
+    assert len(client.queries) == 2
+
+
+def test__query__across_reports():
+    client = FakeClient()
+    batch = QueryBatch(client, across_reports=True)
+
+    async def run():
+        return await asyncio.gather(
+            batch.query('reportData { report(code: "abc") { a } }'),
+            batch.query('reportData { report(code: "xyz") { a } }'),
+        )
+
+    results = asyncio.run(run())
+    assert len(client.queries) == 1
+    assert 'q0: report(code: "abc")' in client.queries[0]
+    assert 'q1: report(code: "xyz")' in client.queries[0]
+    assert results == [{"reportData": {"report": {"id": 0}}}, {"reportData": {"report": {"id": 1}}}]
+
+
+def test__query__across_reports__max_length():
+    client = FakeClient()
+    batch = QueryBatch(client, across_reports=True, max_length=20)
+
+    async def run():
+        queries = [batch.query(f'reportData {{ report(code: "r{i}") {{ field{i} }} }}') for i in range(3)]
+        return await asyncio.gather(*queries)
+
+    asyncio.run(run())
+    assert len(client.queries) == 2  # 2 bodies per request fit into the limit
+
+
+def run_pair(client, raise_errors=True):
+    batch = QueryBatch(client)
+
+    async def run():
+        return await asyncio.gather(
+            batch.query('reportData { report(code: "abc") { a } }', raise_errors=raise_errors),
+            batch.query('reportData { report(code: "abc") { b } }', raise_errors=raise_errors),
+            return_exceptions=True,
+        )
+
+    return asyncio.run(run())
+
+
+def test__query__errors_only_fail_their_alias():
+    client = FakeClient(errors=[{"message": "You do not have permission to view this report.", "path": ["reportData", "q1"]}])
+    results = run_pair(client)
+
+    assert results[0] == {"reportData": {"report": {"id": 0}}}
+    assert isinstance(results[1], PermissionError)
+    assert len(client.queries) == 1
+
+
+def test__query__errors_without_alias_fail_all():
+    client = FakeClient(errors=[{"message": "Something went wrong."}])
+    results = run_pair(client)
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test__query__errors_ignored():
+    client = FakeClient(errors=[{"message": "Something went wrong.", "path": ["reportData", "q1"]}])
+    results = run_pair(client, raise_errors=False)
+    assert results == [{"reportData": {"report": {"id": 0}}}, {"reportData": {"report": {"id": 1}}}]
+
+
+def test__query__invalid_report_retried_on_its_own():
+    client = FakeClient(errors=[{"message": "This report does not exist.", "path": ["reportData", "q0", "a"]}])
+    results = run_pair(client)
+
+    assert results == [{"reportData": {"report": {"id": "single"}}}, {"reportData": {"report": {"id": 1}}}]
+    assert client.queries[1] == build_report_query("abc", " a ")
+
+
+def test__query__cached_per_report_query(tmp_path):
+    client = FakeClient(cache=ResponseCache(tmp_path / "cache.sqlite"))
+    events = 'reportData { report(code: "abc") { events(fightIDs: [1]) { data } } }'
+    fights = 'reportData { report(code: "abc") { fights { id } } }'
+
+    async def run():
+        return await asyncio.gather(batch.query(events), batch.query(fights))
+
+    batch = QueryBatch(client)
+    asyncio.run(run())
+    assert len(client.queries) == 1
+
+    # each part is cached on its own, with its own TTL
+    cache = client.cache
+    assert cache.get("url/", events) == {"data": {"reportData": {"report": {"id": 0}}}}
+    expires = dict(cache.db.execute("SELECT key, expires FROM responses").fetchall())
+    assert expires[cache.get_key("url/", events)] is None
+    assert expires[cache.get_key("url/", fights)] is not None
+
+    # combined with a different query next time: only the new part is requested
+    other = 'reportData { report(code: "abc") { table(fightIDs: [1]) } }'
+
+    async def run_again():
+        return await asyncio.gather(batch.query(events), batch.query(other))
+
+    results = asyncio.run(run_again())
+    assert client.queries[1] == build_report_query("abc", " table(fightIDs: [1]) ")
+    assert results == [{"reportData": {"report": {"id": 0}}}, {"reportData": {"report": {"id": "single"}}}]
@@ -0,0 +1,112 @@
+import asyncio
+import time
+
+from lorgs.clients.wcl.cache import REPORT_TTL, ResponseCache, get_report_fields, get_ttl
+
+
+URL = "https://www.warcraftlogs.com/api/v2/client"
+EVENTS_QUERY = 'reportData { report(code: "abc") { events(fightIDs: [1], startTime: 0, endTime: 10) {data} } }'
+RANKINGS_QUERY = "worldData { encounter(id: 5) { characterRankings(partition: 1) } }"
+
+
+################################################################################
+# TTL
+#
+def test__get_ttl__events_forever():
+    assert get_ttl(EVENTS_QUERY) is None
+
+
+def test__get_ttl__report_overview():
+    assert get_ttl('reportData { report(code: "abc") { fights { id } } }') == REPORT_TTL
+
+
+def test__get_ttl__shortest_part():
+    query = """reportData {
+        q0: report(code: "abc") { events(fightIDs: [1]) { data } }
+        q1: report(code: "xyz") { fights { id } }
+    }"""
+    assert get_ttl(query) == REPORT_TTL
+
+
+def test__get_ttl__report_rankings():
+    # parses get re-ranked over time
+    assert get_ttl('reportData { report(code: "abc") { rankings(fightIDs: [1]) } }') == REPORT_TTL
+
+
+def test__get_report_fields():
+    query = """reportData { report(code: "abc") {
+        casts: events(filterExpression: "type = 'cast' and (ability.id in (1, 2))") { data }
+        fights(fightIDs: [1]) { id }
+    } }"""
+    assert get_report_fields(query) == ["events", "fights"]
+
+
+def test__get_ttl__world_data():
+    assert get_ttl(RANKINGS_QUERY) > 0
+
+
+def test__get_ttl__rate_limit_not_cached():
+    assert get_ttl("rateLimitData { pointsSpentThisHour }") == 0
+
+
+def test__get_ttl__unknown_not_cached():
+    assert get_ttl("userData { currentUser { id } }") == 0
+
+
+################################################################################
+# Cache
+#
+def test__cache__roundtrip(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite")
+    response = {"reportData": {"report": {"events": {"data": [1, 2, 3]}}}}
+
+    assert cache.get(URL, EVENTS_QUERY) is None
+    cache.set(URL, EVENTS_QUERY, response)
+
+    # formatting differences don't matter
+    assert cache.get(URL, "  " + EVENTS_QUERY.replace(" ", "\n  ")) == response
+    assert cache.metrics() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test__cache__separate_by_url(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite")
+    cache.set(URL, EVENTS_QUERY, {"a": 1})
+    assert cache.get("https://cn.warcraftlogs.com/api/v2/client", EVENTS_QUERY) is None
+
+
+def test__cache__expired(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite")
+    cache.set(URL, RANKINGS_QUERY, {"a": 1})
+    cache.db.execute("UPDATE responses SET expires = ?", (time.time() - 1,))
+
+    assert cache.get(URL, RANKINGS_QUERY) is None
+    assert cache.purge() == 1
+
+
+def test__cache__persistent(tmp_path):
+    ResponseCache(tmp_path / "cache.sqlite").set(URL, EVENTS_QUERY, {"a": 1})
+    assert ResponseCache(tmp_path / "cache.sqlite").get(URL, EVENTS_QUERY) == {"a": 1}
+
+
+def test__cache__fetch_store(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite")
+
+    async def run():
+        await cache.store(URL, EVENTS_QUERY, {"a": 1})
+        return await cache.fetch_many(URL, [EVENTS_QUERY, RANKINGS_QUERY])
+
+    assert asyncio.run(run()) == [{"a": 1}, None]
+
+
+def test__cache__evicts_least_recently_used(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite", max_entries=2)
+    queries = [EVENTS_QUERY.replace("[1]", f"[{i}]") for i in range(3)]
+
+    async def run():
+        await cache.store_many(URL, [(queries[0], {"a": 0}), (queries[1], {"a": 1})])
+        cache.db.execute("UPDATE responses SET accessed = accessed - 10")  # make sure the order is distinct
+        assert await cache.fetch(URL, queries[0]) == {"a": 0}  # used again
+        await cache.store(URL, queries[2], {"a": 2})
+        return await cache.fetch_many(URL, queries)
+
+    assert asyncio.run(run()) == [{"a": 0}, None, {"a": 2}]
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from lorgs.clients.wcl.client import WarcraftlogsClient
+
+
+def run_with_client(func):
+    """Run `func(client)` with a client, whose `_run_query` only counts the calls."""
+    calls = []
+
+    async def run_query(url, query, priority=0, cache=True):
+        calls.append(query)
+        await asyncio.sleep(0.01)
+        if query == "error":
+            raise ValueError("failed")
+        return {"data": {"value": [query]}}
+
+    async def run():
+        client = WarcraftlogsClient(auth_token="token")
+        client._run_query = run_query
+        try:
+            return client, await func(client)
+        finally:
+            await client.session.close()
+
+    client, result = asyncio.run(run())
+    return client, result, calls
+
+
+def test__run_query__deduplicates_identical_queries():
+    async def func(client):
+        return await asyncio.gather(
+            client.run_query("url", "a"),
+            client.run_query("url", "a"),
+            client.run_query("url", "b"),
+        )
+
+    client, results, calls = run_with_client(func)
+    assert sorted(calls) == ["a", "b"]
+    assert results[0] == results[1] == {"data": {"value": ["a"]}}
+    assert results[0] is not results[1]  # each caller gets its own copy
+    assert client.get_metrics()["deduplicated"] == 1
+    assert client.get_metrics()["in_flight"] == 0
+
+
+def test__run_query__shares_errors():
+    async def func(client):
+        return await asyncio.gather(
+            client.run_query("url", "error"),
+            client.run_query("url", "error"),
+            return_exceptions=True,
+        )
+
+    _, results, calls = run_with_client(func)
+    assert calls == ["error"]
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test__run_query__first_caller_cancelled():
+    async def func(client):
+        first = asyncio.ensure_future(client.run_query("url", "a"))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(client.run_query("url", "a"))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    _, result, calls = run_with_client(func)
+    assert result == {"data": {"value": ["a"]}}
+    assert calls == ["a", "a"]
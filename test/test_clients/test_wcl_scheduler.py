@@ -0,0 +1,138 @@
+import asyncio
+import sys
+import time
+
+import pytest
+
+from lorgs.clients.wcl.scheduler import Priority, RequestScheduler, Ticket, get_query_kind
+
+
+RATE_INFO = {"limitPerHour": 3600, "pointsSpentThisHour": 100, "pointsResetIn": 1800}
+
+
+################################################################################
+# Query Kind
+#
+def test__get_query_kind__events():
+    query = 'reportData { report(code: "abc") { events(startTime: 0, endTime: 10) {data} } }'
+    assert get_query_kind(query) == "reportData:events"
+
+
+def test__get_query_kind__rankings():
+    query = "worldData { encounter(id: 5) { p1: characterRankings(partition: 1) } }"
+    assert get_query_kind(query) == "worldData:characterRankings"
+
+
+################################################################################
+# Budget
+#
+def test__update__sets_budget():
+    scheduler = RequestScheduler()
+    scheduler.update(RATE_INFO)
+
+    assert scheduler.limit_per_hour == 3600
+    assert scheduler.points_spent == 100
+    assert scheduler.points_left == 3500
+    assert 1790 < scheduler.reset_in <= 1800
+
+
+def test__update__ignores_outdated_responses():
+    scheduler = RequestScheduler()
+    scheduler.update(RATE_INFO)
+    scheduler.update({**RATE_INFO, "pointsSpentThisHour": 50})
+
+    assert scheduler.points_spent == 100
+
+
+def test__update__new_hour():
+    scheduler = RequestScheduler()
+    scheduler.update(RATE_INFO)
+    scheduler.update({**RATE_INFO, "pointsSpentThisHour": 20, "pointsResetIn": 3600})
+
+    assert scheduler.points_spent == 20
+
+
+def test__update__points_total():
+    scheduler = RequestScheduler()
+    scheduler.update(RATE_INFO)
+    scheduler.update({**RATE_INFO, "pointsSpentThisHour": 150})
+    assert scheduler.points_total == 50
+
+
+def test__release__learns_query_costs():
+    async def run():
+        scheduler = RequestScheduler()
+        scheduler.update(RATE_INFO)
+
+        ticket = await scheduler.acquire("reportData { report { events {data} } }")
+        scheduler.release(ticket, {**RATE_INFO, "pointsSpentThisHour": 112})
+        return scheduler
+
+    scheduler = asyncio.run(run())
+    assert scheduler.costs == {"reportData:events": 12}
+    assert scheduler.estimate_cost("reportData:events") == 12
+
+
+################################################################################
+# Slots
+#
+def test__wait_time__no_budget_left():
+    scheduler = RequestScheduler(reserve=0)
+    scheduler.update({**RATE_INFO, "pointsSpentThisHour": 3598})
+
+    wait_time = scheduler.get_wait_time(scheduler_ticket(scheduler))
+    assert 1790 < wait_time <= 1800
+
+
+def test__wait_time__paused():
+    scheduler = RequestScheduler()
+    scheduler.update(RATE_INFO)
+    scheduler.paused_until = time.monotonic() + 10
+
+    assert 9 < scheduler.get_wait_time(scheduler_ticket(scheduler)) <= 10
+
+
+def test__acquire__runs_in_priority_order():
+    order = []
+
+    async def request(scheduler, name, priority):
+        ticket = await scheduler.acquire(name, priority=priority)
+        order.append(name)
+        await asyncio.sleep(0)
+        scheduler.release(ticket, RATE_INFO)
+
+    async def run():
+        scheduler = RequestScheduler(max_concurrency=1)
+        scheduler.update(RATE_INFO)
+
+        # block the only slot, so the others have to queue up
+        blocker = await scheduler.acquire("blocker")
+        tasks = [
+            asyncio.create_task(request(scheduler, "low", Priority.LOW)),
+            asyncio.create_task(request(scheduler, "normal", Priority.NORMAL)),
+            asyncio.create_task(request(scheduler, "high", Priority.HIGH)),
+        ]
+        await asyncio.sleep(0)
+        scheduler.release(blocker, RATE_INFO)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    assert order == ["high", "normal", "low"]
+
+
+def test__metrics():
+    scheduler = RequestScheduler()
+    scheduler.update(RATE_INFO)
+
+    metrics = scheduler.metrics()
+    assert metrics["limit_per_hour"] == 3600
+    assert metrics["points_left"] == 3500
+    assert metrics["queued"] == 0
+
+
+def scheduler_ticket(scheduler: RequestScheduler) -> Ticket:
+    return Ticket(kind="test", cost=scheduler.estimate_cost("test"))
+
+
+if __name__ == "__main__":
+    pytest.main(sys.argv)
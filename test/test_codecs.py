@@ -0,0 +1,62 @@
+import gzip
+import io
+import json
+from unittest import mock
+
+from lorgs import codecs
+from lorgs.models.base import s3
+from lorgs.models.warcraftlogs_ranking import SpecRanking
+
+
+DATA = codecs.dump_json({"casts": [{"spell_id": 123, "ts": i * 1000} for i in range(100)]})
+
+
+def test__gzip__roundtrip() -> None:
+    codec = codecs.get_codec("gzip")
+    encoded = codec.encode(DATA)
+
+    assert len(encoded) < len(DATA) / 4
+    assert codec.encode(DATA) == encoded  # stable output
+    assert codecs.decode(encoded) == DATA
+
+
+def test__decode__detects_codec() -> None:
+    assert codecs.detect(gzip.compress(DATA)).name == "gzip"
+    assert codecs.detect(DATA).name == "identity"
+    assert codecs.decode(DATA) == DATA
+
+
+def test__get_codec__unknown() -> None:
+    assert codecs.get_codec("foo").name == "identity"
+
+
+def test__write_file__siblings(tmp_path) -> None:
+    path = codecs.write_file(tmp_path / "ranking.json", DATA, siblings=["gzip", "br"])
+
+    assert path == tmp_path / "ranking.json"
+    assert path.read_bytes() == DATA
+    assert codecs.read_file(tmp_path / "ranking.json.gz") == DATA
+    assert (tmp_path / "ranking.json.br").exists() == codecs.CODECS["br"].available
+
+
+def test__write_file__compressed(tmp_path) -> None:
+    path = codecs.write_file(tmp_path / "ranking.json", DATA, codec="gzip")
+
+    assert path == tmp_path / "ranking.json.gz"
+    assert not (tmp_path / "ranking.json").exists()
+    assert codecs.read_file(path) == DATA
+
+
+def test__s3_model__save_and_load() -> None:
+    ranking = SpecRanking(spec_slug="paladin-holy", boss_slug="boss")
+
+    with mock.patch.object(s3, "s3client") as client, mock.patch.dict("os.environ", {"AWS_ACCESS_KEY_ID": "x"}):
+        ranking.save()
+
+        request = client.put_object.call_args.kwargs
+        assert request["ContentEncoding"] == "gzip"
+        assert json.loads(gzip.decompress(request["Body"])) == {"spec_slug": "paladin-holy", "boss_slug": "boss"}
+
+        client.get_object.return_value = {"Body": io.BytesIO(request["Body"]), "ContentEncoding": "gzip"}
+        loaded = SpecRanking.get(spec_slug="paladin-holy", boss_slug="boss", difficulty="mythic", metric="rdps")
+        assert loaded and loaded.spec_slug == "paladin-holy"
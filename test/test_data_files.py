@@ -0,0 +1,112 @@
+import asyncio
+import gzip
+import json
+import os
+import typing
+
+from lorgs import codecs
+from lorrgs_api.data_files import DataFiles, parse_accept_encoding
+
+
+DATA = codecs.dump_json({"casts": [{"spell_id": 123, "ts": i * 1000} for i in range(100)]})
+
+
+def request(app: DataFiles, path: str, query: str = "", **headers: str) -> tuple[int, dict[str, str], bytes]:
+    """Send a GET-Request to the app. Returns (status, headers, body)."""
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "root_path": "",
+        "query_string": query.encode(),
+        "headers": [(key.replace("_", "-").lower().encode(), value.encode()) for key, value in headers.items()],
+    }
+    messages: list[dict[str, typing.Any]] = []
+    received: list[bool] = []
+
+    async def receive() -> dict[str, typing.Any]:
+        if received:
+            await asyncio.Event().wait()  # the client never disconnects
+        received.append(True)
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict[str, typing.Any]) -> None:
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+
+    start = messages[0]
+    response_headers = {key.decode(): value.decode() for key, value in start["headers"]}
+    body = b"".join(message.get("body", b"") for message in messages[1:])
+    return start["status"], response_headers, body
+
+
+def test__parse_accept_encoding() -> None:
+    assert parse_accept_encoding("gzip, deflate, br") == {"gzip", "deflate", "br"}
+    assert parse_accept_encoding("gzip;q=1.0, br;q=0") == {"gzip"}
+    assert parse_accept_encoding("") == set()
+
+
+def test__etag_and_not_modified(tmp_path) -> None:
+    codecs.write_file(tmp_path / "ranking.json", DATA)
+    app = DataFiles(directory=tmp_path)
+
+    status, headers, body = request(app, "/ranking.json")
+    assert status == 200
+    assert body == DATA
+    assert headers["cache-control"] == "no-cache"
+
+    status, headers, body = request(app, "/ranking.json", if_none_match=headers["etag"])
+    assert status == 304
+    assert body == b""
+
+    # rewriting the same content keeps the etag valid
+    etag = headers["etag"]
+    codecs.write_file(tmp_path / "ranking.json", DATA)
+    assert request(app, "/ranking.json", if_none_match=etag)[0] == 304
+
+
+def test__precompressed(tmp_path) -> None:
+    codecs.write_file(tmp_path / "ranking.json", DATA, siblings=["gzip"])
+    app = DataFiles(directory=tmp_path)
+
+    status, headers, body = request(app, "/ranking.json", accept_encoding="gzip, deflate")
+    assert status == 200
+    assert headers["content-encoding"] == "gzip"
+    assert headers["content-type"] == "application/json"
+    assert gzip.decompress(body) == DATA
+
+    # identity etag also matches the compressed representation
+    _, identity_headers, _ = request(app, "/ranking.json")
+    assert "content-encoding" not in identity_headers
+    assert request(app, "/ranking.json", accept_encoding="gzip", if_none_match=identity_headers["etag"])[0] == 304
+
+
+def test__precompressed__ignores_outdated(tmp_path) -> None:
+    codecs.write_file(tmp_path / "ranking.json", DATA, siblings=["gzip"])
+    stat = os.stat(tmp_path / "ranking.json")
+    os.utime(tmp_path / "ranking.json.gz", ns=(stat.st_atime_ns, stat.st_mtime_ns - 10**9))
+    app = DataFiles(directory=tmp_path)
+
+    status, headers, body = request(app, "/ranking.json", accept_encoding="gzip")
+    assert status == 200
+    assert "content-encoding" not in headers
+    assert body == DATA
+
+
+def test__manifest__versioned_urls(tmp_path) -> None:
+    codecs.write_file(tmp_path / "ranking.json", DATA, siblings=["gzip"])
+    codecs.write_file(tmp_path / "other.json", b"{}")
+    app = DataFiles(directory=tmp_path)
+
+    status, headers, body = request(app, "/manifest.json")
+    files = json.loads(body)["files"]
+    assert status == 200
+    assert list(files) == ["other.json", "ranking.json"]
+    assert request(app, "/manifest.json", if_none_match=headers["etag"])[0] == 304
+
+    _, headers, _ = request(app, "/ranking.json", query=f"v={files['ranking.json']}")
+    assert "immutable" in headers["cache-control"]
+
+    _, headers, _ = request(app, "/ranking.json", query="v=outdated")
+    assert headers["cache-control"] == "no-cache"
@@ -0,0 +1,46 @@
+import datetime
+from unittest import mock
+
+from lorgs.clients import progress
+from lorgs.models.task import Task
+from lorgs.models.warcraftlogs_fight import Fight
+from lorgs.models.warcraftlogs_player import Player
+from lorrgs_sqs.task_handlers import load_user_report
+
+
+class SharedBroker(progress.MemoryBroker):
+    """Pretends to reach the other processes."""
+
+    is_local = False
+
+
+def test__set_task_item_status__saves_snapshots(monkeypatch):
+    task = Task(task_id="task")
+    publisher = progress.ProgressPublisher("task", broker=SharedBroker())
+
+    fight = Fight(fight_id=4, start_time=datetime.datetime(2024, 1, 1))
+    player = Player(source_id=12)
+    player.fight = fight
+
+    clock = iter([100.0, 101.0, 106.0, 106.0])
+    monkeypatch.setattr(load_user_report.time, "monotonic", lambda: next(clock))
+    monkeypatch.setattr(load_user_report, "TASK_SAVE_INTERVAL", 5)
+
+    with mock.patch.object(Task, "save") as save:
+        handler = load_user_report.set_task_item_status(task, publisher)
+        handler(player, "start")  # within the interval
+        assert not save.called
+
+        handler(player, "success")
+        assert save.call_count == 1
+
+    assert task.items == {"4_12": {"fight": 4, "player": 12, "status": Task.STATUS.DONE}}
+
+
+def test__get_save_interval(monkeypatch):
+    monkeypatch.setattr(load_user_report, "TASK_SAVE_INTERVAL", 5)
+
+    shared = progress.ProgressPublisher("task", broker=SharedBroker())
+    local = progress.ProgressPublisher("task", broker=progress.MemoryBroker())
+    assert load_user_report.get_save_interval(shared) == 5
+    assert load_user_report.get_save_interval(local) == progress.LOCAL_REFRESH_INTERVAL
@@ -0,0 +1,93 @@
+import datetime
+import gc
+from concurrent.futures import ThreadPoolExecutor
+
+from lorgs.models.base.construct import construct
+from lorgs.models.warcraftlogs_cast import Cast
+from lorgs.models.warcraftlogs_comp_ranking import CompRanking
+from lorgs.models.warcraftlogs_ranking import SpecRanking
+from lorgs.models.warcraftlogs_report import Report
+
+
+SPEC_RANKING = {
+    "spec_slug": "paladin-holy",
+    "boss_slug": "boss",
+    "updated": "2024-01-02T00:00:00Z",
+    "reports": [
+        {
+            "report_id": "abc",
+            "start_time": "2024-01-01T19:00:00Z",
+            "fights": [
+                {
+                    "fight_id": 3,
+                    "start_time": "2024-01-01T20:00:00Z",
+                    "percent": 1,
+                    "players": [
+                        {
+                            "source_id": 1,
+                            "name": "player",
+                            "total": 100,
+                            "casts": [{"spell_id": 10, "ts": 1000, "d": 5000, "c": 1}, {"spell_id": 20, "ts": 2000}],
+                        }
+                    ],
+                    "boss": {"boss_slug": "boss", "casts": [{"spell_id": 30, "ts": 500}]},
+                    "phases": [{"ts": 120000, "name": "P2"}],
+                }
+            ],
+        }
+    ],
+}
+
+
+def test__construct__same_as_init() -> None:
+    expected = SpecRanking(**SPEC_RANKING)
+    result = construct(SpecRanking, SPEC_RANKING)
+
+    assert result.model_dump_json(exclude_unset=True) == expected.model_dump_json(exclude_unset=True)
+    assert result.model_dump_json() == expected.model_dump_json()
+
+
+def test__construct__converts_values() -> None:
+    ranking = construct(SpecRanking, SPEC_RANKING)
+    fight = ranking.reports[0].fights[0]
+
+    assert ranking.updated == datetime.datetime(2024, 1, 2, tzinfo=datetime.timezone.utc)
+    assert fight.percent == 1.0 and isinstance(fight.percent, float)
+    assert fight.players[0].casts[0] == Cast(spell_id=10, timestamp=1000, duration=5000, counter=1)
+
+
+def test__construct__links_parents() -> None:
+    ranking = construct(SpecRanking, SPEC_RANKING)
+    report = ranking.reports[0]
+    fight = report.fights[0]
+
+    assert fight.report is report
+    assert fight.players[0].fight is fight
+    assert fight.boss and fight.boss.fight is fight
+
+
+def test__construct__defaults_not_shared() -> None:
+    a = construct(SpecRanking, {"spec_slug": "a", "boss_slug": "b"})
+    b = construct(SpecRanking, {"spec_slug": "a", "boss_slug": "b"})
+
+    a.reports.append(construct(Report, {"report_id": "x"}))
+    assert b.reports == []
+    assert a.model_fields_set == {"spec_slug", "boss_slug"}
+
+
+def test__construct__typed_dicts() -> None:
+    data = {"boss_slug": "boss", "reports": [{"report_id": "abc", "fights": [{"fight_id": 1, "start_time": "2024-01-01T20:00:00", "composition": {"roles": {"tank": 2}, "specs": {}, "classes": {}}}]}]}
+    assert construct(CompRanking, data).model_dump_json() == CompRanking(**data).model_dump_json()
+
+
+def test__construct__restores_gc() -> None:
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda _: construct(SpecRanking, SPEC_RANKING), range(20)))
+    assert gc.isenabled()
+
+    gc.disable()
+    try:
+        construct(SpecRanking, SPEC_RANKING)
+        assert not gc.isenabled()  # left as it was
+    finally:
+        gc.enable()
@@ -0,0 +1,114 @@
+# IMPORT STANDARD LIBRARIES
+import typing
+import unittest
+from unittest import mock
+
+# IMPORT LOCAL LIBRARIES
+from lorgs.models.base import DynamoDBModel, SecondaryIndex, dynamodb
+
+
+class Item(DynamoDBModel):
+    item_id: str
+    tag: str = ""
+    group: str = ""
+
+    pkey: typing.ClassVar[str] = "{item_id}"
+    indexes: typing.ClassVar[tuple[SecondaryIndex, ...]] = (SecondaryIndex(name="tag-index", pkey="tag"),)
+
+
+class FakeTable:
+    """Returns the given pages, one after another, and records each request."""
+
+    def __init__(self, *pages: list[dict]) -> None:
+        self.pages = list(pages)
+        self.requests: list[tuple[str, dict]] = []
+
+    def _run(self, operation: str, **kwargs) -> dict:
+        self.requests.append((operation, kwargs))
+        page = len(self.requests) - 1
+        response: dict[str, typing.Any] = {"Items": self.pages[page]}
+        if page + 1 < len(self.pages):
+            response["LastEvaluatedKey"] = {"pk": str(page)}
+        return response
+
+    def query(self, **kwargs) -> dict:
+        return self._run("query", **kwargs)
+
+    def scan(self, **kwargs) -> dict:
+        return self._run("scan", **kwargs)
+
+
+class TestDynamoDBModel(unittest.TestCase):
+    def use_table(self, *pages: list[dict]) -> FakeTable:
+        table = FakeTable(*pages)
+        patch = mock.patch.object(Item, "get_table", return_value=table)
+        patch.start()
+        self.addCleanup(patch.stop)
+        return table
+
+    def test__first__uses_index(self):
+        table = self.use_table([{"item_id": "a", "tag": "x", "group": "g"}])
+
+        item = Item.first(tag="x", group="g")
+
+        assert item and item.item_id == "a"
+        operation, request = table.requests[0]
+        assert operation == "query"
+        assert request["IndexName"] == "tag-index"
+        assert "FilterExpression" in request  # "group" is not part of the index
+
+    def test__first__scans_without_index(self):
+        # the match is only on the second page
+        table = self.use_table([], [{"item_id": "b", "group": "g"}])
+
+        with self.assertLogs("Lorgs", level="WARNING"):
+            item = Item.first(group="g")
+
+        assert item and item.item_id == "b"
+        assert [operation for operation, _ in table.requests] == ["scan", "scan"]
+        assert table.requests[1][1]["ExclusiveStartKey"] == {"pk": "0"}
+
+    def test__query__all_pages(self):
+        self.use_table([{"item_id": "a", "tag": "x"}], [{"item_id": "b", "tag": "x"}])
+        assert [item.item_id for item in Item.query(tag="x")] == ["a", "b"]
+
+    def test__first__no_match(self):
+        self.use_table([])
+        assert Item.first(tag="x") is None
+
+    def test__first__requires_arguments(self):
+        with self.assertRaises(ValueError):
+            Item.first()
+
+    def test__indexes__not_a_field(self):
+        from lorgs.models.task import Task  # inherits `indexes`, without importing `SecondaryIndex`
+
+        assert "indexes" not in Task.model_fields
+        assert Task.__pydantic_complete__
+
+    def test__get_many__retries_unprocessed_keys(self):
+        responses = [
+            {
+                "Responses": {"item": [{"pk": "b", "item_id": "b"}]},
+                "UnprocessedKeys": {"item": {"Keys": [{"pk": "a"}]}},
+            },
+            {"Responses": {"item": [{"pk": "a", "item_id": "a"}]}},
+        ]
+        with mock.patch.object(dynamodb, "dynamodb") as resource, mock.patch.object(dynamodb.time, "sleep"):
+            resource.batch_get_item.side_effect = responses
+            items = Item.get_many([{"item_id": "a"}, {"item_id": "missing"}, {"item_id": "b"}, {"item_id": "a"}])
+
+        assert [item.item_id if item else None for item in items] == ["a", None, "b", "a"]
+        first_request = resource.batch_get_item.call_args_list[0].kwargs["RequestItems"]
+        assert first_request == {"item": {"Keys": [{"pk": "a"}, {"pk": "missing"}, {"pk": "b"}]}}  # no duplicates
+        assert resource.batch_get_item.call_args_list[1].kwargs["RequestItems"] == {"item": {"Keys": [{"pk": "a"}]}}
+
+    def test__save_many(self):
+        table = mock.MagicMock()
+        with mock.patch.object(Item, "get_table", return_value=table):
+            Item.save_many([Item(item_id="a", tag="x"), Item(item_id="b")])
+
+        table.batch_writer.assert_called_once_with(overwrite_by_pkeys=["pk"])
+        batch = table.batch_writer.return_value.__enter__.return_value
+        items = [call.kwargs["Item"] for call in batch.put_item.call_args_list]
+        assert items == [{"item_id": "a", "tag": "x", "pk": "a"}, {"item_id": "b", "pk": "b"}]
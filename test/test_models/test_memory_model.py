@@ -0,0 +1,75 @@
+import gc
+
+from lorgs.models import base
+from lorgs.models.wow_spell import WowSpell
+
+
+class Item(base.MemoryModel):
+    index_keys = ("item_id",)
+
+    item_id: int
+    name: str = ""
+
+
+def test__get__by_index() -> None:
+    item = Item(item_id=1, name="a")
+    assert Item.get(item_id=1) is item
+    assert Item.get(item_id=2) is None
+
+
+def test__get__by_index_and_other_attributes() -> None:
+    item_a = Item(item_id=3, name="a")
+    item_b = Item(item_id=3, name="b")
+
+    assert Item.get(item_id=3, name="a") is item_a
+    assert Item.get(item_id=3, name="b") is item_b
+    assert Item.get(item_id=3, name="c") is None
+
+
+def test__get__new_instances_are_indexed() -> None:
+    Item.get(item_id=4)  # build the index
+    item = Item(item_id=4)
+    assert Item.get(item_id=4) is item
+
+
+def test__get__index_updated_after_mutation() -> None:
+    item = Item(item_id=5)
+    assert Item.get(item_id=5) is item
+
+    item.item_id = 6
+    assert Item.get(item_id=5) is None
+    assert Item.get(item_id=6) is item
+
+
+def test__get__released_instances() -> None:
+    Item(item_id=7)
+    gc.collect()
+    assert Item.get(item_id=7) is None
+
+
+def test__get__spell_by_id() -> None:
+    spell = WowSpell(spell_id=99001)
+    assert WowSpell.get(spell_id=99001) is spell
+    assert WowSpell.get(spell_id=99001, event_type="cast") is spell
+    assert WowSpell.get(spell_id=99001, event_type="applybuff") is None
+
+
+def test__get__most_recent_instance() -> None:
+    items = [Item(item_id=8, name=name) for name in "abc"]
+    assert Item.get(item_id=8) is items[-1]
+    assert Item.get(name="c") is items[-1]
+
+    items[-1].item_id = 9  # moved to another index value
+    assert Item.get(item_id=8) is items[1]
+
+    items[-1].item_id = 8  # still newer than the others
+    assert Item.get(item_id=8) is items[-1]
+
+
+def test__get__index_kept_after_mutation() -> None:
+    item = Item(item_id=10)
+    index = Item.get_index("item_id")
+
+    item.name = "b"
+    assert Item.get_index("item_id") is index
+    assert Item.get(item_id=10) is item
@@ -0,0 +1,84 @@
+import io
+import json
+import unittest
+from unittest import mock
+
+from botocore.exceptions import ClientError
+
+from lorgs.models.base import s3
+from lorgs.models.base.s3_cache import S3Cache
+from lorgs.models.warcraftlogs_ranking import SpecRanking
+
+
+KWARGS = {"spec_slug": "paladin-holy", "boss_slug": "boss", "difficulty": "mythic", "metric": "hps"}
+
+
+def get_object_response(content: dict, etag="etag1") -> dict:
+    return {"Body": io.BytesIO(json.dumps(content).encode()), "ETag": etag}
+
+
+def not_modified() -> ClientError:
+    return ClientError({"Error": {"Code": "304"}, "ResponseMetadata": {"HTTPStatusCode": 304}}, "GetObject")
+
+
+class TestS3Cache(unittest.TestCase):
+
+    def test__lru_eviction(self):
+        cache = S3Cache(max_size=10)
+        cache.set("a", "A", etag="", size=4)
+        cache.set("b", "B", etag="", size=4)
+        cache.get("a")  # "b" is now the least recently used
+        cache.set("c", "C", etag="", size=4)
+
+        assert cache.get("b") is None
+        assert cache.get("a").obj == "A"
+        assert cache.size == 8
+
+    def test__too_large(self):
+        cache = S3Cache(max_size=10)
+        cache.set("a", "A", etag="", size=11)
+        assert len(cache) == 0
+
+
+class TestGetCached(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.cache = S3Cache(ttl=60)
+        self.cache_patch = mock.patch.object(s3, "s3cache", self.cache)
+        self.cache_patch.start()
+
+        self.client_patch = mock.patch.object(s3, "s3client")
+        self.client = self.client_patch.start()
+        self.client.get_object.return_value = get_object_response(KWARGS)
+
+    def tearDown(self) -> None:
+        self.cache_patch.stop()
+        self.client_patch.stop()
+
+    def test__fresh(self):
+        ranking = SpecRanking.get_cached(**KWARGS)
+        assert ranking and ranking.spec_slug == "paladin-holy"
+        assert SpecRanking.get_cached(**KWARGS) is ranking
+        assert self.client.get_object.call_count == 1
+
+    def test__revalidate_unchanged(self):
+        ranking = SpecRanking.get_cached(**KWARGS)
+        self.cache.ttl = 0
+
+        self.client.get_object.side_effect = not_modified()
+        assert SpecRanking.get_cached(**KWARGS) is ranking
+        assert self.client.get_object.call_args.kwargs["IfNoneMatch"] == "etag1"
+        assert self.cache.metrics()["revalidated"] == 1
+
+    def test__revalidate_changed(self):
+        ranking = SpecRanking.get_cached(**KWARGS)
+        self.cache.ttl = 0
+
+        self.client.get_object.return_value = get_object_response({**KWARGS, "dirty": True}, etag="etag2")
+        new_ranking = SpecRanking.get_cached(**KWARGS)
+        assert new_ranking is not ranking
+        assert new_ranking and new_ranking.dirty
+
+    def test__missing(self):
+        self.client.get_object.side_effect = ClientError({"Error": {"Code": "NoSuchKey"}}, "GetObject")
+        assert SpecRanking.get_cached(**KWARGS) is None
@@ -0,0 +1,47 @@
+import io
+import json
+import unittest
+from unittest import mock
+
+from botocore.exceptions import ClientError
+
+from lorgs.models.base import s3
+from lorgs.models.warcraftlogs_ranking import SpecRanking
+
+
+class TestS3Model(unittest.TestCase):
+    def setUp(self) -> None:
+        patch = mock.patch.object(s3, "s3client")
+        self.client = patch.start()
+        self.addCleanup(patch.stop)
+
+    def test__get_many(self):
+        def get_object(Bucket, Key):
+            if "missing" in Key:
+                raise ClientError({"Error": {"Code": "NoSuchKey"}}, "GetObject")
+            spec_slug = Key.split("/")[1]
+            return {"Body": io.BytesIO(json.dumps({"spec_slug": spec_slug, "boss_slug": "boss"}).encode())}
+
+        self.client.get_object.side_effect = get_object
+
+        keys = [{"spec_slug": spec_slug, "boss_slug": "boss", "difficulty": "mythic", "metric": "dps"} for spec_slug in ("a", "missing", "b")]
+        rankings = SpecRanking.get_many(keys)
+
+        assert [ranking.spec_slug if ranking is not None else None for ranking in rankings] == ["a", None, "b"]
+
+    def test__save_many(self):
+        rankings = [SpecRanking(spec_slug=spec_slug, boss_slug="boss") for spec_slug in ("a", "b", "c")]
+
+        with mock.patch.dict("os.environ", {"AWS_ACCESS_KEY_ID": "x"}):
+            SpecRanking.save_many(rankings)
+
+        keys = sorted(call.kwargs["Key"] for call in self.client.put_object.call_args_list)
+        assert keys == [f"spec_ranking/{spec_slug}/boss__mythic__rdps" for spec_slug in ("a", "b", "c")]
+
+    def test__save_many__raises_errors(self):
+        self.client.put_object.side_effect = [None, ValueError("failed")]
+        rankings = [SpecRanking(spec_slug=spec_slug, boss_slug="boss") for spec_slug in ("a", "b")]
+
+        with mock.patch.dict("os.environ", {"AWS_ACCESS_KEY_ID": "x"}), self.assertRaises(ValueError):
+            SpecRanking.save_many(rankings)
+        assert self.client.put_object.call_count == 2
@@ -1,3 +1,4 @@
+import asyncio
 import sys
 import unittest
 from unittest import mock
@@ -14,7 +15,7 @@ from test import helpers
 
 # Test Classes
 # todo: move somewhere else or mock away
-MOCK_ROLE = wow_role.WowRole(id=4, name="Test", code="test")
+MOCK_ROLE = wow_role.WowRole(id=4, name="Test", code="test")
 MOCK_CLASS = wow_class.WowClass(id=4, name="Test")
 MOCK_SPEC = wow_spec.WowSpec(name="TestSpec", wow_class=MOCK_CLASS, role=MOCK_ROLE)
 
@@ -88,5 +89,33 @@ class TestBaseActorProcess(unittest.TestCase):
         assert not self.actor.casts
 
 
+class TestBaseActorPagination(unittest.TestCase):
+    """Test loading events spread over multiple pages."""
+
+    @mock.patch.multiple(BaseActor, __abstractmethods__=set())
+    def setUp(self):
+        self.actor = BaseActor(source_id=10)
+
+    def test__load_events__follows_next_page(self):
+        pages = {
+            0: {"data": [{"timestamp": 100, "sourceID": 10, "abilityGameID": 101}], "nextPageTimestamp": 500},
+            500: {"data": [{"timestamp": 600, "sourceID": 10, "abilityGameID": 102}]},
+        }
+
+        def get_query(start_time=None):
+            return str(start_time or 0)
+
+        async def query(query, **kwargs):
+            return helpers.wrap_data(pages[int(query)], "reportData", "report", "events")
+
+        client = mock.MagicMock()
+        client.query = query
+        with mock.patch.object(BaseActor, "get_query", side_effect=get_query), \
+             mock.patch.object(BaseActor, "client", client):
+            asyncio.run(self.actor.load_events())
+
+        assert [cast.spell_id for cast in self.actor.casts] == [101, 102]
+
+
 if __name__ == "__main__":
     pytest.main(sys.argv)
@@ -1,10 +1,18 @@
+import random
 import sys
 import unittest
 from unittest import mock
 
 import pytest
 
-from lorgs.models.warcraftlogs_cast import Cast, process_auras, process_until_events
+from lorgs.models.warcraftlogs_cast import (
+    Cast,
+    decode_cast_columns,
+    encode_cast_columns,
+    process_auras,
+    process_until_events,
+    use_cast_columns,
+)
 from lorgs.models.wow_spell import WowSpell
 
 
@@ -177,5 +185,112 @@ class Test_Cast(unittest.TestCase):
         assert result == expected
 
 
+def process_until_events_reference(casts: list[Cast]) -> list[Cast]:
+    """The original O(n²) implementation, to compare against."""
+    for cast in casts:
+        spell = cast.spell
+        if not (spell and spell.until):
+            continue
+
+        end_events = [e for e in casts if (e.timestamp > cast.timestamp) and (e.spell_id == spell.until.spell_id)]
+        if not end_events:
+            continue
+
+        end_event = end_events[0]
+        end_event.spell_id = -1
+        cast.duration = end_event.timestamp - cast.timestamp
+
+    return [c for c in casts if c.spell_id > 0]
+
+
+class Test_ProcessUntilEventsProperty(unittest.TestCase):
+    """Compare `process_until_events` against the reference on random casts."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # 9100x: ended by 9200x, 9300: ended by itself, 9400: no until-event
+        cls.spells = [
+            WowSpell(spell_id=91001, until=WowSpell(spell_id=92001)),
+            WowSpell(spell_id=91002, until=WowSpell(spell_id=92001)),
+            WowSpell(spell_id=91003, until=WowSpell(spell_id=92003)),
+            WowSpell(spell_id=93000, until=WowSpell(spell_id=93000)),
+            WowSpell(spell_id=94000),
+        ]
+
+    def make_casts(self, rng: random.Random, n: int, is_sorted: bool) -> list[Cast]:
+        spell_ids = [91001, 91002, 91003, 92001, 92003, 93000, 94000]
+        timestamps = [rng.randint(0, n * 10) for _ in range(n)]
+        if is_sorted:
+            timestamps.sort()
+        return [Cast(spell_id=rng.choice(spell_ids), timestamp=ts) for ts in timestamps]
+
+    def check(self, casts: list[Cast]) -> None:
+        expected = process_until_events_reference([cast.model_copy() for cast in casts])
+        result = process_until_events([cast.model_copy() for cast in casts])
+        assert [(c.spell_id, c.timestamp, c.duration) for c in result] == [
+            (c.spell_id, c.timestamp, c.duration) for c in expected
+        ]
+
+    def test__sorted(self) -> None:
+        rng = random.Random(1)
+        for _ in range(200):
+            self.check(self.make_casts(rng, rng.randint(0, 60), is_sorted=True))
+
+    def test__unsorted(self) -> None:
+        rng = random.Random(2)
+        for _ in range(100):
+            self.check(self.make_casts(rng, rng.randint(0, 30), is_sorted=False))
+
+
 if __name__ == "__main__":
     pytest.main(sys.argv)
+
+
+class Test_CastColumns(unittest.TestCase):
+    """Test the columnar encoding of casts."""
+
+    def test__roundtrip(self) -> None:
+        casts = [
+            Cast(spell_id=10, timestamp=100, counter=1),
+            Cast(spell_id=20, timestamp=150, duration=5000, counter=1),
+            Cast(spell_id=10, timestamp=400, counter=2),
+        ]
+        dumped = [cast.model_dump() for cast in casts]
+
+        columns = encode_cast_columns(dumped)
+        assert columns == {
+            "encoding": "columns",
+            "spell_id": [10, 20, 10],
+            "ts": [100, 50, 250],
+            "d": [0, 5000, 0],
+            "c": [],
+        }
+        assert decode_cast_columns(columns) == dumped
+
+    def test__without_counters(self) -> None:
+        dumped = [{"spell_id": 10, "ts": 100}, {"spell_id": 10, "ts": 200}]
+
+        columns = encode_cast_columns(dumped)
+        assert "c" not in columns
+        assert decode_cast_columns(columns) == dumped
+
+    def test__keeps_counters_which_cant_be_derived(self) -> None:
+        dumped = [{"spell_id": 10, "ts": 100, "c": 1}, {"spell_id": 10, "ts": 200, "c": 1}]
+
+        columns = encode_cast_columns(dumped)
+        assert columns["c"] == [1, 1]
+        assert decode_cast_columns(columns) == dumped
+
+    def test__full_field_names(self) -> None:
+        dumped = [{"spell_id": 10, "timestamp": 100, "duration": 20, "counter": 1}]
+
+        columns = encode_cast_columns(dumped)
+        assert columns["timestamp"] == [100]
+        assert decode_cast_columns(columns) == dumped
+
+    def test__use_cast_columns(self) -> None:
+        data = {"fights": [{"players": [{"casts": [{"spell_id": 1, "ts": 5, "c": 1}]}], "phases": []}]}
+
+        result = use_cast_columns(data)
+        assert result["fights"][0]["players"][0]["casts"] == {"encoding": "columns", "spell_id": [1], "ts": [5], "c": []}
+        assert result["fights"][0]["phases"] == []
@@ -0,0 +1,97 @@
+# IMPORT STANDARD LIBRARIES
+import random
+import unittest
+
+# IMPORT LOCAL LIBRARIES
+from lorgs.models.warcraftlogs_comp_ranking import CompRanking, CompRankingFight, CompRankingReport, FilterExpression
+
+
+SPECS = {"scholar-scholar": "heal", "white-mage": "heal", "paladin-paladin": "tank", "ninja-ninja": "dps"}
+
+
+def make_fight(rng: random.Random, fight_id: int) -> CompRankingFight:
+    specs: dict[str, int] = {}
+    roles: dict[str, int] = {}
+    for spec, role in SPECS.items():
+        count = rng.randint(0, 2)
+        if count:
+            specs[spec] = count
+            roles[role] = roles.get(role, 0) + count
+
+    composition = {"specs": specs, "roles": roles, "classes": {}}
+    return CompRankingFight(
+        fight_id=fight_id,
+        start_time=0,
+        duration=rng.randint(300, 600) * 1000,
+        composition=composition,  # type: ignore
+    )
+
+
+class TestCompRankingIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = random.Random(1)
+        reports = [
+            CompRankingReport(report_id=f"R{i}", fights=[make_fight(rng, f) for f in range(rng.randint(1, 3))])
+            for i in range(50)
+        ]
+        reports[3].fights[0].composition = None  # not loaded yet
+        self.ranking = CompRanking(boss_slug="boss", reports=reports)
+
+    def filter_slow(self, roles=(), specs=(), killtime_min=0, killtime_max=0):
+        """The same filters, checking each fight on its own."""
+        result = []
+        for report in self.ranking.reports:
+            fights = []
+            for fight in report.fights:
+                if not fight.composition:
+                    continue
+                if killtime_min and fight.duration < killtime_min * 1000:
+                    continue
+                if killtime_max and fight.duration > killtime_max * 1000:
+                    continue
+                if not all(FilterExpression.parse_str(expr).run(fight.composition["specs"]) for expr in specs):
+                    continue
+                if not all(FilterExpression.parse_str(expr).run(fight.composition["roles"]) for expr in roles):
+                    continue
+                fights.append(fight.fight_id)
+            if fights:
+                result.append((report.report_id, fights))
+        return result
+
+    def filter(self, **kwargs):
+        reports = self.ranking.filter_reports(**kwargs)
+        return [(report.report_id, [fight.fight_id for fight in report.fights]) for report in reports]
+
+    def test__filter_reports__same_as_checking_each_fight(self):
+        filters = [
+            {},
+            {"roles": ["heal.eq.2"]},
+            {"roles": ["heal.eq.2"], "specs": ["scholar-scholar.gte.1"]},
+            {"specs": ["ninja-ninja.eq.0", "paladin-paladin.lt.2"]},
+            {"specs": ["unknown-spec.gt.0"]},
+            {"specs": ["unknown-spec.eq.0"], "killtime_min": 400, "killtime_max": 500},
+        ]
+        for kwargs in filters:
+            assert self.filter(**kwargs) == self.filter_slow(**kwargs), kwargs
+
+    def test__filter_reports__pagination(self):
+        expected = self.filter_slow(roles=["heal.gte.1"])
+        assert self.filter(roles=["heal.gte.1"], limit=5) == expected[:5]
+        assert self.filter(roles=["heal.gte.1"], limit=5, offset=5) == expected[5:10]
+        assert self.filter(roles=["heal.gte.1"], limit=0) == []
+        assert self.filter(roles=["heal.gte.1"]) == expected
+
+    def test__filter_reports__returns_copies(self):
+        self.ranking.filter_reports(roles=["heal.eq.0"])
+        assert len(self.ranking.reports[0].fights) > 0
+        assert self.ranking.filter_reports()[0] is not self.ranking.reports[0]
+
+    def test__get_index__rebuilds_outdated_index(self):
+        self.ranking.update_index()
+        self.ranking.reports = self.ranking.reports[:10]
+        num_fights = sum(1 for report in self.ranking.reports for fight in report.fights if fight.composition)
+        assert len(self.ranking.get_index().locations) == num_fights
+
+    def test__filter_reports__invalid_expression(self):
+        with self.assertRaises(ValueError):
+            self.ranking.filter_reports(roles=["heal"])
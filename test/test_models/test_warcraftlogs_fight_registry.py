@@ -0,0 +1,163 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from lorgs.models import warcraftlogs_base
+from lorgs.models.warcraftlogs_fight_registry import FightRegistry
+
+
+class FakeClient:
+    def __init__(self, result):
+        self.result = result
+        self.queries = []
+
+    async def query(self, query, **kwargs):
+        self.queries.append(query)
+        return self.result
+
+
+def make_fight(report_id="abc", fight_id=1):
+    fight = mock.MagicMock()
+    fight.report.report_id = report_id
+    fight.fight_id = fight_id
+    fight.start_time_rel = 0
+    fight.end_time_rel = 1000
+    return fight
+
+
+def make_actor(fight, sub_query):
+    actor = mock.MagicMock()
+    actor.fight = fight
+    actor.get_sub_query.return_value = sub_query
+    return actor
+
+
+class TestFightRegistry(unittest.TestCase):
+
+    def run_with_client(self, client, coro):
+        async def run():
+            token = warcraftlogs_base.set_wcl_client_override(client)
+            try:
+                return await coro
+            finally:
+                warcraftlogs_base.reset_wcl_client_override(token)
+
+        return asyncio.run(run())
+
+    def test__load_actors__single_query_per_fight(self):
+        registry = FightRegistry()
+        fight = make_fight()
+        player_a = make_actor(fight, "source.id=1")
+        player_b = make_actor(fight, "source.id=2")
+
+        client = FakeClient({
+            "reportData": {
+                "report": {
+                    "actor_0": {"data": [{"sourceID": 1}]},
+                    "actor_1": {"data": [{"sourceID": 2}]},
+                }
+            }
+        })
+        errors = self.run_with_client(client, registry.load_actors([player_a, player_b]))
+
+        assert errors == [None, None]
+        assert len(client.queries) == 1
+        assert 'filterExpression: "source.id=1"' in client.queries[0]
+        assert 'filterExpression: "source.id=2"' in client.queries[0]
+        player_a.process_query_result.assert_called_once_with(
+            reportData={"report": {"events": {"data": [{"sourceID": 1}]}}}
+        )
+        player_b.process_query_result.assert_called_once_with(
+            reportData={"report": {"events": {"data": [{"sourceID": 2}]}}}
+        )
+
+    def test__load_actors__reuses_results(self):
+        registry = FightRegistry()
+        client = FakeClient({"reportData": {"report": {"actor_0": {"data": []}}}})
+
+        # same player, but loaded by two different rankings
+        player_a = make_actor(make_fight(), "source.id=1")
+        player_b = make_actor(make_fight(), "source.id=1")
+        self.run_with_client(client, registry.load_actors([player_a]))
+        self.run_with_client(client, registry.load_actors([player_b]))
+
+        assert len(client.queries) == 1
+        assert registry.num_hits == 1
+        player_b.process_query_result.assert_called_once()
+
+    def test__load_actors__one_query_per_fight(self):
+        registry = FightRegistry()
+        client = FakeClient({})
+
+        actors = [make_actor(make_fight(fight_id=1), "a"), make_actor(make_fight(fight_id=2), "a")]
+        self.run_with_client(client, registry.load_actors(actors))
+
+        assert len(client.queries) == 2
+
+    def test__load_fight__summary_once(self):
+        registry = FightRegistry()
+        client = FakeClient({"reportData": {"report": {}}})
+
+        fight_a = make_fight()
+        fight_b = make_fight()
+        self.run_with_client(client, registry.load_fight(fight_a))
+        self.run_with_client(client, registry.load_fight(fight_b))
+
+        assert len(client.queries) == 1
+        fight_a.process_query_result.assert_called_once()
+        fight_b.process_query_result.assert_called_once()
+
+    def test__load_actors__keeps_running_queries(self):
+        registry = FightRegistry()
+        player = make_actor(make_fight(), "source.id=1")
+        client = FakeClient({"reportData": {"report": {"actor_0": {"data": []}}}})
+
+        async def run():
+            pending = asyncio.ensure_future(registry.load_actors([player]))
+            await asyncio.sleep(0)
+            running = set(registry._tasks)
+            await pending
+            return running
+
+        running = self.run_with_client(client, run())
+        assert len(running) == 1
+        assert not registry._tasks  # discarded once done
+
+    def test__load_actors__missing_alias_fails(self):
+        registry = FightRegistry()
+        fight = make_fight()
+        player_a = make_actor(fight, "source.id=1")
+        player_b = make_actor(fight, "source.id=2")
+
+        # the part for player_b failed (GraphQL returns null for it)
+        client = FakeClient({"reportData": {"report": {"actor_0": {"data": []}, "actor_1": None}}})
+        errors = self.run_with_client(client, registry.load_actors([player_a, player_b]))
+
+        assert errors[0] is None
+        assert isinstance(errors[1], ValueError)
+        player_b.process_query_result.assert_not_called()
+        player_b.event_actor_load.send.assert_called_with(player_b, status="failed")
+        assert len(registry.events) == 1  # player_b can be retried
+
+    def test__load_actors__cancelled_query(self):
+        registry = FightRegistry()
+        player = make_actor(make_fight(), "source.id=1")
+
+        class SlowClient(FakeClient):
+            async def query(self, query, **kwargs):
+                await asyncio.sleep(10)
+
+        async def run():
+            pending = asyncio.ensure_future(registry.load_actors([player]))
+            await asyncio.sleep(0)
+            for task in registry._tasks:
+                task.cancel()
+            return await asyncio.wait_for(pending, timeout=1)
+
+        errors = self.run_with_client(SlowClient({}), run())
+        assert isinstance(errors[0], asyncio.CancelledError)
+        assert not registry.events
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,17 @@
 # IMPORT STANDARD LIBRARIES
+import asyncio
+import re
 import unittest
 from unittest import mock
 
 
 # IMPORT LOCAL LIBRARIES
+from lorgs.models.warcraftlogs_cast import Cast
+from lorgs.models.warcraftlogs_fight import Fight
+from lorgs.models.warcraftlogs_player import Player
+from lorgs.models import warcraftlogs_ranking
 from lorgs.models.warcraftlogs_ranking import SpecRanking
+from lorgs.models.warcraftlogs_report import Report
 from ..helpers import load_fixture
 
 
@@ -101,3 +108,77 @@ class TestSpecRanking(unittest.TestCase):
 
         # Global limit is 20 (was 5)
         assert len(self.spec_ranking.reports) == 10
+
+    def test__process_query_results__prune_old(self):
+        def ranking_data(name, code, fight_id, amount):
+            return {
+                "name": name,
+                "class": "ClassName",
+                "spec": "SpecName",
+                "amount": amount,
+                "duration": 5432,
+                "startTime": 1634544096374,
+                "report": {"code": code, "fightID": fight_id, "startTime": 1634543354962},
+            }
+
+        def old_report(name, code, fight_id):
+            player = Player(name=name, spec_slug="test_spec", total=100, casts=[Cast(spell_id=1, timestamp=10)])
+            return Report(report_id=code, fights=[Fight(fight_id=fight_id, start_time=0, players=[player])])
+
+        self.spec_ranking.reports = [old_report("Kept", "KEPT", 1), old_report("Dropped", "DROPPED", 2)]
+
+        data = {
+            "worldData": {
+                "encounter": {
+                    "p1": {"rankings": [ranking_data("Kept", "KEPT", 1, 100), ranking_data("New", "NEW", 3, 200)]}
+                }
+            }
+        }
+        self.spec_ranking.process_query_results(data, prune_old=True)
+
+        reports = {report.report_id: report for report in self.spec_ranking.reports}
+        assert sorted(reports) == ["KEPT", "NEW"]
+        # existing fights keep their casts
+        assert reports["KEPT"].fights[0].players[0].casts[0].spell_id == 1
+        assert reports["NEW"].fights[0].players[0].casts == []
+
+    def test__load_rankings__skips_old_partitions(self):
+        def ranking_data(code, amount, region="EU"):
+            return {
+                "name": code,
+                "class": "ClassName",
+                "spec": "SpecName",
+                "amount": amount,
+                "duration": 5432,
+                "startTime": 1634544096374,
+                "server": {"region": region},
+                "report": {"code": code, "fightID": 1, "startTime": 1634543354962},
+            }
+
+        partitions = {
+            10: [],  # upcoming patch
+            9: [ranking_data("A", 100), ranking_data("CN", 99, region="CN")],
+            8: [ranking_data("B", 90)],
+            5: [ranking_data("OLD", 95)],
+        }
+        loaded: list[list[int]] = []
+
+        async def query(query, **kwargs):
+            requested = [int(p) for p in re.findall(r"p(\d+):", query)]
+            loaded.append(requested)
+            encounter = {f"p{p}": {"rankings": partitions.get(p, [])} for p in requested}
+            return {"worldData": {"encounter": encounter}}
+
+        client = mock.MagicMock(query=query)
+        with (
+            mock.patch.object(SpecRanking, "client", new_callable=mock.PropertyMock, return_value=client),
+            mock.patch.dict(warcraftlogs_ranking.RANKING_REGION_LIMITS, {"global": 2}),
+        ):
+            asyncio.run(self.spec_ranking.load_rankings(prune_old=True))
+            assert loaded == [[10], [9, 8]]  # quota filled
+            assert [report.report_id for report in self.spec_ranking.reports] == ["A", "B", "CN"]
+
+            loaded.clear()
+            asyncio.run(self.spec_ranking.load_rankings(regions=["CN"]))
+            assert loaded == [[10], [9, 8], [7, 6, 5], [4, 3, 2, 1]]  # cn quota never filled
+
@@ -1,9 +1,16 @@
 # IMPORT STANDARD LIBRARIES
+import datetime
 import unittest
 from unittest import mock
 
+# IMPORT THIRD PARTY LIBRARIES
+from boto3.dynamodb.conditions import Key
 
 # IMPORT LOCAL LIBRARIES
+from lorgs.models.warcraftlogs_boss import Boss
+from lorgs.models.warcraftlogs_cast import Cast
+from lorgs.models.warcraftlogs_fight import Fight
+from lorgs.models.warcraftlogs_player import Player
 from lorgs.models.warcraftlogs_user_report import UserReport
 
 
@@ -31,3 +38,102 @@ class TestUserReport(unittest.TestCase):
             self.user_report.save()
 
         assert self.user_report.updated != prev_value
+
+
+class TestUserReportRows(unittest.TestCase):
+    """Saving/Loading each fight and player as its own row."""
+
+    def setUp(self):
+        self.table = mock.MagicMock()
+        patch = mock.patch.object(UserReport, "get_table", return_value=self.table)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+        self.user_report = UserReport(
+            report_id="A",
+            fights=[
+                Fight(
+                    fight_id=4,
+                    start_time=datetime.datetime(2024, 1, 1),
+                    boss=Boss(boss_slug="vamp-fatale", casts=[Cast(spell_id=1, timestamp=5)]),
+                    players=[
+                        Player(source_id=1, name="a", casts=[Cast(spell_id=2, timestamp=10)]),
+                        Player(source_id=12, name="b"),
+                    ],
+                ),
+                Fight(fight_id=5, start_time=datetime.datetime(2024, 1, 1)),  # not loaded
+            ],
+        )
+
+    def save(self, **kwargs) -> list[dict]:
+        self.user_report.save(**kwargs)
+        batch = self.table.batch_writer.return_value.__enter__.return_value
+        return [call.kwargs["Item"] for call in batch.put_item.call_args_list]
+
+    def test__save__rows(self):
+        items = self.save(fight_ids=[4], player_ids=[1, 12])
+
+        assert [(item["pk"], item["sk"]) for item in items] == [
+            ("A", "overview"),
+            ("A", "fight#0004"),
+            ("A", "fight#0004#player#0001"),
+            ("A", "fight#0004#player#0012"),  # no casts, but loaded
+        ]
+
+        overview, fight = items[0], items[1]
+        assert [f["fight_id"] for f in overview["fights"]] == [4, 5]
+        assert "players" not in overview["fights"][0]
+        assert "casts" not in overview["fights"][0]["boss"]
+        assert "players" not in fight
+        assert fight["boss"]["casts"]
+        assert all(item["ttl"] == self.user_report.ttl for item in items[1:])
+
+    def test__save__only_given_players(self):
+        # player 1 was not loaded by this task (eg.: reset by reloading the summary)
+        self.user_report.fights[0].players[0].casts = []
+        items = self.save(fight_ids=[4], player_ids=[12])
+
+        assert [item["sk"] for item in items] == ["overview", "fight#0004", "fight#0004#player#0012"]
+
+    def test__save__overview_only(self):
+        self.user_report.fights[0].players[0].casts = []
+        items = self.save()
+
+        assert [item["sk"] for item in items] == ["overview"]
+
+    def test__save__splits_old_overview(self):
+        # fights with players (and casts) in the overview get their rows, even if not loaded now
+        items = self.save(fight_ids=[5])
+
+        assert [item["sk"] for item in items] == [
+            "overview",
+            "fight#0004",
+            "fight#0004#player#0001",
+            "fight#0004#player#0012",
+            "fight#0005",
+        ]
+
+    def test__get_fights__reads_rows(self):
+        self.user_report.fights[1].players = [Player(source_id=3, name="c")]
+        items = self.save(fight_ids=[4, 5], player_ids=[1, 3, 12])
+        user_report = UserReport(**items[0])
+        assert not user_report.get_fight(4).players
+
+        self.table.query.return_value = {"Items": items[1:]}
+        fights = user_report.get_fights(4, player_ids=[12])
+
+        self.table.query.assert_called_once()  # all fights at once
+        request = self.table.query.call_args.kwargs
+        assert request["KeyConditionExpression"] == Key("pk").eq("A") & Key("sk").begins_with("fight#")
+        assert [fight.fight_id for fight in fights] == [4]
+        assert [player.name for player in fights[0].players] == ["b"]
+        assert fights[0].boss and fights[0].boss.casts
+        assert user_report.get_fight(4) is fights[0]
+
+    def test__get_fights__without_rows(self):
+        # fights stored in the overview (not loaded, or saved before the fights got their own rows)
+        self.table.query.return_value = {"Items": []}
+        fights = self.user_report.get_fights(4, 5)
+
+        assert [fight.fight_id for fight in fights] == [4, 5]
+        assert len(fights[0].players) == 2
@@ -37,5 +37,28 @@ def test_all_spells_from_actor_and_parent():
     assert actor.all_spells == [SPELL_10, SPELL_20]
 
 
+def test_get_spell_query_cached() -> None:
+    actor = WowActor()
+    actor.add_spell(SPELL_10)
+
+    query = actor.get_spell_query("all_spells")
+    assert query == "(type='cast' and ability.id in (10))"
+    assert actor.get_spell_query("all_spells") is query
+
+
+def test_get_spell_query_invalidated() -> None:
+    parent = WowActor()
+    actor = WowActor()
+    actor.parents.append(parent)
+    actor.add_spell(SPELL_10)
+    assert actor.get_spell_query("all_spells") == "(type='cast' and ability.id in (10))"
+
+    parent.add_spell(SPELL_20)
+    assert actor.get_spell_query("all_spells") == "(type='cast' and ability.id in (10,20))"
+
+    actor.add_buff(spell_id=30)
+    assert actor.get_spell_query("all_buffs") == "(type='applybuff' and ability.id in (30)) or (type='removebuff' and ability.id in (30))"
+
+
 if __name__ == "__main__":
     pytest.main(sys.argv)
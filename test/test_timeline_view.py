@@ -0,0 +1,97 @@
+import gc
+import json
+import os
+
+import pytest
+
+from lorgs.boss_timeline import BossTimelineEvent
+from lorgs.models.raid_boss import RaidBoss
+from lorrgs_api import timeline_view
+
+
+SPELLS = [
+    {"spell_id": 1, "name": "Cast", "display_slot": ""},
+    {"spell_id": 2, "name": "Upgrade", "display_slot": "slot:a"},
+    {"spell_id": 3, "name": "Base", "display_slot": "slot:a"},
+    {"spell_id": 4, "name": "Never Cast", "display_slot": ""},
+]
+
+RANKING = {
+    "reports": [
+        {
+            "report_id": "A",
+            "region": "NA",
+            "fights": [
+                {
+                    "players": [
+                        {"spec_slug": "dancer-dancer", "casts": [{"spell_id": 1, "ts": 0}, {"spell_id": 3, "ts": 1}]},
+                        {"spec_slug": "bard-bard", "casts": [{"spell_id": 7, "ts": 0}]},
+                    ]
+                }
+            ],
+        },
+        {"report_id": "B", "region": "EU", "fights": []},
+    ]
+}
+
+
+@pytest.fixture
+def boss():
+    """Registers the boss used by the views, only for the test."""
+    boss = RaidBoss(id=99099, name="Vamp Fatale")
+    object.__setattr__(boss, "boss_timeline", [BossTimelineEvent(id="m9s-killer-voice-1", name="Killer Voice", time=5)])
+    yield boss
+
+    del boss
+    gc.collect()
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch, boss):
+    monkeypatch.setattr(timeline_view, "DATA_DIRECTORY", str(tmp_path))
+    timeline_view.view_cache.clear()
+
+    (tmp_path / "spec_ranking_dancer-dancer_vamp-fatale.json").write_text(json.dumps(RANKING))
+    (tmp_path / "spells_dancer-dancer.json").write_text(json.dumps(SPELLS))
+    yield tmp_path
+    timeline_view.view_cache.clear()
+
+
+def test__filter_spells() -> None:
+    spells = timeline_view.filter_spells(SPELLS, {1, 3})
+    assert [spell["spell_id"] for spell in spells] == [1, 2, 3]
+
+
+def test__load_timeline_view(data_dir) -> None:
+    view = timeline_view.load_timeline_view("dancer-dancer", "vamp-fatale", "NA")
+    assert view
+    content = json.loads(view.content)
+
+    assert [report["report_id"] for report in content["ranking"]["reports"]] == ["A"]
+    assert [spell["spell_id"] for spell in content["spells"]["dancer-dancer"]] == [1, 2, 3]
+    assert content["spells"]["bard-bard"] == []  # no spells file
+    assert content["boss"]["timeline"][0]["id"] == "m9s-killer-voice-1"
+
+
+def test__load_timeline_view__cache(data_dir) -> None:
+    view = timeline_view.load_timeline_view("dancer-dancer", "vamp-fatale")
+    assert timeline_view.load_timeline_view("dancer-dancer", "vamp-fatale") is view
+
+    # any change to the files used rebuilds the view
+    spells_path = data_dir / "spells_dancer-dancer.json"
+    stat = os.stat(spells_path)
+    os.utime(spells_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert timeline_view.load_timeline_view("dancer-dancer", "vamp-fatale") is not view
+
+
+def test__load_timeline_view__missing(data_dir) -> None:
+    assert timeline_view.load_timeline_view("bard-bard", "vamp-fatale") is None
+
+
+def test__load_timeline_view__cast_columns(data_dir) -> None:
+    view = timeline_view.load_timeline_view("dancer-dancer", "vamp-fatale", cast_columns=True)
+    assert view
+    assert view is not timeline_view.load_timeline_view("dancer-dancer", "vamp-fatale")
+
+    player = json.loads(view.content)["ranking"]["reports"][0]["fights"][0]["players"][0]
+    assert player["casts"] == {"encoding": "columns", "spell_id": [1, 3], "ts": [0, 1]}
@@ -19,6 +19,7 @@ if not os.getenv("WCL_CLIENT_ID") or not os.getenv("WCL_CLIENT_SECRET"):
 sys.path.append(os.getcwd())
 
 # --- 2. 导入业务模块 ---
+from lorgs.boss_timeline import get_boss_timeline
 from lorgs.logger import logger
 from lorgs.models.wow_spell import SpellTag, SpellType 
 
@@ -36,12 +37,6 @@ except ImportError as e:
     sys.exit(1)
 
 
-BOSS_TIMELINE_COLORS = {
-    "mech": "#facc15",
-    "tb": "#60a5fa",
-    "aoe": "#fb923c",
-}
-
 BOSS_TIMELINE_FILENAME_MAP = {
     "vamp-fatale": "m9s",
     "red-hot-and-deep-blue": "m10s",
@@ -83,48 +78,6 @@ def get_spell_category(spell):
     # 包括 SpellTag.DAMAGE
     return "MAJOR"
 
-def parse_time(time_str):
-    if isinstance(time_str, (int, float)): return time_str
-    if not time_str: return 0
-    try:
-        if ":" in time_str:
-            m, s = time_str.split(":")
-            return int(m) * 60 + int(s)
-        return int(time_str)
-    except:
-        return 0
-
-
-def get_boss_timeline_type_from_tags(tags):
-    tags = tags or []
-    if SpellTag.TANK_MIT in tags or SpellTag.SINGLE_MIT in tags:
-        return "tb"
-    if SpellTag.RAID_MIT in tags or SpellTag.RAID_CD in tags:
-        return "aoe"
-    return "mech"
-
-
-def serialize_boss_timeline_event(event):
-    item = event.as_dict()
-    item["type"] = item.get("type") or "mech"
-    item["color"] = item.get("color") or BOSS_TIMELINE_COLORS.get(item["type"], BOSS_TIMELINE_COLORS["mech"])
-    return item
-
-
-def serialize_boss_cast(cast):
-    event_type = get_boss_timeline_type_from_tags(getattr(cast, "tags", []))
-    return {
-        "id": cast.spell_id,
-        "name": cast.name,
-        "time": parse_time(getattr(cast, "time", 0)),
-        "duration": getattr(cast, "duration", 0),
-        "color": getattr(cast, "color", "") or BOSS_TIMELINE_COLORS.get(event_type, BOSS_TIMELINE_COLORS["mech"]),
-        "icon": getattr(cast, "icon", ""),
-        "type": event_type,
-        "name_i18n": getattr(cast, "name_i18n", {}),
-    }
-
-
 def get_bosses_for_timeline_generation():
     return [
         *ARCADION_HEAVYWEIGHT.bosses,
@@ -200,12 +153,7 @@ def generate_boss_spells():
         short_name = BOSS_TIMELINE_FILENAME_MAP.get(boss.full_name_slug, boss.full_name_slug.replace("-", "_"))
         filename = f"front_end/data/{short_name}.json"
 
-        boss_timeline = getattr(boss, "boss_timeline", None)
-        mechanics_data = (
-            [serialize_boss_timeline_event(event) for event in boss_timeline]
-            if boss_timeline is not None
-            else [serialize_boss_cast(cast) for cast in boss.spells]
-        )
+        mechanics_data = get_boss_timeline(boss)
         
         os.makedirs(os.path.dirname(filename), exist_ok=True)
         with open(filename, "w", encoding="utf-8") as f:
@@ -5,6 +5,7 @@ import logging
 import os
 import sys
 import time
+from typing import Any, Awaitable, Callable, Optional, TypeVar
 
 from dotenv import load_dotenv
 
@@ -15,6 +16,10 @@ os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
 os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
 os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
 
+# Persistent cache for FF Logs responses. Report events never change,
+# and the same top reports show up in the rankings of many specs.
+os.environ.setdefault("WCL_CACHE_PATH", os.path.join(".runtime", "wcl_cache.sqlite"))
+
 # WCL 密钥
 if not os.getenv("WCL_CLIENT_ID") or not os.getenv("WCL_CLIENT_SECRET"):
     print("Error: WCL_CLIENT_ID and WCL_CLIENT_SECRET must be set in environment variables or .env file.")
@@ -36,8 +41,13 @@ logger = logging.getLogger(__name__)
 
 # 导入核心数据
 try:
+    from lorgs import codecs
     from lorgs.data.classes import ALL_SPECS
+    from lorgs.models.base.construct import construct
+    from lorgs.models.warcraftlogs_base import query_batch
+    from lorgs.models.warcraftlogs_fight_registry import FightRegistry, reset_fight_registry, set_fight_registry
     from lorgs.models.warcraftlogs_ranking import SpecRanking
+    from lorgs.models.wow_spec import WowSpec
     # 注意：不再需要导入 ARCADION_HEAVYWEIGHT 或 SpellTag，因为不需要生成静态文件了
 except ImportError as e:
     logger.error(f"Failed to import lorgs modules: {e}")
@@ -72,6 +82,22 @@ BOSS_ROTATION = [
 ]
 
 DEFAULT_METRIC = "rdps"
+
+SWEEP_CONCURRENCY = max(int(os.getenv("MSPEC_SWEEP_CONCURRENCY") or 4), 1)
+"""Number of specs loaded at the same time. 1 to load them one after another."""
+
+SWEEP_POINT_BUDGET = float(os.getenv("MSPEC_SWEEP_POINT_BUDGET") or 0)
+"""Max. rate limit points to spend on a single sweep. Specs not started by then are skipped. 0 = no limit."""
+
+STATIC_CODECS = ("gzip", "br")
+"""Precompressed copies written next to each file in `front_end/data` (skipped if the codec isn't installed)."""
+
+ARCHIVE_CODEC = os.getenv("MSPEC_ARCHIVE_CODEC") or "gzip"
+"""Compression of the archived rankings."""
+
+SWEEP_INCREMENTAL = os.getenv("MSPEC_SWEEP_INCREMENTAL", "1") != "0"
+"""Keep the fights of the previous sweep, and only load casts for new ranking entries. 0 to reload everything."""
+
 DEFAULT_RANKING_REGIONS = ("", "CN", "KR")
 
 BOSS_CONFIG = {
@@ -106,34 +132,112 @@ BOSS_CONFIG = {
 }
 
 
-async def _do_update_spec(spec, boss_slug, timestamp_folder):
-    """(内部函数) 只负责获取并保存排名数据"""
-    spec_slug = spec.full_name_slug
+def get_ranking_path(spec_slug: str, boss_slug: str) -> str:
+    """Path of the ranking file used by the frontend."""
+    return f"front_end/data/spec_ranking_{spec_slug}_{boss_slug}.json"
+
+
+def load_previous_ranking(path: str, difficulty: str, metric: str) -> Optional[SpecRanking]:
+    """Load the ranking written by the previous sweep (None if missing or for a different difficulty/metric)."""
+    if not os.path.exists(path):
+        return None
+
+    try:
+        data = json.loads(codecs.read_file(path))
+    except ValueError as e:
+        logger.warning(f"Ignoring previous ranking {path}: {e}")
+        return None
+
+    if data.get("difficulty", "mythic") != difficulty or data.get("metric", "rdps") != metric:
+        return None
+    # the file has been validated when it was written
+    return construct(SpecRanking, data)
+
+
+def _get_spec_ranking(spec: WowSpec, boss_slug: str) -> SpecRanking:
     config = BOSS_CONFIG.get(boss_slug, {})
     difficulty = config.get("difficulty", "mythic")
     metric = config.get("metric", DEFAULT_METRIC)
-    ranking_regions = config.get("ranking_regions", DEFAULT_RANKING_REGIONS)
-    
-    # 1. 获取排名数据 (网络请求) - 保持不变
-    ranking = SpecRanking.get_or_create(
+
+    if SWEEP_INCREMENTAL:
+        ranking = load_previous_ranking(get_ranking_path(spec.full_name_slug, boss_slug), difficulty, metric)
+        if ranking:
+            return ranking
+
+    return SpecRanking.get_or_create(
         boss_slug=boss_slug,
-        spec_slug=spec_slug,
+        spec_slug=spec.full_name_slug,
         difficulty=difficulty,
         metric=metric,
     )
+
+
+async def _load_spec_fights(spec, boss_slug):
+    """Load the rankings and fights of a spec, without any casts."""
+    config = BOSS_CONFIG.get(boss_slug, {})
+    ranking_regions = config.get("ranking_regions", DEFAULT_RANKING_REGIONS)
+
+    ranking = _get_spec_ranking(spec, boss_slug)
+    await ranking.load_fights(
+        limit=100,
+        clear_old=not SWEEP_INCREMENTAL,
+        ranking_regions=ranking_regions,
+        incremental=SWEEP_INCREMENTAL,
+    )
+    return ranking
+
+
+async def _load_registry_casts(registry, ranking):
+    """Load the casts of a ranking through the shared registry (one query per fight, across all specs)."""
+    actors = ranking.get_actors_to_load()
+    errors = await registry.load_actors(actors)
+
+    # retry rate limited fights as a whole. Anything else gets another chance in `_load_spec_casts`.
+    for error in errors:
+        if isinstance(error, aiohttp.ClientResponseError) and error.status == 429:
+            raise error
+
+    failed = sum(1 for error in errors if error)
+    if failed:
+        logger.warning(f"[Registry] {failed}/{len(actors)} players/bosses of {ranking.spec_slug} failed to load.")
+    return ranking
+
+
+async def _load_spec_casts(ranking):
+    """Load the remaining casts of a ranking."""
+    await ranking.load_actors()
+    ranking.updated = datetime.datetime.now(datetime.timezone.utc)
+    ranking.dirty = False
+    return ranking
+
+
+async def _do_update_spec(spec, boss_slug, timestamp_folder):
+    """(内部函数) 只负责获取并保存排名数据"""
+    config = BOSS_CONFIG.get(boss_slug, {})
+    ranking_regions = config.get("ranking_regions", DEFAULT_RANKING_REGIONS)
     
-    # 这里的 clear_old=True 配合我们之前的讨论，保证数据纯净
-    await ranking.load(limit=100, clear_old=True, ranking_regions=ranking_regions)
+    # 1. 获取排名数据 (网络请求) - 保持不变
+    ranking = _get_spec_ranking(spec, boss_slug)
     
-    # 2. 序列化数据 - 保持不变
-    data = ranking.model_dump(exclude_unset=True, by_alias=True)
+    # incremental: fights which fell off the ranking are still removed, so the data stays clean
+    await ranking.load(
+        limit=100,
+        clear_old=not SWEEP_INCREMENTAL,
+        ranking_regions=ranking_regions,
+        incremental=SWEEP_INCREMENTAL,
+    )
+    _save_spec_ranking(ranking, boss_slug, timestamp_folder)
 
-    # 3. 保存实时文件 (给前端用) - 保持不变
-    current_filename = f"front_end/data/spec_ranking_{spec_slug}_{boss_slug}.json"
-    os.makedirs(os.path.dirname(current_filename), exist_ok=True)
-    
-    with open(current_filename, "w", encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, default=str)
+
+def _save_spec_ranking(ranking: SpecRanking, boss_slug: str, timestamp_folder: str) -> None:
+    spec_slug = ranking.spec_slug
+
+    # 2. 序列化数据 (只序列化一次)
+    data = codecs.dump_json(ranking.model_dump(exclude_unset=True, by_alias=True))
+
+    # 3. 保存实时文件 (给前端用), plus precompressed copies for the static file server
+    current_filename = get_ranking_path(spec_slug, boss_slug)
+    codecs.write_file(current_filename, data, siblings=STATIC_CODECS)
 
     # ==============================================================================
     # 4. [修改] 历史归档 (带时间戳)
@@ -143,34 +247,114 @@ async def _do_update_spec(spec, boss_slug, timestamp_folder):
     # 或者直接 archives/2026-01-26_14-00/
     
     # 这里使用传入的 timestamp_folder，例如 "archives/2026-01-26/14_00"
-    os.makedirs(timestamp_folder, exist_ok=True)
-    
+    # archives are only kept for reference, so they are stored compressed only (read with `codecs.read_file`)
     archive_filename = os.path.join(timestamp_folder, f"spec_ranking_{spec_slug}_{boss_slug}.json")
-    
-    with open(archive_filename, "w", encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, default=str)
+    codecs.write_file(archive_filename, data, codec=ARCHIVE_CODEC)
         
     # logger.info(f"Archived: {archive_filename}")
 
 async def update_spec_with_retry(spec, boss_slug, timestamp_folder):
     """带重试机制的更新函数"""
+    return await run_with_retry(spec.full_name_slug, _do_update_spec, spec, boss_slug, timestamp_folder)
+
+
+T = TypeVar("T")
+
+
+async def run_with_retry(label: str, func: Callable[..., Awaitable[T]], *args: Any) -> Optional[T]:
+    """Run `func`, retrying on rate limits. Returns None if it failed."""
     max_retries = 3
     for attempt in range(max_retries):
         try:
-            # 传递参数给 _do_update_spec
-            await _do_update_spec(spec, boss_slug, timestamp_folder)
-            return 
+            return await func(*args)
         except aiohttp.ClientResponseError as e:
             if e.status == 429:
-                wait_time = 15 * (attempt + 1)
-                logger.warning(f"Rate Limit (429). Waiting {wait_time}s...")
+                # the client already retried and paused its scheduler.
+                # wait for the pause to run out before retrying the whole spec.
+                scheduler = WarcraftlogsClient.get_instance().scheduler
+                wait_time = max(scheduler.paused_until - time.monotonic(), 1)
+                logger.warning(f"Rate Limit (429). Waiting {wait_time:.0f}s...")
                 await asyncio.sleep(wait_time)
             else:
                 logger.error(f"HTTP Error {e.status}: {e}")
-                return 
+                return None
         except Exception as e:
-            logger.exception(f"Error updating {spec.full_name_slug}: {e}")
-            return
+            logger.exception(f"Error updating {label}: {e}")
+            return None
+    return None
+
+
+class SweepStats:
+    """Keeps track of the time spent on each spec during a sweep."""
+
+    def __init__(self, point_budget: float = 0) -> None:
+        self.point_budget = point_budget
+        self.points_at_start = self.points_total
+        self.started = time.monotonic()
+        self.specs: dict[str, dict] = {}
+
+    @property
+    def points_total(self) -> float:
+        return WarcraftlogsClient.get_instance().scheduler.points_total
+
+    @property
+    def points_used(self) -> float:
+        return self.points_total - self.points_at_start
+
+    @property
+    def over_budget(self) -> bool:
+        return bool(self.point_budget) and self.points_used >= self.point_budget
+
+    def get(self, spec_slug: str) -> dict:
+        return self.specs.setdefault(spec_slug, {"fights": 0.0, "casts": 0.0, "points": 0.0, "status": "pending"})
+
+    def log_summary(self) -> None:
+        logger.info(f"[Summary] {len(self.specs)} specs in {time.monotonic() - self.started:.0f}s | points={self.points_used:.0f}")
+        logger.info(f"[Summary] {'spec':<32} {'fights':>8} {'casts':>8} {'points':>8}  status")
+        for spec_slug, stats in sorted(self.specs.items()):
+            logger.info(
+                f"[Summary] {spec_slug:<32} {stats['fights']:>7.1f}s {stats['casts']:>7.1f}s {stats['points']:>8.0f}  {stats['status']}"
+            )
+
+
+async def run_spec_step(
+    stats: SweepStats,
+    semaphore: asyncio.Semaphore,
+    step: str,
+    spec_slug: str,
+    func: Callable[..., Awaitable[T]],
+    *args: Any,
+) -> Optional[T]:
+    """Run a single step for a spec, limited by the semaphore and the point budget."""
+    spec_stats = stats.get(spec_slug)
+    async with semaphore:
+        if stats.over_budget:
+            logger.warning(f"[Budget] Sweep budget of {stats.point_budget:.0f} points used up. Skipping {spec_slug}.")
+            spec_stats["status"] = "skipped"
+            return None
+
+        t = time.monotonic()
+        points = stats.points_total
+        result = await run_with_retry(spec_slug, func, *args)
+        spec_stats[step] += time.monotonic() - t
+        spec_stats["points"] += stats.points_total - points  # approximation, as other specs run at the same time
+        spec_stats["status"] = step if result is not None else "failed"
+        return result
+
+
+def log_rate_limit_metrics() -> None:
+    """Log the current rate limit budget of the shared client."""
+    metrics = WarcraftlogsClient.get_instance().get_metrics()
+    logger.info(
+        "[Budget] spent=%s/%s | reset_in=%ss | sustainable=%s points/s | requests=%s | rate_limited=%s",
+        metrics["points_spent"],
+        metrics["limit_per_hour"],
+        metrics["reset_in"],
+        metrics["sustainable_rate"],
+        metrics["requests"],
+        metrics["rate_limited"],
+    )
+
 
 async def main():
     WarcraftlogsClient._instance = None 
@@ -208,8 +392,9 @@ async def main():
             
             # 传入 archive_batch_dir
             await update_spec_with_retry(spec, boss_slug=target_boss, timestamp_folder=archive_batch_dir)
-            
-            await asyncio.sleep(3)
+
+            # no need to sleep between specs. The client paces all requests based on the rate limit.
+            log_rate_limit_metrics()
 
     finally:
         logger.info("Closing HTTP Session...")
@@ -229,12 +414,73 @@ async def run_cycle(target_boss: str, cycle_index: int) -> None:
     logger.info(f"=== Work Cycle: Rotation {cycle_index} | Boss: {target_boss} ===")
     logger.info(f"=== Archive Target: {archive_batch_dir} ===")
 
+    client = WarcraftlogsClient.get_instance()
+    if client.cache:
+        client.cache.purge()
+
     all_specs = sorted(list(ALL_SPECS), key=lambda s: s.full_name_slug)
 
-    for i, spec in enumerate(all_specs):
-        logger.info(f"[{i+1}/{len(all_specs)}] Updating {spec.full_name_slug}...")
-        await update_spec_with_retry(spec, boss_slug=target_boss, timestamp_folder=archive_batch_dir)
-        await asyncio.sleep(3)
+    # Specs are loaded concurrently. The client keeps the total number of
+    # requests and the points spent in check, independent of `SWEEP_CONCURRENCY`.
+    semaphore = asyncio.Semaphore(SWEEP_CONCURRENCY)
+    stats = SweepStats(point_budget=SWEEP_POINT_BUDGET)
+    logger.info(f"=== Sweep: {len(all_specs)} specs | concurrency={SWEEP_CONCURRENCY} | budget={SWEEP_POINT_BUDGET or '-'} ===")
+
+    # Most top pulls show up in the rankings of multiple specs.
+    # The registry makes sure each fight is only loaded once during this sweep.
+    registry = FightRegistry()
+    token = set_fight_registry(registry)
+    try:
+        # 1. Rankings and Fights
+        results = await asyncio.gather(
+            *(
+                run_spec_step(stats, semaphore, "fights", spec.full_name_slug, _load_spec_fights, spec, target_boss)
+                for spec in all_specs
+            )
+        )
+        rankings = [ranking for ranking in results if ranking]
+        log_rate_limit_metrics()
+
+        # 2. Casts of all ranked players, with one query per fight
+        # (all specs share the same batch, so queries for the same report are still combined)
+        logger.info(f"Loading casts across {len(rankings)} specs...")
+        with query_batch():
+            await asyncio.gather(
+                *(
+                    run_spec_step(stats, semaphore, "casts", ranking.spec_slug, _load_registry_casts, registry, ranking)
+                    for ranking in rankings
+                )
+            )
+
+        # 3. Finalize each Spec (remaining buddies, dance partners, ...)
+        # Actors which failed in the registry stage are loaded again here. Like
+        # every other request of a spec, only within its limited `run_spec_step`.
+        tasks = [
+            asyncio.ensure_future(
+                run_spec_step(stats, semaphore, "casts", ranking.spec_slug, _load_spec_casts, ranking)
+            )
+            for ranking in rankings
+        ]
+
+        # save in a fixed order, no matter which spec finishes first
+        for i, task in enumerate(tasks):
+            ranking = await task
+            if not ranking:
+                continue
+            logger.info(f"[{i+1}/{len(tasks)}] Saving {ranking.spec_slug}...")
+            try:
+                _save_spec_ranking(ranking, target_boss, archive_batch_dir)
+            except Exception as e:
+                logger.exception(f"Error saving {ranking.spec_slug}: {e}")
+                stats.get(ranking.spec_slug)["status"] = "failed"
+            else:
+                stats.get(ranking.spec_slug)["status"] = "ok"
+
+        log_rate_limit_metrics()
+        logger.info(f"[Registry] {registry.metrics()}")
+    finally:
+        reset_fight_registry(token)
+        stats.log_summary()
 
 
 async def sleep_until_next_hour() -> None: